@@ -1,43 +1,477 @@
-from flask import Flask, render_template, request, jsonify
-import subprocess
-import requests
+from flask import Flask, Response, render_template, request, jsonify, stream_with_context
+import json
+import os
+import time
+
+import numpy as np
+
+import cache_http
+import metricas
+from cache_gini import CacheGini, ErrorCargaLote
+from cliente_bm import cliente_por_defecto
+from calculadora import crear_motor
+from coalescedor import Coalescedor
+from dataset_gini import cargar_si_existe
+from metricas import etapa
+from parser_bm import iterar_paginas
 
 app = Flask(__name__)
+cache_http.registrar(app)
+metricas.registrar(app)
+
+cache = CacheGini(
+    capacidad=int(os.environ.get("GINI_CACHE_CAPACIDAD", "256")),
+    ttl=float(os.environ.get("GINI_CACHE_TTL", "86400")),
+    ttl_obsoleto=float(os.environ.get("GINI_CACHE_TTL_OBSOLETO", str(7 * 86400))),
+    archivo=os.environ.get("GINI_CACHE_ARCHIVO") or None,
+)
+
+motor = crear_motor()
+
+# Consultas idénticas concurrentes comparten una sola búsqueda y un solo cálculo
+coalescedor = Coalescedor()
+
+# Dataset local indexado (dataset_gini.py); si está cargado se responde sin tocar la red
+dataset = cargar_si_existe(os.environ.get("GINI_DATASET"))
+
+MAX_PAISES_LOTE = 50
+MAX_ANIOS_SERIE = 100
+ANIO_POR_DEFECTO = "2020"
+
+# Los valores cambian a lo sumo una vez al año: una hora fresca en el navegador/proxy
+# y un día más sirviéndose obsoleto mientras se revalida
+MAX_AGE_GINI = 3600
+STALE_GINI = 86400
+
 
-def obtener_gini(pais):
-    url = f"https://api.worldbank.org/v2/en/country/{pais}/indicator/SI.POV.GINI"
+class SinDatosBancoMundial(Exception):
+    pass
+
+
+def pedir_json(ruta, params):
+    """GET al Banco Mundial midiendo por separado la descarga y el parseo"""
+    cliente = cliente_por_defecto()
+    with etapa("banco_mundial"):
+        respuesta = cliente.pedir(ruta, params)
+    with etapa("parseo"):
+        return cliente.decodificar(respuesta)
+
+
+def consultar_gini_bm(pais, anio):
+    """Consulta el valor GINI al Banco Mundial; devuelve None si no hay dato para ese año"""
+    ruta = f"/v2/en/country/{pais}/indicator/SI.POV.GINI"
     params = {
         "format": "json",
-        "date": "2020",
+        "date": anio,
         "per_page": "1"
     }
 
-    response = requests.get(url, params=params)
-    data = response.json()
+    data = pedir_json(ruta, params)
 
     if data and len(data) > 1 and data[1]:
-        gini = data[1][0]["value"]
-        if gini is not None:
-            try:
-                resultado = subprocess.check_output(["./gini_exec/gini", str(gini)])
-                return resultado.decode("utf-8")
-            except Exception as e:
-                return f"Error al ejecutar el programa C: {e}"
-        else:
-            return "No hay datos GINI disponibles para ese año."
+        return data[1][0]["value"]
+    raise SinDatosBancoMundial(pais)
+
+
+def consultar_por_mitades(consulta, paises, *args):
+    """
+    La API rechaza toda la consulta si uno de los códigos no existe. Repite
+    `consulta` con cada mitad del lote y junta lo que devuelvan, así un código
+    desconocido solo deja afuera a su país (unas 2·log2(n) consultas más).
+    """
+    mitad = len(paises) // 2
+    valores = {}
+    for parte in (paises[:mitad], paises[mitad:]):
+        try:
+            valores.update(consulta(parte, *args))
+        except SinDatosBancoMundial:
+            pass
+    return valores
+
+
+def consultar_gini_bm_lote(paises, anio):
+    """
+    Consulta varios países en una sola llamada (sintaxis AR;BR;CL de la API).
+    Los códigos que la API no reconoce quedan fuera del resultado.
+    """
+    ruta = f"/v2/en/country/{';'.join(paises)}/indicator/SI.POV.GINI"
+    params = {
+        "format": "json",
+        "date": anio,
+        "per_page": str(len(paises))
+    }
+
+    data = pedir_json(ruta, params)
+
+    if not (data and len(data) > 1 and data[1]):
+        if len(paises) > 1:
+            return consultar_por_mitades(consultar_gini_bm_lote, paises, anio)
+        raise SinDatosBancoMundial(paises[0])
+
+    # La API responde con el código ISO2 en country.id aunque se pida por ISO3
+    por_codigo = {}
+    for item in data[1]:
+        por_codigo[item["country"]["id"]] = item["value"]
+        por_codigo[item["countryiso3code"]] = item["value"]
+    return {pais: por_codigo[pais] for pais in paises if pais in por_codigo}
+
+
+def respaldo(clave):
+    """
+    Último valor conocido de `clave` para cuando el Banco Mundial falla (o el
+    circuito está abierto): (valor, antigüedad en segundos), o None si no hay.
+    """
+    entrada = cache.ultimo_valido(clave)
+    if entrada is None:
+        return None
+    return entrada.valor, int(time.time() - entrada.creado)
+
+
+def buscar_gini(pais, anio):
+    """
+    Valor GINI desde el dataset local si lo tiene; si no, cache + Banco Mundial.
+    Devuelve (valor, antigüedad): antigüedad es None salvo que se haya usado el respaldo.
+    """
+    if dataset is not None:
+        encontrado, valor = dataset.buscar(pais, anio)
+        if encontrado:
+            return valor, None
+    clave = f"{pais}:{anio}"
+    try:
+        return cache.obtener(clave, lambda: consultar_gini_bm(pais, anio)), None
+    except SinDatosBancoMundial:
+        raise
+    except Exception:
+        ultimo = respaldo(clave)
+        if ultimo is None:
+            raise
+        return ultimo
+
+
+def consultar_serie_bm(paises, desde, hasta):
+    """
+    Series completas de varios países en una consulta, parseadas a medida que
+    llegan. Como en consultar_gini_bm_lote, los códigos desconocidos quedan fuera.
+    """
+    ruta = f"/v2/en/country/{';'.join(paises)}/indicator/SI.POV.GINI"
+    params = {
+        "format": "json",
+        "date": f"{desde}:{hasta}",
+        "per_page": "1000"
+    }
+
+    series = {pais: {} for pais in paises}
+    registros = 0
+    # Descarga y parseo van intercalados, así que se miden como una sola etapa
+    with etapa("banco_mundial"):
+        for item in iterar_paginas(cliente_por_defecto(), ruta, params):
+            registros += 1
+            if item["value"] is None:
+                continue
+            # Un mismo país puede haberse pedido por ISO2 y por ISO3
+            for codigo in (item["country"]["id"], item["countryiso3code"]):
+                if codigo in series:
+                    series[codigo][int(item["date"])] = item["value"]
+    if not registros:
+        # Sin registros (ni siquiera nulos) la API rechazó algún código
+        if len(paises) > 1:
+            return consultar_por_mitades(consultar_serie_bm, paises, desde, hasta)
+        raise SinDatosBancoMundial(paises[0])
+    return {pais: sorted(puntos.items()) for pais, puntos in series.items()}
+
+
+def obtener_gini(pais, anio=ANIO_POR_DEFECTO):
+    return coalescedor.hacer((pais, anio), lambda: calcular_gini(pais, anio))
+
+def calcular_gini(pais, anio):
+    """Devuelve (texto, antigüedad del dato si es un respaldo obsoleto o None)"""
+    try:
+        gini, antiguedad = buscar_gini(pais, anio)
+    except Exception:
+        return "No se pudo obtener información del Banco Mundial.", None
+
+    if gini is not None:
+        try:
+            with etapa("calculadora"):
+                return motor.ejecutar(gini), antiguedad
+        except Exception as e:
+            return f"Error al ejecutar el programa C: {e}", None
     else:
-        return "No se pudo obtener información del Banco Mundial."
+        return "No hay datos GINI disponibles para ese año.", antiguedad
+
+def obtener_gini_lote(paises, anio=ANIO_POR_DEFECTO):
+    """
+    Como obtener_gini para varios países: una llamada al Banco Mundial y un lote
+    de cálculo. Devuelve (resultados, {pais: antigüedad} de los servidos de respaldo).
+    """
+    claves = {pais: f"{pais}:{anio}" for pais in paises}
+
+    def cargar(faltantes):
+        codigos = [clave.split(":", 1)[0] for clave in faltantes]
+        valores = coalescedor.hacer(("lote", anio, tuple(codigos)),
+                                    lambda: consultar_gini_bm_lote(codigos, anio))
+        return {claves[pais]: valor for pais, valor in valores.items()}
+
+    valores = {}
+    if dataset is not None:
+        for pais in paises:
+            encontrado, valor = dataset.buscar(pais, anio)
+            if encontrado:
+                valores[claves[pais]] = valor
+
+    obsoletos = {}
+    remotas = [clave for clave in claves.values() if clave not in valores]
+    if remotas:
+        try:
+            valores.update(cache.obtener_varios(remotas, cargar))
+        except ErrorCargaLote as e:
+            # Los aciertos del cache se conservan; el respaldo es solo para las
+            # claves que faltaban y solo si falló el Banco Mundial (no si no hay datos)
+            valores.update(e.resultados)
+            if not isinstance(e.causa, SinDatosBancoMundial):
+                for pais in paises:
+                    ultimo = respaldo(claves[pais]) if claves[pais] in e.faltantes else None
+                    if ultimo is not None:
+                        valores[claves[pais]], obsoletos[pais] = ultimo
+
+    con_dato = [pais for pais in paises if valores.get(claves[pais]) is not None]
+    try:
+        with etapa("calculadora"):
+            calculados = motor.ejecutar_lote([valores[claves[pais]] for pais in con_dato])
+        calculados = dict(zip(con_dato, calculados))
+    except Exception as e:
+        calculados = {pais: f"Error al ejecutar el programa C: {e}" for pais in con_dato}
+
+    resultados = {}
+    for pais in paises:
+        if pais in calculados:
+            resultados[pais] = calculados[pais]
+        elif claves[pais] in valores:
+            resultados[pais] = "No hay datos GINI disponibles para ese año."
+        else:
+            resultados[pais] = "No se pudo obtener información del Banco Mundial."
+    return resultados, obsoletos
+
+def leer_anio(datos):
+    anio = str(datos.get("anio", ANIO_POR_DEFECTO)).strip()
+    return anio if anio.isdigit() and len(anio) == 4 else None
+
+def leer_paises(paises):
+    """Normaliza la lista de códigos (mayúsculas, sin repetidos); None si es inválida"""
+    if not isinstance(paises, list) or len(paises) > MAX_PAISES_LOTE:
+        return None
+    paises = list(dict.fromkeys(str(pais).strip().upper() for pais in paises))
+    if not all(pais.isalpha() and 2 <= len(pais) <= 3 for pais in paises):
+        return None
+    return paises
+
+def cuerpo_con_antiguedad(cuerpo, antiguedad):
+    """Marca el resultado como obsoleto si se sirvió el último valor conocido"""
+    if antiguedad is not None:
+        cuerpo["obsoleto"] = True
+        cuerpo["antiguedad"] = antiguedad
+    return cuerpo
+
+def es_resultado_valido(resultado):
+    return resultado.startswith("GINI recibido")
+
+def respuesta_gini(cuerpo, validos):
+    """Solo los resultados exitosos se dejan cachear por navegadores y proxies"""
+    with etapa("serializacion"):
+        respuesta = jsonify(cuerpo)
+    if not validos:
+        respuesta.cache_control.no_store = True
+        return respuesta
+    return cache_http.respuesta_cacheable(respuesta, MAX_AGE_GINI, STALE_GINI)
+
+def obtener_series(paises, desde, hasta):
+    """
+    ({pais: [(anio, valor), ...]}, {pais: antigüedad}) desde el dataset local o con
+    una sola consulta remota; el segundo dict lista las series servidas de respaldo.
+    """
+    claves = {pais: f"serie:{pais}:{desde}:{hasta}" for pais in paises}
+    series = {}
+    if dataset is not None:
+        for pais in paises:
+            puntos = dataset.serie(pais, desde, hasta)
+            if puntos:
+                series[pais] = [(anio, valor) for anio, valor in puntos if valor is not None]
+
+    def cargar(faltantes):
+        codigos = [clave.split(":")[1] for clave in faltantes]
+        remotas = coalescedor.hacer(("serie", desde, hasta, tuple(codigos)),
+                                    lambda: consultar_serie_bm(codigos, desde, hasta))
+        return {claves[pais]: puntos for pais, puntos in remotas.items()}
+
+    obsoletos = {}
+    remotas = [claves[pais] for pais in paises if pais not in series]
+    if remotas:
+        try:
+            valores = cache.obtener_varios(remotas, cargar)
+        except ErrorCargaLote as e:
+            valores = dict(e.resultados)
+            if not isinstance(e.causa, SinDatosBancoMundial):
+                for pais in paises:
+                    ultimo = respaldo(claves[pais]) if claves[pais] in e.faltantes else None
+                    if ultimo is not None:
+                        valores[claves[pais]], obsoletos[pais] = ultimo
+                if not valores:
+                    raise
+        for pais in paises:
+            if claves[pais] in valores:
+                series[pais] = [tuple(punto) for punto in valores[claves[pais]]]
+    return series, obsoletos
+
+def calcular_series(series):
+    """Aplica la calculadora a todos los puntos de todas las series en un solo lote"""
+    paises = list(series)
+    largos = [len(series[pais]) for pais in paises]
+    valores = np.fromiter((valor for pais in paises for _, valor in series[pais]),
+                          dtype=np.float32, count=sum(largos))
+    with etapa("calculadora"):
+        resultados = np.asarray(motor.calcular_lote(valores), dtype=np.int32)
+    cortes = np.cumsum(largos)[:-1]
+    return dict(zip(paises, np.split(resultados, cortes)))
 
 @app.route('/')
 def index():
-    return render_template('index.html')
+    respuesta = app.make_response(render_template('index.html'))
+    respuesta.cache_control.no_cache = True
+    return cache_http.respuesta_cacheable(respuesta, 0)
 
 @app.route('/obtener_gini', methods=['POST'])
 def obtener_gini_route():
-    pais = request.json.get("pais")
-    resultado = obtener_gini(pais)
-    return jsonify({"resultado": resultado})
+    # Normalizado como en /gini/<pais>: "arg" y "ARG" comparten la entrada del cache
+    paises = leer_paises([request.json.get("pais", "")])
+    anio = leer_anio(request.json)
+    if not paises or anio is None:
+        return jsonify({"error": "País o año inválido"}), 400
+    resultado, antiguedad = obtener_gini(paises[0], anio)
+    with etapa("serializacion"):
+        return jsonify(cuerpo_con_antiguedad({"resultado": resultado}, antiguedad))
+
+@app.route('/obtener_gini_batch', methods=['POST'])
+def obtener_gini_batch_route():
+    paises = request.json.get("paises") or []
+    anio = leer_anio(request.json)
+    if anio is None:
+        return jsonify({"error": "Año inválido"}), 400
+    paises = leer_paises(paises)
+    if paises is None:
+        return jsonify({"error": f"Se esperan hasta {MAX_PAISES_LOTE} códigos ISO2 o ISO3"}), 400
+    resultados, obsoletos = obtener_gini_lote(paises, anio) if paises else ({}, {})
+    with etapa("serializacion"):
+        return jsonify({"resultados": resultados, "obsoletos": obsoletos})
+
+# Versiones GET de las consultas, cacheables con ETag y Cache-Control
+
+@app.route('/gini/<pais>')
+def gini_route(pais):
+    paises = leer_paises([pais])
+    anio = leer_anio(request.args)
+    if not paises or anio is None:
+        return jsonify({"error": "País o año inválido"}), 400
+    resultado, antiguedad = obtener_gini(paises[0], anio)
+    cuerpo = cuerpo_con_antiguedad({"pais": paises[0], "anio": anio, "resultado": resultado}, antiguedad)
+    return respuesta_gini(cuerpo, es_resultado_valido(resultado) and antiguedad is None)
+
+@app.route('/gini')
+def gini_lote_route():
+    paises = leer_paises([p for p in request.args.get("paises", "").split(",") if p.strip()])
+    anio = leer_anio(request.args)
+    if not paises or anio is None:
+        return jsonify({"error": f"Se esperan de 1 a {MAX_PAISES_LOTE} países y un año válido"}), 400
+    resultados, obsoletos = obtener_gini_lote(paises, anio)
+    validos = all(es_resultado_valido(r) for r in resultados.values()) and not obsoletos
+    return respuesta_gini({"anio": anio, "resultados": resultados, "obsoletos": obsoletos}, validos)
+
+@app.route('/serie_gini')
+def serie_gini_route():
+    paises = leer_paises([p for p in request.args.get("paises", "").split(",") if p.strip()])
+    if not paises:
+        return jsonify({"error": f"Se esperan de 1 a {MAX_PAISES_LOTE} códigos ISO2/ISO3 separados por coma"}), 400
+    try:
+        desde = int(request.args.get("desde", "1990"))
+        hasta = int(request.args.get("hasta", ANIO_POR_DEFECTO))
+    except ValueError:
+        return jsonify({"error": "Años inválidos"}), 400
+    if not (0 <= hasta - desde < MAX_ANIOS_SERIE):
+        return jsonify({"error": f"El rango debe ser de 1 a {MAX_ANIOS_SERIE} años"}), 400
+
+    try:
+        series, obsoletos = obtener_series(paises, desde, hasta)
+    except Exception:
+        return jsonify({"error": "No se pudo obtener información del Banco Mundial."}), 502
+    resultados = calcular_series(series)
+
+    def generar():
+        # Una línea JSON por país (NDJSON) para no armar toda la respuesta en memoria
+        for pais in paises:
+            puntos = series.get(pais, [])
+            with etapa("serializacion"):
+                linea = json.dumps({
+                    "pais": pais,
+                    "anios": [anio for anio, _ in puntos],
+                    "valores": [valor for _, valor in puntos],
+                    "resultados": resultados[pais].tolist() if pais in resultados else [],
+                    **({"obsoleto": True, "antiguedad": obsoletos[pais]} if pais in obsoletos else {}),
+                }) + "\n"
+            yield linea
+
+    return Response(stream_with_context(generar()), mimetype="application/x-ndjson")
+
+
+@app.after_request
+def identificar_worker(respuesta):
+    # Con gunicorn hay varios procesos: el pid indica qué worker atendió la petición
+    respuesta.headers["X-Worker"] = str(os.getpid())
+    return respuesta
+
+@app.route('/estadisticas')
+def estadisticas_route():
+    circuito = cliente_por_defecto().circuito
+    return jsonify({
+        "worker": os.getpid(),
+        "cache": cache.estadisticas(),
+        "cliente": cliente_por_defecto().estadisticas.snapshot(),
+        "coalescedor": coalescedor.estadisticas(),
+        "circuito": circuito.estadisticas() if circuito is not None else None,
+        "dataset": dataset.estadisticas() if dataset is not None else None,
+        "motor": motor.nombre,
+    })
+
+@metricas.registro.recolector
+def metricas_componentes():
+    cliente = cliente_por_defecto().estadisticas.snapshot()
+    estadisticas_cache = cache.estadisticas()
+    lista = [
+        ("gini_cache_eventos_total", "counter", "Eventos del cache de consultas", "evento",
+         {nombre: estadisticas_cache[nombre] for nombre in cache.contadores}),
+        ("gini_cache_entradas", "gauge", "Entradas en memoria del cache", None,
+         {None: estadisticas_cache["entradas"]}),
+        ("gini_coalescedor_llamadas_total", "counter", "Búsquedas ejecutadas o coalescidas", "tipo",
+         {k: v for k, v in coalescedor.estadisticas().items() if k != "en_curso"}),
+        ("gini_banco_mundial_llamadas_total", "counter", "Llamadas al Banco Mundial", None,
+         {None: cliente["llamadas"]}),
+        ("gini_banco_mundial_errores_total", "counter", "Llamadas al Banco Mundial fallidas", None,
+         {None: cliente["errores"]}),
+        ("gini_banco_mundial_reintentos_total", "counter", "Reintentos al Banco Mundial", None,
+         {None: cliente["reintentos"]}),
+    ]
+    circuito = cliente_por_defecto().circuito
+    if circuito is not None:
+        datos = circuito.estadisticas()
+        lista.extend([
+            ("gini_circuito_estado", "gauge", "Estado del circuit breaker (1 en el estado actual)", "estado",
+             {estado: int(datos["estado"] == estado) for estado in ("cerrado", "abierto", "semiabierto")}),
+            ("gini_circuito_eventos_total", "counter", "Aperturas, rechazos, llamadas lentas y sondas", "evento",
+             {nombre: datos[nombre] for nombre in circuito.contadores}),
+        ])
+    return lista
+
+@app.route('/metrics')
+def metrics_route():
+    return Response(metricas.registro.exponer(), mimetype="text/plain; version=0.0.4")
 
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=True)
-
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Servidor local que imita la API del Banco Mundial para el indicador SI.POV.GINI.
+Sirve datos sintéticos deterministas con el mismo formato JSON que
+api.worldbank.org, y permite inyectar latencia y errores para pruebas.
+
+Uso:
+    python3 banco_mundial_falso.py --puerto 8081 --latencia 0.2 --tasa-error 0.1
+    GINI_BANCO_MUNDIAL_URL=http://127.0.0.1:8081 python3 app.py
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+INDICADOR = "SI.POV.GINI"
+ANIO_MIN = 1960
+ANIO_MAX = 2023
+
+# Valores reales de 2020 para los países de la interfaz
+VALORES_CONOCIDOS = {
+    ("AR", 2020): 42.3,
+    ("BR", 2020): 48.9,
+    ("CL", 2020): 44.9,
+    ("UY", 2020): 40.2,
+    ("MX", 2020): 45.4,
+}
+
+PAISES = {
+    "AR": ("ARG", "Argentina"),
+    "BO": ("BOL", "Bolivia"),
+    "BR": ("BRA", "Brazil"),
+    "CL": ("CHL", "Chile"),
+    "CO": ("COL", "Colombia"),
+    "EC": ("ECU", "Ecuador"),
+    "MX": ("MEX", "Mexico"),
+    "PE": ("PER", "Peru"),
+    "PY": ("PRY", "Paraguay"),
+    "UY": ("URY", "Uruguay"),
+    "VE": ("VEN", "Venezuela, RB"),
+    "ES": ("ESP", "Spain"),
+    "US": ("USA", "United States"),
+    "DE": ("DEU", "Germany"),
+    "FR": ("FRA", "France"),
+}
+
+
+def valor_sintetico(pais, anio):
+    """Valor GINI determinista para (pais, anio); None simula años sin datos"""
+    if (pais, anio) in VALORES_CONOCIDOS:
+        return VALORES_CONOCIDOS[(pais, anio)]
+    semilla = zlib.crc32(f"{pais}:{anio}".encode())
+    if anio < 1980 or semilla % 7 == 0:
+        return None
+    return round(30 + (semilla % 2500) / 100, 1)
+
+
+def registro(pais, anio):
+    iso3, nombre = PAISES.get(pais, (pais + "X", pais))
+    return {
+        "indicator": {"id": INDICADOR, "value": "Gini index"},
+        "country": {"id": pais, "value": nombre},
+        "countryiso3code": iso3,
+        "date": str(anio),
+        "value": valor_sintetico(pais, anio),
+        "unit": "",
+        "obs_status": "",
+        "decimal": 1,
+    }
+
+
+def parsear_fechas(date):
+    if not date:
+        return list(range(ANIO_MAX, ANIO_MIN - 1, -1))
+    if ":" in date:
+        desde, hasta = date.split(":", 1)
+        return list(range(int(hasta), int(desde) - 1, -1))
+    return [int(date)]
+
+
+class EstadoServidor:
+    """Configuración modificable en caliente y contadores del servidor falso"""
+
+    def __init__(self, latencia=0.0, tasa_error=0.0, semilla=None):
+        self.latencia = latencia
+        self.tasa_error = tasa_error
+        self.lock = threading.Lock()
+        self.peticiones = 0
+        self.errores = 0
+        self.rng = random.Random(semilla)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "latencia": self.latencia,
+                "tasa_error": self.tasa_error,
+                "peticiones": self.peticiones,
+                "errores": self.errores,
+            }
+
+
+class ManejadorBancoMundial(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def enviar_json(self, codigo, cuerpo):
+        datos = json.dumps(cuerpo).encode("utf-8")
+        self.send_response(codigo)
+        self.send_header("Content-Type", "application/json;charset=utf-8")
+        self.send_header("Content-Length", str(len(datos)))
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def do_GET(self):
+        estado = self.server.estado
+        url = urlparse(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+
+        if url.path == "/_estado":
+            self.enviar_json(200, estado.snapshot())
+            return
+
+        if url.path == "/_control":
+            with estado.lock:
+                if "latencia" in params:
+                    estado.latencia = float(params["latencia"])
+                if "tasa_error" in params:
+                    estado.tasa_error = float(params["tasa_error"])
+                if "reiniciar" in params:
+                    estado.peticiones = estado.errores = 0
+            self.enviar_json(200, estado.snapshot())
+            return
+
+        with estado.lock:
+            estado.peticiones += 1
+            latencia = estado.latencia
+            falla = estado.rng.random() < estado.tasa_error
+            if falla:
+                estado.errores += 1
+
+        if latencia:
+            time.sleep(latencia)
+        if falla:
+            self.enviar_json(502, {"error": "falla inyectada"})
+            return
+
+        # /v2[/<idioma>]/country/<paises>/indicator/<indicador>
+        partes = [p for p in url.path.split("/") if p]
+        try:
+            i = partes.index("country")
+            paises = partes[i + 1].upper().split(";")
+            indicador = partes[i + 3]
+        except (ValueError, IndexError):
+            self.enviar_json(404, {"error": "ruta desconocida"})
+            return
+
+        if indicador != INDICADOR:
+            self.enviar_json(200, [{"message": [{"id": "175", "key": "Invalid format",
+                                                 "value": "The indicator was not found."}]}])
+            return
+
+        por_iso3 = {iso3: pais for pais, (iso3, _) in PAISES.items()}
+        paises = [por_iso3.get(p, p) for p in paises]
+        if paises == ["ALL"]:
+            paises = list(PAISES)
+        elif any(p not in PAISES for p in paises):
+            self.enviar_json(200, [{"message": [{"id": "120", "key": "Invalid value",
+                                                 "value": "The provided parameter value is not valid"}]}])
+            return
+
+        try:
+            anios = parsear_fechas(params.get("date"))
+        except ValueError:
+            self.enviar_json(200, [{"message": [{"id": "120", "key": "Invalid value",
+                                                 "value": "The provided parameter value is not valid"}]}])
+            return
+
+        registros = [registro(p, a) for p in paises for a in anios]
+        per_page = max(1, int(params.get("per_page", 50)))
+        pagina = max(1, int(params.get("page", 1)))
+        total = len(registros)
+        paginas = (total + per_page - 1) // per_page
+        trozo = registros[(pagina - 1) * per_page:pagina * per_page]
+
+        meta = {"page": pagina, "pages": paginas, "per_page": per_page, "total": total,
+                "sourceid": "2", "lastupdated": "2024-01-01"}
+        self.enviar_json(200, [meta, trozo or None])
+
+
+class ServidorBancoMundial(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Los clientes con timeout cortan la conexión a propósito; no es un error del servidor
+        if not isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            super().handle_error(request, client_address)
+
+
+def crear_servidor(host="127.0.0.1", puerto=0, latencia=0.0, tasa_error=0.0, semilla=None):
+    servidor = ServidorBancoMundial((host, puerto), ManejadorBancoMundial)
+    servidor.estado = EstadoServidor(latencia, tasa_error, semilla)
+    return servidor
+
+
+def iniciar_en_hilo(**kwargs):
+    """Arranca el servidor en un hilo daemon y devuelve (servidor, url_base)"""
+    servidor = crear_servidor(**kwargs)
+    hilo = threading.Thread(target=servidor.serve_forever, daemon=True)
+    hilo.start()
+    host, puerto = servidor.server_address[:2]
+    return servidor, f"http://{host}:{puerto}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API falsa del Banco Mundial (SI.POV.GINI)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8081)
+    parser.add_argument("--latencia", type=float, default=0.0, help="segundos por petición")
+    parser.add_argument("--tasa-error", type=float, default=0.0, help="fracción de respuestas 502")
+    parser.add_argument("--semilla", type=int, default=None)
+    args = parser.parse_args()
+
+    servidor = crear_servidor(args.host, args.puerto, args.latencia, args.tasa_error, args.semilla)
+    print(f"Banco Mundial falso en http://{args.host}:{servidor.server_address[1]}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Compara el motor en proceso (libgini.so vía ctypes) contra el subproceso
+gini_exec/gini bajo carga concurrente.
+
+Uso:
+    python3 bench/bench_calculadora.py --hilos 1 4 16 --llamadas 2000
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from calculadora import MotorCtypes, MotorSubproceso
+from cliente_bm import percentil
+
+
+def medir(motor, hilos, llamadas):
+    valores = [30 + (i % 250) / 10 for i in range(llamadas)]
+
+    def una(valor):
+        inicio = time.perf_counter()
+        motor.ejecutar(valor)
+        return time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=hilos) as pool:
+        latencias = list(pool.map(una, valores))
+    total = time.perf_counter() - inicio
+
+    return {
+        "motor": motor.nombre,
+        "hilos": hilos,
+        "llamadas": llamadas,
+        "por_segundo": llamadas / total,
+        "p50_us": statistics.median(latencias) * 1e6,
+        "p99_us": percentil(sorted(latencias), 99) * 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ctypes vs subproceso")
+    parser.add_argument("--hilos", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--llamadas", type=int, default=2000)
+    parser.add_argument("--llamadas-subproceso", type=int, default=None,
+                        help="llamadas para el subproceso (por defecto las mismas)")
+    args = parser.parse_args()
+
+    motores = []
+    try:
+        motores.append((MotorCtypes(), args.llamadas))
+    except OSError as e:
+        print(f"ctypes no disponible ({e}); compilar con: make -C libgini")
+    motores.append((MotorSubproceso(), args.llamadas_subproceso or args.llamadas))
+
+    print(f"{'motor':<12}{'hilos':>6}{'llamadas':>10}{'ops/s':>12}{'p50 (us)':>12}{'p99 (us)':>12}")
+    for hilos in args.hilos:
+        for motor, llamadas in motores:
+            try:
+                r = medir(motor, hilos, llamadas)
+            except OSError as e:
+                print(f"{motor.nombre:<12} error: {e}")
+                continue
+            print(f"{r['motor']:<12}{r['hilos']:>6}{r['llamadas']:>10}"
+                  f"{r['por_segundo']:>12.0f}{r['p50_us']:>12.1f}{r['p99_us']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Latencia de la app durante una caída del Banco Mundial, con y sin circuit breaker.
+
+Precarga el cache con entradas que vencen enseguida (sin período obsoleto) y
+castiga /gini/<pais> en tres fases contra el Banco Mundial falso: normal, caída
+(errores o lentitud, inyectados con /_control) y recuperación. Con el circuito,
+una vez abierto se responde al instante con el último valor conocido marcado
+como obsoleto.
+
+Uso:
+    python3 bench/bench_circuito.py --falla errores --duracion 5 --hilos 8
+    python3 bench/bench_circuito.py --falla lentitud --latencia-caida 4
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import banco_mundial_falso
+from cliente_bm import percentil
+
+PAISES = list(banco_mundial_falso.PAISES)
+
+
+def castigar(app, hilos, duracion):
+    latencias, obsoletos, errores = [], [0], [0]
+    lock = threading.Lock()
+    fin = time.perf_counter() + duracion
+
+    def cliente(indice):
+        c = app.test_client()
+        propias, obs, err = [], 0, 0
+        i = indice
+        while time.perf_counter() < fin:
+            inicio = time.perf_counter()
+            cuerpo = c.get(f"/gini/{PAISES[i % len(PAISES)]}").get_json()
+            propias.append(time.perf_counter() - inicio)
+            obs += bool(cuerpo.get("obsoleto"))
+            err += not cuerpo["resultado"].startswith(("GINI recibido", "No hay datos"))
+            i += hilos
+        with lock:
+            latencias.extend(propias)
+            obsoletos[0] += obs
+            errores[0] += err
+
+    trabajadores = [threading.Thread(target=cliente, args=(i,)) for i in range(hilos)]
+    for t in trabajadores:
+        t.start()
+    for t in trabajadores:
+        t.join()
+    ordenadas = sorted(latencias)
+
+    def ms(p):
+        valor = percentil(ordenadas, p)
+        return valor * 1000 if valor is not None else float("nan")
+
+    return {
+        "peticiones": len(latencias),
+        "obsoletos": obsoletos[0],
+        "errores": errores[0],
+        "p50_ms": ms(50),
+        "p99_ms": ms(99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latencia durante una caída, con y sin circuito")
+    parser.add_argument("--falla", choices=["errores", "lentitud"], default="errores")
+    parser.add_argument("--latencia-caida", type=float, default=4.0,
+                        help="latencia del Banco Mundial en la fase de caída (--falla lentitud)")
+    parser.add_argument("--duracion", type=float, default=5.0, help="segundos por fase")
+    parser.add_argument("--hilos", type=int, default=8)
+    args = parser.parse_args()
+
+    servidor, url = banco_mundial_falso.iniciar_en_hilo(latencia=0.02)
+    os.environ.update({
+        "GINI_BANCO_MUNDIAL_URL": url,
+        "GINI_CACHE_TTL": "0.5",
+        "GINI_CACHE_TTL_OBSOLETO": "0",
+        "GINI_CIRCUITO_ABIERTO": str(args.duracion / 3),
+        "GINI_CIRCUITO_MINIMO": "5",
+        "GINI_CIRCUITO_VENTANA": "10",
+        "GINI_TIMEOUT_LECTURA": "5",
+        "GINI_PLAZO_TOTAL": "6",
+    })
+    os.environ.pop("GINI_DATASET", None)
+    os.environ.pop("GINI_CACHE_ARCHIVO", None)
+    import app as modulo_app
+    cliente = modulo_app.cliente_por_defecto()
+    circuito = cliente.circuito
+
+    caida = {"tasa_error": 1} if args.falla == "errores" else {"latencia": args.latencia_caida}
+    normal = {"tasa_error": 0, "latencia": 0.02}
+
+    print(f"{'circuito':<10}{'fase':<14}{'peticiones':>11}{'obsoletos':>10}{'errores':>9}"
+          f"{'p50 (ms)':>10}{'p99 (ms)':>10}")
+    for con_circuito in (False, True):
+        cliente.circuito = circuito if con_circuito else None
+        modulo_app.cache.entradas.clear()
+        for pais in PAISES:
+            modulo_app.obtener_gini(pais, "2020")
+        time.sleep(1.1)
+        for fase, control in (("normal", normal), ("caida", caida), ("recuperacion", normal)):
+            requests.get(url + "/_control", params=control)
+            r = castigar(modulo_app.app, args.hilos, args.duracion)
+            print(f"{'sí' if con_circuito else 'no':<10}{fase:<14}{r['peticiones']:>11}"
+                  f"{r['obsoletos']:>10}{r['errores']:>9}{r['p50_ms']:>10.1f}{r['p99_ms']:>10.1f}")
+    servidor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Compara response.json() contra el parser incremental (parser_bm.py) sobre una
+respuesta grabada del indicador completo, servida localmente.
+
+Mide tiempo hasta el primer resultado y pico de memoria (tracemalloc) para:
+  - completo:  response.json() y búsqueda lineal (como fetch_gini original)
+  - streaming: parseo incremental cortando apenas aparece el país
+  - streaming sin corte: parseo incremental de toda la respuesta (país inexistente)
+
+Uso:
+    python3 bench/bench_parser.py                        # payload sintético de 32500 filas
+    python3 bench/bench_parser.py --payload snapshot.json --pais Argentina
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import banco_mundial_falso
+from cliente_bm import ClienteBancoMundial
+from parser_bm import buscar_primero, registros_de_respuesta
+
+RUTA = "/v2/en/country/all/indicator/SI.POV.GINI"
+
+
+def payload_sintetico(filas, pais, posicion):
+    """Respuesta con `filas` registros y el país buscado en la fracción `posicion`"""
+    registros = []
+    indice_pais = int(filas * posicion)
+    for i in range(filas):
+        anio = 2023 - (i % 64)
+        if i == indice_pais:
+            item = banco_mundial_falso.registro("AR", 2020)
+            item["country"]["value"] = pais
+        else:
+            item = banco_mundial_falso.registro("XX", anio)
+            item["country"] = {"id": f"X{i // 64}", "value": f"Pais {i // 64}"}
+        registros.append(item)
+    meta = {"page": 1, "pages": 1, "per_page": filas, "total": filas,
+            "sourceid": "2", "lastupdated": "2024-01-01"}
+    return json.dumps([meta, registros]).encode("utf-8")
+
+
+def servir(payload):
+    class Manejador(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json;charset=utf-8")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            try:
+                self.wfile.write(payload)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+    # Ignora los resets del cliente que corta la descarga (streaming con corte)
+    servidor = banco_mundial_falso.ServidorBancoMundial(("127.0.0.1", 0), Manejador)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, f"http://127.0.0.1:{servidor.server_address[1]}"
+
+
+def completo(cliente, pais):
+    data = cliente.obtener_json(RUTA, {"format": "json"})
+    for item in data[1]:
+        if item["country"]["value"] == pais and item["value"] is not None:
+            return item["value"]
+    return None
+
+
+def streaming(cliente, pais):
+    respuesta = cliente.pedir(RUTA, {"format": "json"}, stream=True)
+    try:
+        item = buscar_primero(registros_de_respuesta(respuesta),
+                              lambda i: i["country"]["value"] == pais and i["value"] is not None)
+    finally:
+        respuesta.close()
+    return item["value"] if item else None
+
+
+def medir(funcion, cliente, pais, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion(cliente, pais)
+        tiempos.append(time.perf_counter() - inicio)
+
+    tracemalloc.start()
+    funcion(cliente, pais)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultado, min(tiempos), pico
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark response.json() vs parser incremental")
+    parser.add_argument("--payload", help="respuesta grabada (JSON) del indicador completo")
+    parser.add_argument("--filas", type=int, default=32500)
+    parser.add_argument("--pais", default="Argentina")
+    parser.add_argument("--posicion", type=float, default=0.1,
+                        help="fracción de la respuesta donde aparece el país (payload sintético)")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.payload:
+        with open(args.payload, "rb") as f:
+            payload = f.read()
+    else:
+        payload = payload_sintetico(args.filas, args.pais, args.posicion)
+
+    servidor, url = servir(payload)
+    cliente = ClienteBancoMundial(url)
+    print(f"Payload: {len(payload) / 1e6:.1f} MB")
+    print(f"{'modo':<22}{'resultado':>12}{'tiempo (ms)':>14}{'pico (MB)':>12}")
+    casos = [
+        ("completo", completo, args.pais),
+        ("streaming", streaming, args.pais),
+        ("streaming sin corte", streaming, "(inexistente)"),
+    ]
+    for nombre, funcion, pais in casos:
+        resultado, tiempo, pico = medir(funcion, cliente, pais, args.repeticiones)
+        print(f"{nombre:<22}{str(resultado):>12}{tiempo * 1000:>14.1f}{pico / 1e6:>12.2f}")
+    servidor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Prueba de carga de la app Flask contra el Banco Mundial falso.
+
+Levanta banco_mundial_falso.py (con latencia y errores configurables) y, por
+cada escenario, una instancia de app.py apuntando a él. La castiga con un
+número fijo de clientes concurrentes durante un tiempo dado y reporta
+throughput y latencias p50/p95/p99. Escenarios:
+
+  - cache frío (GINI_CACHE_CAPACIDAD=0) vs caliente (precargado)
+  - calculadora en proceso (ctypes) vs subproceso
+  - endpoint individual (/obtener_gini) vs lote (/obtener_gini_batch)
+
+Los resultados se guardan en JSON para comparar entre versiones.
+
+Uso:
+    python3 bench/carga.py --concurrencia 1 8 32 --duracion 10 --latencia 0.05
+    python3 bench/carga.py --escenarios caliente-ctypes-individual --motores numpy
+    python3 bench/carga.py --comparar bench/resultados/carga-anterior.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import requests
+
+DIR_APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, DIR_APP)
+import banco_mundial_falso
+from cliente_bm import percentil
+
+# app.py sin el reloader de debug, para poder terminar el proceso limpiamente
+LANZADOR = "import sys, app; app.app.run(host='127.0.0.1', port=int(sys.argv[1]), threaded=True)"
+
+ANIOS = [str(a) for a in range(2000, 2021)]
+TAMANO_LOTE = 5
+
+
+def puerto_libre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def consultas(endpoint):
+    """Lista cíclica de cuerpos JSON que recorre todos los países y años"""
+    paises = list(banco_mundial_falso.PAISES)
+    if endpoint == "individual":
+        return [{"pais": p, "anio": a} for a in ANIOS for p in paises]
+    grupos = [paises[i:i + TAMANO_LOTE] for i in range(0, len(paises), TAMANO_LOTE)]
+    return [{"paises": g, "anio": a} for a in ANIOS for g in grupos]
+
+
+def fallo_de_app(texto):
+    """La app responde 200 con un mensaje cuando falla el Banco Mundial o la calculadora"""
+    return texto.startswith(("No se pudo", "Error al"))
+
+
+def respuesta_ok(respuesta, endpoint):
+    if respuesta.status_code != 200:
+        return False
+    cuerpo = respuesta.json()
+    if endpoint == "individual":
+        return not fallo_de_app(cuerpo["resultado"])
+    return not any(fallo_de_app(t) for t in cuerpo["resultados"].values())
+
+
+def ruta(endpoint):
+    return "/obtener_gini" if endpoint == "individual" else "/obtener_gini_batch"
+
+
+def escenarios(motores):
+    lista = []
+    for endpoint in ("individual", "lote"):
+        for motor in motores:
+            for cache in ("frio", "caliente"):
+                lista.append({"nombre": f"{cache}-{motor}-{endpoint}",
+                              "cache": cache, "motor": motor, "endpoint": endpoint})
+    return lista
+
+
+class App:
+    """Instancia de app.py en un subproceso con su propio entorno"""
+
+    def __init__(self, url_bm, escenario):
+        self.puerto = puerto_libre()
+        self.url = f"http://127.0.0.1:{self.puerto}"
+        env = dict(os.environ)
+        for variable in ("GINI_DATASET", "GINI_CACHE_ARCHIVO"):
+            env.pop(variable, None)
+        env.update({
+            "GINI_BANCO_MUNDIAL_URL": url_bm,
+            "GINI_MOTOR": escenario["motor"],
+            "GINI_CACHE_CAPACIDAD": "0" if escenario["cache"] == "frio" else "4096",
+        })
+        self.proceso = subprocess.Popen([sys.executable, "-c", LANZADOR, str(self.puerto)],
+                                        cwd=DIR_APP, env=env,
+                                        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    def esperar(self, plazo=15):
+        limite = time.monotonic() + plazo
+        while time.monotonic() < limite:
+            if self.proceso.poll() is not None:
+                raise RuntimeError(f"app.py terminó con código {self.proceso.returncode}")
+            try:
+                return requests.get(self.url + "/estadisticas", timeout=1).json()
+            except requests.RequestException:
+                time.sleep(0.1)
+        raise RuntimeError("app.py no respondió a tiempo")
+
+    def cerrar(self):
+        self.proceso.terminate()
+        try:
+            self.proceso.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.proceso.kill()
+
+
+def precalentar(url, endpoint):
+    with requests.Session() as s:
+        for cuerpo in consultas(endpoint):
+            s.post(url + ruta(endpoint), json=cuerpo, timeout=30)
+
+
+def castigar(url, endpoint, concurrencia, duracion):
+    """`concurrencia` clientes en bucle cerrado durante `duracion` segundos"""
+    cuerpos = consultas(endpoint)
+    latencias = []
+    errores = [0]
+    lock = threading.Lock()
+    fin = time.perf_counter() + duracion
+
+    def cliente(indice):
+        propias, fallidas = [], 0
+        with requests.Session() as s:
+            i = indice
+            while time.perf_counter() < fin:
+                cuerpo = cuerpos[i % len(cuerpos)]
+                i += concurrencia
+                inicio = time.perf_counter()
+                try:
+                    r = s.post(url + ruta(endpoint), json=cuerpo, timeout=30)
+                    ok = respuesta_ok(r, endpoint)
+                except (requests.RequestException, ValueError):
+                    ok = False
+                propias.append(time.perf_counter() - inicio)
+                fallidas += not ok
+        with lock:
+            latencias.extend(propias)
+            errores[0] += fallidas
+
+    inicio = time.perf_counter()
+    hilos = [threading.Thread(target=cliente, args=(i,)) for i in range(concurrencia)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    total = time.perf_counter() - inicio
+
+    paises_por_peticion = 1 if endpoint == "individual" else TAMANO_LOTE
+    ordenadas = sorted(latencias)
+
+    def ms(p):
+        valor = percentil(ordenadas, p)
+        return valor * 1000 if valor is not None else float("nan")
+
+    return {
+        "peticiones": len(latencias),
+        "errores": errores[0],
+        "por_segundo": len(latencias) / total,
+        "paises_por_segundo": len(latencias) * paises_por_peticion / total,
+        "p50_ms": ms(50),
+        "p95_ms": ms(95),
+        "p99_ms": ms(99),
+        "max_ms": ms(100),
+    }
+
+
+def commit_actual():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=DIR_APP,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar(anteriores, actuales):
+    previos = {(r["escenario"], r["concurrencia"]): r for r in anteriores}
+    print(f"\n{'escenario':<32}{'conc':>6}{'pet/s':>18}{'p99 (ms)':>22}")
+    for r in actuales:
+        p = previos.get((r["escenario"], r["concurrencia"]))
+        if p is None:
+            continue
+        dp = (r["por_segundo"] / p["por_segundo"] - 1) * 100 if p["por_segundo"] else 0
+        dl = (r["p99_ms"] / p["p99_ms"] - 1) * 100 if p["p99_ms"] else 0
+        print(f"{r['escenario']:<32}{r['concurrencia']:>6}"
+              f"{p['por_segundo']:>8.0f} → {r['por_segundo']:<6.0f}{dp:+.0f}%"
+              f"{p['p99_ms']:>10.1f} → {r['p99_ms']:<6.1f}{dl:+.0f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga de la app GINI")
+    parser.add_argument("--concurrencia", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--duracion", type=float, default=10, help="segundos por medición")
+    parser.add_argument("--latencia", type=float, default=0.05,
+                        help="latencia del Banco Mundial falso en segundos")
+    parser.add_argument("--tasa-error", type=float, default=0.0,
+                        help="fracción de respuestas 502 del Banco Mundial falso")
+    parser.add_argument("--motores", nargs="+", default=["ctypes", "subproceso"])
+    parser.add_argument("--escenarios", nargs="+", default=None,
+                        help="nombres de escenario a correr (por defecto todos)")
+    parser.add_argument("--salida", default=None, help="archivo JSON de resultados")
+    parser.add_argument("--comparar", default=None, help="JSON de una corrida anterior")
+    args = parser.parse_args()
+
+    servidor, url_bm = banco_mundial_falso.iniciar_en_hilo(
+        latencia=args.latencia, tasa_error=args.tasa_error, semilla=1)
+    lista = [e for e in escenarios(args.motores)
+             if args.escenarios is None or e["nombre"] in args.escenarios]
+
+    resultados = []
+    print(f"{'escenario':<32}{'motor':>11}{'conc':>6}{'pet/s':>9}{'países/s':>10}"
+          f"{'p50':>8}{'p95':>8}{'p99':>8}{'errores':>9}{'upstream':>10}")
+    for escenario in lista:
+        app = App(url_bm, escenario)
+        try:
+            motor = app.esperar()["motor"]
+            if escenario["cache"] == "caliente":
+                precalentar(app.url, escenario["endpoint"])
+            for concurrencia in args.concurrencia:
+                antes = servidor.estado.peticiones
+                r = castigar(app.url, escenario["endpoint"], concurrencia, args.duracion)
+                r.update({"escenario": escenario["nombre"], "cache": escenario["cache"],
+                          "motor": motor, "endpoint": escenario["endpoint"],
+                          "concurrencia": concurrencia,
+                          "peticiones_upstream": servidor.estado.peticiones - antes})
+                resultados.append(r)
+                print(f"{r['escenario']:<32}{motor:>11}{concurrencia:>6}{r['por_segundo']:>9.0f}"
+                      f"{r['paises_por_segundo']:>10.0f}{r['p50_ms']:>8.1f}{r['p95_ms']:>8.1f}"
+                      f"{r['p99_ms']:>8.1f}{r['errores']:>9}{r['peticiones_upstream']:>10}")
+        except RuntimeError as e:
+            print(f"{escenario['nombre']:<32} error: {e}")
+        finally:
+            app.cerrar()
+    servidor.shutdown()
+
+    salida = args.salida or os.path.join(
+        DIR_APP, "bench", "resultados", time.strftime("carga-%Y%m%d-%H%M%S.json"))
+    os.makedirs(os.path.dirname(os.path.abspath(salida)), exist_ok=True)
+    with open(salida, "w", encoding="utf-8") as f:
+        json.dump({
+            "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": commit_actual(),
+            "python": platform.python_version(),
+            "parametros": {"duracion": args.duracion, "latencia": args.latencia,
+                           "tasa_error": args.tasa_error, "motores": args.motores},
+            "resultados": resultados,
+        }, f, indent=2)
+    print(f"\nResultados guardados en {salida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            comparar(json.load(f)["resultados"], resultados)
+
+
+if __name__ == "__main__":
+    main()
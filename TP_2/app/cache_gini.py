@@ -0,0 +1,278 @@
+"""
+Cache de dos niveles para las consultas al Banco Mundial.
+
+Nivel 1: LRU en memoria con TTL por entrada.
+Nivel 2 (opcional): archivo SQLite para que los datos sobrevivan reinicios y
+se compartan entre los workers de gunicorn.
+
+Cada entrada pasa por tres estados según su edad:
+  - fresca   (edad < ttl): se sirve directamente
+  - obsoleta (ttl <= edad < ttl + ttl_obsoleto): se sirve y se refresca en segundo plano
+  - vencida  (edad >= ttl + ttl_obsoleto): se vuelve a cargar de forma síncrona
+
+Si la carga falla, ultimo_valido() devuelve la entrada aunque esté vencida
+para servirla marcada como obsoleta.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class Entrada:
+    __slots__ = ("valor", "creado")
+
+    def __init__(self, valor, creado):
+        self.valor = valor
+        self.creado = creado
+
+
+class AlmacenDisco:
+    """Persistencia de las entradas en un archivo SQLite (una conexión por hilo)"""
+
+    def __init__(self, archivo):
+        self.archivo = archivo
+        self.local = threading.local()
+        directorio = os.path.dirname(os.path.abspath(archivo))
+        os.makedirs(directorio, exist_ok=True)
+        with self.conexion() as con:
+            con.execute("CREATE TABLE IF NOT EXISTS cache ("
+                        "clave TEXT PRIMARY KEY, valor TEXT, creado REAL)")
+
+    def conexion(self):
+        con = getattr(self.local, "con", None)
+        if con is None:
+            con = sqlite3.connect(self.archivo, timeout=5)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            self.local.con = con
+        return con
+
+    def leer(self, clave):
+        fila = self.conexion().execute(
+            "SELECT valor, creado FROM cache WHERE clave = ?", (clave,)).fetchone()
+        if fila is None:
+            return None
+        return Entrada(json.loads(fila[0]), fila[1])
+
+    def escribir(self, clave, entrada):
+        with self.conexion() as con:
+            con.execute("INSERT OR REPLACE INTO cache (clave, valor, creado) VALUES (?, ?, ?)",
+                        (clave, json.dumps(entrada.valor), entrada.creado))
+
+    def borrar(self, clave):
+        with self.conexion() as con:
+            con.execute("DELETE FROM cache WHERE clave = ?", (clave,))
+
+
+class ErrorCargaLote(Exception):
+    """
+    Falló `cargador_lote` en obtener_varios(). `resultados` tiene lo que ya se
+    había resuelto desde el cache, `faltantes` las claves que no se pudieron
+    cargar y `causa` el error del cargador.
+    """
+
+    def __init__(self, resultados, faltantes, causa):
+        super().__init__(f"{len(faltantes)} claves sin cargar: {causa!r}")
+        self.resultados = resultados
+        self.faltantes = faltantes
+        self.causa = causa
+
+
+class CacheGini:
+    def __init__(self, capacidad=256, ttl=86400, ttl_obsoleto=7 * 86400, archivo=None):
+        self.capacidad = capacidad
+        self.ttl = ttl
+        self.ttl_obsoleto = ttl_obsoleto
+        self.lock = threading.Lock()
+        self.entradas = OrderedDict()
+        self.disco = AlmacenDisco(archivo) if archivo else None
+        self.refrescando = set()
+        self.contadores = {
+            "aciertos": 0,
+            "aciertos_disco": 0,
+            "aciertos_obsoletos": 0,
+            "fallos": 0,
+            "desalojos": 0,
+            "refrescos": 0,
+            "errores_refresco": 0,
+            "respaldos": 0,
+        }
+
+    @property
+    def habilitado(self):
+        return self.capacidad > 0 and self.ttl > 0
+
+    def estado_de(self, entrada, ahora):
+        edad = ahora - entrada.creado
+        if edad < self.ttl:
+            return "fresca"
+        if edad < self.ttl + self.ttl_obsoleto:
+            return "obsoleta"
+        return "vencida"
+
+    def contar(self, nombre):
+        with self.lock:
+            self.contadores[nombre] += 1
+
+    def buscar(self, clave, ahora):
+        """Busca la entrada en memoria y, si no está, en disco (promoviéndola)"""
+        with self.lock:
+            entrada = self.entradas.get(clave)
+            if entrada is not None:
+                self.entradas.move_to_end(clave)
+        if entrada is not None and (self.disco is None or self.estado_de(entrada, ahora) == "fresca"):
+            return entrada, False
+        if self.disco is None:
+            return None, False
+        # Con varios workers compartiendo el archivo, otro proceso pudo haberla refrescado
+        en_disco = self.disco.leer(clave)
+        if en_disco is None or (entrada is not None and en_disco.creado <= entrada.creado):
+            return entrada, False
+        entrada = en_disco
+        if self.estado_de(entrada, ahora) == "vencida":
+            return None, False
+        self.insertar(clave, entrada, persistir=False)
+        return entrada, True
+
+    def obtener(self, clave, cargador):
+        """Devuelve el valor de `clave`, usando `cargador()` si no está en cache"""
+        if not self.habilitado:
+            self.contar("fallos")
+            return cargador()
+
+        ahora = time.time()
+        entrada, desde_disco = self.buscar(clave, ahora)
+        if entrada is not None:
+            estado = self.estado_de(entrada, ahora)
+            if estado == "fresca":
+                self.contar("aciertos_disco" if desde_disco else "aciertos")
+                return entrada.valor
+            if estado == "obsoleta":
+                self.contar("aciertos_obsoletos")
+                self.refrescar_en_segundo_plano([clave], lambda: {clave: cargador()})
+                return entrada.valor
+
+        self.contar("fallos")
+        valor = cargador()
+        self.guardar(clave, valor)
+        return valor
+
+    def obtener_varios(self, claves, cargador_lote):
+        """
+        Como obtener() pero para varias claves. Las que faltan se cargan con una
+        sola llamada a `cargador_lote(faltantes)`, que devuelve {clave: valor};
+        las claves que no vengan en ese dict quedan fuera del resultado. Si el
+        cargador falla se lanza ErrorCargaLote con los aciertos ya resueltos,
+        así un error en las faltantes no descarta las demás.
+        """
+        if not self.habilitado:
+            with self.lock:
+                self.contadores["fallos"] += len(claves)
+            try:
+                return cargador_lote(list(claves))
+            except Exception as e:
+                raise ErrorCargaLote({}, list(claves), e) from e
+
+        ahora = time.time()
+        resultados = {}
+        faltantes = []
+        obsoletas = []
+        for clave in claves:
+            entrada, desde_disco = self.buscar(clave, ahora)
+            estado = self.estado_de(entrada, ahora) if entrada is not None else "vencida"
+            if estado == "vencida":
+                faltantes.append(clave)
+                continue
+            resultados[clave] = entrada.valor
+            if estado == "obsoleta":
+                obsoletas.append(clave)
+                self.contar("aciertos_obsoletos")
+            else:
+                self.contar("aciertos_disco" if desde_disco else "aciertos")
+
+        if obsoletas:
+            self.refrescar_en_segundo_plano(obsoletas, lambda: cargador_lote(obsoletas))
+
+        if faltantes:
+            with self.lock:
+                self.contadores["fallos"] += len(faltantes)
+            try:
+                cargados = cargador_lote(faltantes)
+            except Exception as e:
+                raise ErrorCargaLote(resultados, faltantes, e) from e
+            for clave, valor in cargados.items():
+                self.guardar(clave, valor)
+                resultados[clave] = valor
+        return resultados
+
+    def ultimo_valido(self, clave):
+        """
+        Última entrada conocida de `clave` sin importar su edad (None si no hay).
+        Es el respaldo cuando el Banco Mundial no responde.
+        """
+        if not self.habilitado:
+            return None
+        with self.lock:
+            entrada = self.entradas.get(clave)
+        if self.disco is not None:
+            en_disco = self.disco.leer(clave)
+            if en_disco is not None and (entrada is None or en_disco.creado > entrada.creado):
+                entrada = en_disco
+        if entrada is not None:
+            self.contar("respaldos")
+        return entrada
+
+    def guardar(self, clave, valor):
+        if self.habilitado:
+            self.insertar(clave, Entrada(valor, time.time()))
+
+    def insertar(self, clave, entrada, persistir=True):
+        with self.lock:
+            self.entradas[clave] = entrada
+            self.entradas.move_to_end(clave)
+            while len(self.entradas) > self.capacidad:
+                self.entradas.popitem(last=False)
+                self.contadores["desalojos"] += 1
+        if persistir and self.disco is not None:
+            self.disco.escribir(clave, entrada)
+
+    def invalidar(self, clave):
+        with self.lock:
+            self.entradas.pop(clave, None)
+        if self.disco is not None:
+            self.disco.borrar(clave)
+
+    def refrescar_en_segundo_plano(self, claves, cargador):
+        """Recarga `claves` en un hilo; `cargador()` devuelve {clave: valor}"""
+        with self.lock:
+            claves = [c for c in claves if c not in self.refrescando]
+            if not claves:
+                return
+            self.refrescando.update(claves)
+
+        def tarea():
+            try:
+                for clave, valor in cargador().items():
+                    self.guardar(clave, valor)
+                self.contar("refrescos")
+            except Exception:
+                self.contar("errores_refresco")
+            finally:
+                with self.lock:
+                    self.refrescando.difference_update(claves)
+
+        threading.Thread(target=tarea, daemon=True).start()
+
+    def estadisticas(self):
+        with self.lock:
+            datos = dict(self.contadores)
+            datos["entradas"] = len(self.entradas)
+        datos["capacidad"] = self.capacidad
+        datos["ttl"] = self.ttl
+        datos["ttl_obsoleto"] = self.ttl_obsoleto
+        datos["persistente"] = self.disco is not None
+        return datos
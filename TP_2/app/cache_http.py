@@ -0,0 +1,168 @@
+"""
+Caching HTTP para la app Flask.
+
+- URLs de archivos estáticos con huella (?v=<hash del contenido>) y
+  Cache-Control inmutable de un año: si el archivo cambia, cambia la URL.
+- Compresión gzip (y brotli si el paquete `brotli` está instalado) de las
+  respuestas de texto; los estáticos comprimidos se guardan en memoria y las
+  respuestas en streaming se comprimen parte por parte.
+- Respuestas cacheables con ETag y Cache-Control que contestan 304 a
+  If-None-Match.
+"""
+
+import gzip
+import hashlib
+import os
+import threading
+import zlib
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+UN_ANIO = 365 * 24 * 3600
+TAMANO_MINIMO_COMPRESION = 512
+TIPOS_COMPRIMIBLES = {
+    "text/html", "text/css", "text/plain", "text/javascript",
+    "application/javascript", "application/json", "application/x-ndjson", "image/svg+xml",
+}
+
+_huellas = {}
+_comprimidos = {}
+_lock = threading.Lock()
+
+
+def huella(ruta):
+    """Hash corto del contenido del archivo, recalculado solo si cambia su mtime"""
+    try:
+        mtime = os.stat(ruta).st_mtime_ns
+    except OSError:
+        return None
+    with _lock:
+        guardada = _huellas.get(ruta)
+    if guardada and guardada[0] == mtime:
+        return guardada[1]
+    with open(ruta, "rb") as f:
+        valor = hashlib.sha256(f.read()).hexdigest()[:12]
+    with _lock:
+        _huellas[ruta] = (mtime, valor)
+    return valor
+
+
+def comprimir(datos, codificacion):
+    if codificacion == "br":
+        return brotli.compress(datos, quality=11 if len(datos) < 1 << 20 else 5)
+    return gzip.compress(datos, compresslevel=6, mtime=0)
+
+
+def comprimir_flujo(partes, codificacion):
+    """Comprime un cuerpo en streaming parte por parte, sin juntarlo en memoria"""
+    if codificacion == "br":
+        compresor = brotli.Compressor(quality=5)
+        procesar, vaciar, terminar = compresor.process, compresor.flush, compresor.finish
+    else:
+        # wbits=31: formato gzip (encabezado y CRC), como gzip.compress
+        compresor = zlib.compressobj(6, zlib.DEFLATED, 31)
+        procesar, terminar = compresor.compress, compresor.flush
+        vaciar = lambda: compresor.flush(zlib.Z_SYNC_FLUSH)
+    try:
+        for parte in partes:
+            if isinstance(parte, str):
+                parte = parte.encode()
+            # Se vacía el compresor en cada parte para que el cliente reciba cada línea sin esperar al final
+            datos = procesar(parte) + vaciar()
+            if datos:
+                yield datos
+        yield terminar()
+    finally:
+        # Cierra el generador original (libera el contexto de stream_with_context)
+        cerrar = getattr(partes, "close", None)
+        if cerrar is not None:
+            cerrar()
+
+
+def elegir_codificacion():
+    aceptadas = request.accept_encodings
+    if brotli is not None and aceptadas["br"]:
+        return "br"
+    if aceptadas["gzip"]:
+        return "gzip"
+    return None
+
+
+def respuesta_cacheable(respuesta, max_age, stale_while_revalidate=0):
+    """Agrega ETag débil y Cache-Control público, y responde 304 si el cliente ya la tiene"""
+    respuesta.add_etag(weak=True)
+    respuesta.cache_control.public = True
+    respuesta.cache_control.max_age = max_age
+    if stale_while_revalidate:
+        respuesta.cache_control.stale_while_revalidate = stale_while_revalidate
+    return respuesta.make_conditional(request)
+
+
+def registrar(app):
+    def url_estatica_con_huella(endpoint, valores):
+        if endpoint == "static" and "filename" in valores and "v" not in valores:
+            v = huella(os.path.join(app.static_folder, valores["filename"]))
+            if v:
+                valores["v"] = v
+
+    def encabezados_estaticos(respuesta):
+        if request.endpoint == "static" and request.args.get("v") and respuesta.status_code in (200, 304):
+            # La URL cambia con el contenido, así que puede cachearse para siempre
+            respuesta.cache_control.no_cache = None
+            respuesta.cache_control.public = True
+            respuesta.cache_control.max_age = UN_ANIO
+            respuesta.cache_control.immutable = True
+        return respuesta
+
+    def comprimir_respuesta(respuesta):
+        respuesta.vary.add("Accept-Encoding")
+        if (respuesta.status_code != 200 or "Content-Encoding" in respuesta.headers
+                or respuesta.mimetype not in TIPOS_COMPRIMIBLES):
+            return respuesta
+        codificacion = elegir_codificacion()
+        if codificacion is None:
+            return respuesta
+
+        if respuesta.is_streamed and not respuesta.direct_passthrough:
+            respuesta.response = comprimir_flujo(respuesta.response, codificacion)
+            respuesta.headers.pop("Content-Length", None)
+            respuesta.headers["Content-Encoding"] = codificacion
+            return respuesta
+
+        if request.endpoint == "static":
+            ruta = os.path.join(app.static_folder, request.view_args["filename"])
+            clave = (ruta, os.stat(ruta).st_mtime_ns, codificacion)
+            with _lock:
+                datos = _comprimidos.get(clave)
+            if datos is None:
+                with open(ruta, "rb") as f:
+                    datos = comprimir(f.read(), codificacion)
+                with _lock:
+                    _comprimidos[clave] = datos
+            # Se descarta el archivo abierto por send_file y se sirve la versión comprimida
+            cerrar = getattr(respuesta.response, "close", None)
+            if cerrar is not None:
+                cerrar()
+            respuesta.direct_passthrough = False
+        else:
+            original = respuesta.get_data()
+            if len(original) < TAMANO_MINIMO_COMPRESION:
+                return respuesta
+            datos = comprimir(original, codificacion)
+
+        respuesta.set_data(datos)
+        respuesta.headers["Content-Encoding"] = codificacion
+        # El ETag pasa a débil: identifica el mismo contenido aunque cambie la codificación
+        etag, debil = respuesta.get_etag()
+        if etag and not debil:
+            respuesta.set_etag(etag, weak=True)
+        return respuesta
+
+    app.url_defaults(url_estatica_con_huella)
+    app.after_request(comprimir_respuesta)
+    app.after_request(encabezados_estaticos)
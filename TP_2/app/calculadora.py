@@ -0,0 +1,147 @@
+"""
+Motores para ejecutar la calculadora GINI (sumar 1 al valor convertido a entero).
+
+- MotorCtypes: llama a `sumo_uno` (asm) y `float_to_int_plus_one` (C) desde
+  libgini.so dentro del mismo proceso, sin fork/exec.
+- MotorNumpy: la misma operación vectorizada con NumPy, sin código nativo.
+- MotorSubproceso: ejecuta el binario gini_exec/gini como antes.
+
+Todos exponen calcular_lote(valores) para procesar una serie completa de una
+vez; en ctypes se resuelve con una sola llamada a `sumo_uno_lote` (SSE2).
+
+El motor se elige con la variable de entorno GINI_MOTOR ("ctypes", "numpy" o
+"subproceso"). Si el motor pedido no está disponible se usa el subproceso.
+"""
+
+import ctypes
+import os
+import subprocess
+import sys
+from array import array
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+RUTA_LIB = os.path.join(DIRECTORIO, "libgini", "libgini.so")
+RUTA_BINARIO = os.path.join(DIRECTORIO, "gini_exec", "gini")
+
+
+def formatear(valor, resultado):
+    """Misma salida que imprime gini_exec/gini (interface.c)"""
+    return f"GINI recibido: {valor:.2f}\nResultado adicionando 1: {resultado}\n"
+
+
+def a_float32(valores):
+    """Buffer contiguo de float32; no copia si ya lo es (array('f') o ndarray float32)"""
+    if isinstance(valores, array) and valores.typecode == "f":
+        return valores
+    if getattr(valores, "dtype", None) == "float32" and valores.flags["C_CONTIGUOUS"]:
+        return valores
+    return array("f", valores)
+
+
+class MotorCtypes:
+    nombre = "ctypes"
+
+    def __init__(self, ruta_lib=RUTA_LIB):
+        self.lib = ctypes.CDLL(ruta_lib)
+        self.lib.sumo_uno.argtypes = [ctypes.c_float, ctypes.POINTER(ctypes.c_int)]
+        self.lib.sumo_uno.restype = None
+        self.lib.float_to_int_plus_one.argtypes = [ctypes.c_float]
+        self.lib.float_to_int_plus_one.restype = ctypes.c_int
+        self.lib.sumo_uno_lote.argtypes = [ctypes.POINTER(ctypes.c_float),
+                                           ctypes.POINTER(ctypes.c_int), ctypes.c_int]
+        self.lib.sumo_uno_lote.restype = None
+
+    def calcular(self, valor):
+        resultado = ctypes.c_int()
+        self.lib.sumo_uno(valor, ctypes.byref(resultado))
+        return resultado.value
+
+    def float_to_int_plus_one(self, valor):
+        return self.lib.float_to_int_plus_one(valor)
+
+    def ejecutar(self, valor):
+        # El binario recibe el valor como float de 32 bits (atof -> float)
+        valor = ctypes.c_float(float(valor)).value
+        return formatear(valor, self.calcular(valor))
+
+    def calcular_lote(self, valores):
+        """Aplica sumo_uno a todos los valores con una sola llamada; devuelve array('i')"""
+        entrada = a_float32(valores)
+        n = len(entrada)
+        salida = array("i", bytes(4 * n))
+        if n:
+            self.lib.sumo_uno_lote((ctypes.c_float * n).from_buffer(entrada),
+                                   (ctypes.c_int * n).from_buffer(salida), n)
+        return salida
+
+    def ejecutar_lote(self, valores):
+        entrada = a_float32(valores)
+        return [formatear(valor, resultado)
+                for valor, resultado in zip(entrada, self.calcular_lote(entrada))]
+
+
+class MotorNumpy:
+    nombre = "numpy"
+
+    def __init__(self):
+        import numpy
+        self.np = numpy
+
+    def calcular_lote(self, valores):
+        # rint redondea al par más cercano, igual que cvtss2si/fistp con el modo por defecto
+        entrada = self.np.asarray(valores, dtype=self.np.float32)
+        return self.np.rint(entrada).astype(self.np.int32) + 1
+
+    def calcular(self, valor):
+        return int(self.calcular_lote([valor])[0])
+
+    def ejecutar(self, valor):
+        valor = float(self.np.float32(valor))
+        return formatear(valor, self.calcular(valor))
+
+    def ejecutar_lote(self, valores):
+        entrada = self.np.asarray(valores, dtype=self.np.float32)
+        return [formatear(float(valor), int(resultado))
+                for valor, resultado in zip(entrada, self.calcular_lote(entrada))]
+
+
+class MotorSubproceso:
+    nombre = "subproceso"
+
+    def __init__(self, ruta_binario=RUTA_BINARIO):
+        self.ruta_binario = ruta_binario
+
+    def ejecutar(self, valor):
+        return subprocess.check_output([self.ruta_binario, str(valor)]).decode("utf-8")
+
+    def ejecutar_lote(self, valores):
+        # El binario acepta un solo valor por ejecución
+        return [self.ejecutar(valor) for valor in valores]
+
+    def calcular_lote(self, valores):
+        return array("i", (self.calcular(valor) for valor in valores))
+
+    def calcular(self, valor):
+        salida = self.ejecutar(valor).strip().split("\n")
+        return int(salida[-1].rsplit(":", 1)[1])
+
+
+MOTORES = {
+    MotorCtypes.nombre: MotorCtypes,
+    MotorNumpy.nombre: MotorNumpy,
+    MotorSubproceso.nombre: MotorSubproceso,
+}
+
+
+def crear_motor(nombre=None, ruta_binario=RUTA_BINARIO):
+    """Crea el motor pedido; si ctypes no está disponible vuelve al subproceso"""
+    nombre = nombre or os.environ.get("GINI_MOTOR", MotorCtypes.nombre)
+    if nombre not in MOTORES:
+        raise ValueError(f"Motor desconocido: {nombre} (opciones: {', '.join(MOTORES)})")
+    if nombre == MotorSubproceso.nombre:
+        return MotorSubproceso(ruta_binario)
+    try:
+        return MOTORES[nombre]()
+    except (OSError, AttributeError, ImportError) as e:
+        print(f"Motor {nombre} no disponible ({e}); usando {MotorSubproceso.nombre}", file=sys.stderr)
+        return MotorSubproceso(ruta_binario)
@@ -0,0 +1,113 @@
+"""
+Circuit breaker para las llamadas al Banco Mundial.
+
+  - cerrado:     las llamadas pasan; se registra el resultado de las últimas
+                 `ventana`. Si al menos `minimo_llamadas` fallaron o tardaron
+                 más de `umbral_latencia` en una proporción >= `umbral_errores`,
+                 se abre.
+  - abierto:     las llamadas fallan al instante con CircuitoAbierto durante
+                 `tiempo_abierto` segundos, sin tocar la red.
+  - semiabierto: pasan como mucho `sondas` llamadas a la vez para probar la
+                 API. Si `sondas` seguidas salen bien se cierra; si una falla,
+                 vuelve a abrirse.
+"""
+
+import threading
+import time
+from collections import deque
+
+from cliente_bm import ErrorBancoMundial
+
+
+class CircuitoAbierto(ErrorBancoMundial):
+    pass
+
+
+class Circuito:
+    def __init__(self, umbral_errores=0.5, minimo_llamadas=10, ventana=20,
+                 umbral_latencia=2.0, tiempo_abierto=10.0, sondas=1):
+        self.umbral_errores = umbral_errores
+        self.minimo_llamadas = minimo_llamadas
+        self.umbral_latencia = umbral_latencia
+        self.tiempo_abierto = tiempo_abierto
+        self.sondas = sondas
+        self.lock = threading.Lock()
+        self.resultados = deque(maxlen=ventana)
+        self.estado = "cerrado"
+        self.abierto_desde = 0.0
+        self.sondas_en_curso = 0
+        self.sondas_exitosas = 0
+        self.contadores = {"aperturas": 0, "rechazadas": 0, "lentas": 0, "sondas": 0}
+
+    def permitir(self):
+        """Lanza CircuitoAbierto si la llamada no debe hacerse; si no, devuelve si es una sonda"""
+        with self.lock:
+            if self.estado == "abierto":
+                if time.monotonic() - self.abierto_desde < self.tiempo_abierto:
+                    self.contadores["rechazadas"] += 1
+                    raise CircuitoAbierto("Circuito abierto: el Banco Mundial no responde")
+                self.estado = "semiabierto"
+                self.sondas_exitosas = 0
+            if self.estado == "semiabierto":
+                if self.sondas_en_curso >= self.sondas:
+                    self.contadores["rechazadas"] += 1
+                    raise CircuitoAbierto("Circuito semiabierto: esperando el resultado de la sonda")
+                self.sondas_en_curso += 1
+                self.contadores["sondas"] += 1
+                return True
+            return False
+
+    def registrar(self, sonda, duracion, exito):
+        lenta = duracion > self.umbral_latencia
+        ok = exito and not lenta
+        with self.lock:
+            if lenta:
+                self.contadores["lentas"] += 1
+            if sonda:
+                self.sondas_en_curso -= 1
+                if not ok:
+                    self.abrir()
+                    return
+                self.sondas_exitosas += 1
+                if self.sondas_exitosas >= self.sondas and self.estado == "semiabierto":
+                    self.estado = "cerrado"
+                    self.resultados.clear()
+                return
+            if self.estado != "cerrado":
+                return
+            self.resultados.append(ok)
+            fallidas = self.resultados.count(False)
+            if (len(self.resultados) >= self.minimo_llamadas
+                    and fallidas / len(self.resultados) >= self.umbral_errores):
+                self.abrir()
+
+    def abrir(self):
+        """Se llama con el lock tomado"""
+        if self.estado != "abierto":
+            self.contadores["aperturas"] += 1
+        self.estado = "abierto"
+        self.abierto_desde = time.monotonic()
+        self.resultados.clear()
+
+    def llamar(self, funcion, es_falla=lambda e: True):
+        """Ejecuta `funcion()` a través del circuito; `es_falla(e)` decide si una excepción cuenta"""
+        sonda = self.permitir()
+        inicio = time.monotonic()
+        try:
+            resultado = funcion()
+        except Exception as e:
+            self.registrar(sonda, time.monotonic() - inicio, not es_falla(e))
+            raise
+        except BaseException:
+            self.registrar(sonda, 0.0, True)
+            raise
+        self.registrar(sonda, time.monotonic() - inicio, True)
+        return resultado
+
+    def estadisticas(self):
+        with self.lock:
+            datos = dict(self.contadores)
+            datos["estado"] = self.estado
+            datos["ventana"] = len(self.resultados)
+            datos["fallidas_en_ventana"] = self.resultados.count(False)
+        return datos
@@ -0,0 +1,217 @@
+"""
+Cliente HTTP compartido para la API del Banco Mundial.
+
+Reutiliza conexiones keep-alive con un pool acotado (una Session de requests),
+aplica timeouts de conexión y lectura, reintenta errores transitorios con
+backoff exponencial con jitter dentro de un plazo total, y lleva estadísticas
+de latencia por llamada.
+
+Lo usan app.py y los scripts de las dos iteraciones.
+"""
+
+import os
+import random
+import threading
+import time
+from collections import deque
+
+import requests
+from requests.adapters import HTTPAdapter
+
+URL_BANCO_MUNDIAL = os.environ.get("GINI_BANCO_MUNDIAL_URL", "https://api.worldbank.org")
+
+# Códigos HTTP que indican una falla transitoria del servidor
+CODIGOS_REINTENTABLES = {429, 500, 502, 503, 504}
+
+
+class ErrorBancoMundial(Exception):
+    pass
+
+
+class PlazoAgotado(ErrorBancoMundial):
+    pass
+
+
+class RespuestaReintentable(Exception):
+    pass
+
+
+def percentil(ordenadas, p):
+    if not ordenadas:
+        return None
+    indice = min(len(ordenadas) - 1, int(round(p / 100 * (len(ordenadas) - 1))))
+    return ordenadas[indice]
+
+
+def falla_del_servidor(error):
+    """Un 4xx es un error del pedido, no indica que la API esté caída"""
+    causa = error.__cause__
+    respuesta = getattr(causa, "response", None)
+    return not (isinstance(causa, requests.HTTPError) and respuesta is not None
+                and respuesta.status_code < 500)
+
+
+class EstadisticasLatencia:
+    """Contadores y ventana de las últimas latencias (en segundos) por llamada"""
+
+    def __init__(self, ventana=1024):
+        self.lock = threading.Lock()
+        self.muestras = deque(maxlen=ventana)
+        self.llamadas = 0
+        self.errores = 0
+        self.reintentos = 0
+
+    def registrar(self, duracion, intentos, exito):
+        with self.lock:
+            self.llamadas += 1
+            self.reintentos += intentos - 1
+            if exito:
+                self.muestras.append(duracion)
+            else:
+                self.errores += 1
+
+    def snapshot(self):
+        with self.lock:
+            ordenadas = sorted(self.muestras)
+            datos = {
+                "llamadas": self.llamadas,
+                "errores": self.errores,
+                "reintentos": self.reintentos,
+            }
+        for p in (50, 95, 99):
+            valor = percentil(ordenadas, p)
+            datos[f"p{p}_ms"] = None if valor is None else round(valor * 1000, 2)
+        datos["max_ms"] = round(ordenadas[-1] * 1000, 2) if ordenadas else None
+        return datos
+
+
+class ClienteBancoMundial:
+    def __init__(self, url_base=URL_BANCO_MUNDIAL, tamano_pool=10, timeout_conexion=3.05,
+                 timeout_lectura=10.0, reintentos=2, backoff_base=0.2, backoff_max=2.0,
+                 plazo_total=15.0, circuito=None):
+        self.url_base = url_base.rstrip("/")
+        self.tamano_pool = tamano_pool
+        self.timeout_conexion = timeout_conexion
+        self.timeout_lectura = timeout_lectura
+        self.reintentos = reintentos
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.plazo_total = plazo_total
+        self.estadisticas = EstadisticasLatencia()
+        # Circuit breaker opcional (circuito.Circuito) alrededor de cada llamada
+        self.circuito = circuito
+
+        # pool_block=True: si todas las conexiones están ocupadas se espera en vez de abrir más
+        adaptador = HTTPAdapter(pool_connections=1, pool_maxsize=tamano_pool,
+                                pool_block=True, max_retries=0)
+        self.session = requests.Session()
+        self.session.mount("http://", adaptador)
+        self.session.mount("https://", adaptador)
+
+    def espera_backoff(self, intento):
+        # "Full jitter": uniforme entre 0 y el backoff exponencial acotado
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** intento)))
+
+    def obtener_json(self, ruta, params=None):
+        """GET a url_base + ruta devolviendo el JSON; reintenta dentro del plazo total"""
+        return self.decodificar(self.pedir(ruta, params))
+
+    @staticmethod
+    def decodificar(respuesta):
+        try:
+            return respuesta.json()
+        except ValueError as e:
+            raise ErrorBancoMundial(f"{respuesta.url}: JSON inválido ({e})") from e
+
+    def pedir(self, ruta, params=None, stream=False):
+        """
+        GET con reintentos dentro del plazo total; devuelve la respuesta de requests.
+        Con stream=True el cuerpo no se descarga: el llamador lo lee y cierra la respuesta.
+        """
+        if self.circuito is None:
+            return self.pedir_con_reintentos(ruta, params, stream)
+        return self.circuito.llamar(lambda: self.pedir_con_reintentos(ruta, params, stream),
+                                    es_falla=falla_del_servidor)
+
+    def pedir_con_reintentos(self, ruta, params=None, stream=False):
+        url = self.url_base + ruta
+        inicio = time.monotonic()
+        limite = inicio + self.plazo_total
+        ultimo_error = None
+        intentos = 0
+        agotado = False
+
+        for intento in range(self.reintentos + 1):
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                agotado = True
+                break
+            intentos += 1
+            timeout = (min(self.timeout_conexion, restante), min(self.timeout_lectura, restante))
+            try:
+                respuesta = self.session.get(url, params=params, timeout=timeout, stream=stream)
+                if respuesta.status_code in CODIGOS_REINTENTABLES:
+                    respuesta.close()
+                    raise RespuestaReintentable(f"HTTP {respuesta.status_code}")
+                respuesta.raise_for_status()
+            except (requests.ConnectionError, requests.Timeout, RespuestaReintentable) as e:
+                ultimo_error = e
+            except requests.RequestException as e:
+                # Un 4xx con stream=True deja la conexión tomada hasta cerrar la respuesta
+                if e.response is not None:
+                    e.response.close()
+                self.estadisticas.registrar(time.monotonic() - inicio, intentos, False)
+                raise ErrorBancoMundial(f"{url}: {e}") from e
+            else:
+                self.estadisticas.registrar(time.monotonic() - inicio, intentos, True)
+                return respuesta
+
+            if intento < self.reintentos:
+                espera = self.espera_backoff(intento)
+                if time.monotonic() + espera >= limite:
+                    agotado = True
+                    break
+                time.sleep(espera)
+
+        self.estadisticas.registrar(time.monotonic() - inicio, intentos, False)
+        if agotado or time.monotonic() >= limite:
+            raise PlazoAgotado(f"{url}: plazo de {self.plazo_total}s agotado ({ultimo_error})")
+        raise ErrorBancoMundial(f"{url}: {ultimo_error}") from ultimo_error
+
+    def cerrar(self):
+        self.session.close()
+
+
+_cliente = None
+_cliente_lock = threading.Lock()
+
+
+def cliente_por_defecto():
+    """Cliente compartido del proceso, configurado por variables de entorno"""
+    global _cliente
+    from circuito import Circuito
+
+    with _cliente_lock:
+        if _cliente is None:
+            circuito = None
+            if os.environ.get("GINI_CIRCUITO", "1") != "0":
+                circuito = Circuito(
+                    umbral_errores=float(os.environ.get("GINI_CIRCUITO_UMBRAL_ERRORES", "0.5")),
+                    minimo_llamadas=int(os.environ.get("GINI_CIRCUITO_MINIMO", "10")),
+                    ventana=int(os.environ.get("GINI_CIRCUITO_VENTANA", "20")),
+                    umbral_latencia=float(os.environ.get("GINI_CIRCUITO_LATENCIA", "2")),
+                    tiempo_abierto=float(os.environ.get("GINI_CIRCUITO_ABIERTO", "10")),
+                    sondas=int(os.environ.get("GINI_CIRCUITO_SONDAS", "1")),
+                )
+            # La URL se lee al crear el cliente, no al importar el módulo, para
+            # respetar un GINI_BANCO_MUNDIAL_URL fijado después del import
+            _cliente = ClienteBancoMundial(
+                url_base=os.environ.get("GINI_BANCO_MUNDIAL_URL", URL_BANCO_MUNDIAL),
+                tamano_pool=int(os.environ.get("GINI_HILOS", "10")),
+                timeout_conexion=float(os.environ.get("GINI_TIMEOUT_CONEXION", "3.05")),
+                timeout_lectura=float(os.environ.get("GINI_TIMEOUT_LECTURA", "10")),
+                reintentos=int(os.environ.get("GINI_REINTENTOS", "2")),
+                plazo_total=float(os.environ.get("GINI_PLAZO_TOTAL", "15")),
+                circuito=circuito,
+            )
+        return _cliente
@@ -0,0 +1,64 @@
+"""
+Coalescencia de llamadas concurrentes idénticas ("single-flight").
+
+Mientras hay una llamada en curso para una clave, los demás hilos que pidan la
+misma clave esperan ese resultado en vez de repetir el trabajo. El resultado no
+se guarda: en cuanto la llamada termina, la siguiente vuelve a ejecutarse (para
+eso está el cache).
+"""
+
+import threading
+
+
+class Llamada:
+    __slots__ = ("evento", "resultado", "error")
+
+    def __init__(self):
+        self.evento = threading.Event()
+        self.resultado = None
+        self.error = None
+
+
+class Coalescedor:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.en_curso = {}
+        self.ejecutadas = 0
+        self.coalescidas = 0
+
+    def hacer(self, clave, funcion):
+        """Ejecuta `funcion()` una sola vez por clave entre los hilos concurrentes"""
+        with self.lock:
+            llamada = self.en_curso.get(clave)
+            lider = llamada is None
+            if lider:
+                llamada = Llamada()
+                self.en_curso[clave] = llamada
+                self.ejecutadas += 1
+            else:
+                self.coalescidas += 1
+
+        if not lider:
+            llamada.evento.wait()
+            if llamada.error is not None:
+                raise llamada.error
+            return llamada.resultado
+
+        try:
+            llamada.resultado = funcion()
+        except BaseException as e:
+            llamada.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.en_curso[clave]
+            llamada.evento.set()
+        return llamada.resultado
+
+    def estadisticas(self):
+        with self.lock:
+            return {
+                "ejecutadas": self.ejecutadas,
+                "coalescidas": self.coalescidas,
+                "en_curso": len(self.en_curso),
+            }
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Dataset local del indicador SI.POV.GINI.
+
+Descarga una sola vez el indicador completo (country/all) o lo lee de un
+snapshot JSON guardado, y lo persiste en un archivo SQLite indexado por
+(país, año). Al cargarlo queda en un dict en memoria, así que cada consulta es
+O(1) y no toca la red.
+
+Uso:
+    python3 dataset_gini.py descargar --salida gini.sqlite [--snapshot gini.json]
+    python3 dataset_gini.py importar gini.json --salida gini.sqlite
+    python3 dataset_gini.py consultar AR 2020 --db gini.sqlite
+    GINI_DATASET=gini.sqlite python3 app.py
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import threading
+
+from cliente_bm import ClienteBancoMundial, ErrorBancoMundial
+
+RUTA_INDICADOR = "/v2/en/country/all/indicator/SI.POV.GINI"
+
+
+def descargar_paginas(cliente, per_page=32500):
+    """Descarga todas las páginas del indicador; devuelve la lista de respuestas crudas"""
+    paginas = []
+    pagina, total_paginas = 1, 1
+    while pagina <= total_paginas:
+        data = cliente.obtener_json(RUTA_INDICADOR, {
+            "format": "json", "per_page": str(per_page), "page": str(pagina)})
+        if not (data and len(data) > 1):
+            raise ErrorBancoMundial(f"Respuesta inesperada en la página {pagina}: {data}")
+        paginas.append(data)
+        total_paginas = int(data[0].get("pages") or 1)
+        pagina += 1
+    return paginas
+
+
+def registros_de_paginas(paginas):
+    for data in paginas:
+        for item in data[1] or []:
+            yield item
+
+
+def leer_snapshot(archivo):
+    """Acepta una respuesta cruda [meta, registros] o una lista de respuestas"""
+    with open(archivo, encoding="utf-8") as f:
+        contenido = json.load(f)
+    if contenido and isinstance(contenido[0], dict):
+        return [contenido]
+    return contenido
+
+
+class DatasetGini:
+    def __init__(self, valores, alias):
+        # valores: {(iso2, anio): valor o None}; alias: {ISO3 o nombre en mayúsculas: iso2}
+        self.valores = valores
+        self.alias = alias
+        self.lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    @classmethod
+    def desde_registros(cls, registros):
+        valores = {}
+        alias = {}
+        for item in registros:
+            iso2 = item["country"]["id"]
+            try:
+                anio = int(item["date"])
+            except (TypeError, ValueError):
+                continue
+            valores[(iso2, anio)] = item["value"]
+            if item.get("countryiso3code"):
+                alias[item["countryiso3code"].upper()] = iso2
+            alias[item["country"]["value"].upper()] = iso2
+        return cls(valores, alias)
+
+    @classmethod
+    def cargar(cls, archivo):
+        con = sqlite3.connect(f"file:{archivo}?mode=ro", uri=True)
+        try:
+            valores = {(pais, anio): valor for pais, anio, valor in
+                       con.execute("SELECT pais, anio, valor FROM gini")}
+            alias = dict(con.execute("SELECT alias, pais FROM alias"))
+        finally:
+            con.close()
+        return cls(valores, alias)
+
+    def guardar(self, archivo):
+        temporal = archivo + ".tmp"
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        con = sqlite3.connect(temporal)
+        try:
+            con.execute("CREATE TABLE gini (pais TEXT, anio INTEGER, valor REAL, "
+                        "PRIMARY KEY (pais, anio)) WITHOUT ROWID")
+            con.execute("CREATE TABLE alias (alias TEXT PRIMARY KEY, pais TEXT) WITHOUT ROWID")
+            con.executemany("INSERT INTO gini VALUES (?, ?, ?)",
+                            ((pais, anio, valor) for (pais, anio), valor in self.valores.items()))
+            con.executemany("INSERT INTO alias VALUES (?, ?)", self.alias.items())
+            con.commit()
+        finally:
+            con.close()
+        # Reemplazo atómico para que la app nunca lea un archivo a medio escribir
+        os.replace(temporal, archivo)
+
+    def codigo(self, pais):
+        pais = pais.upper()
+        return self.alias.get(pais, pais)
+
+    def buscar(self, pais, anio):
+        """Devuelve (encontrado, valor); encontrado=False si el dataset no tiene ese país/año"""
+        clave = (self.codigo(pais), int(anio))
+        encontrado = clave in self.valores
+        with self.lock:
+            if encontrado:
+                self.aciertos += 1
+            else:
+                self.fallos += 1
+        return encontrado, self.valores.get(clave)
+
+    def serie(self, pais, desde, hasta):
+        """Valores de `pais` entre los años dados (inclusive), en orden cronológico"""
+        codigo = self.codigo(pais)
+        return [(anio, self.valores[(codigo, anio)]) for anio in range(int(desde), int(hasta) + 1)
+                if (codigo, anio) in self.valores]
+
+    def estadisticas(self):
+        with self.lock:
+            return {"registros": len(self.valores), "aciertos": self.aciertos, "fallos": self.fallos}
+
+
+def cargar_si_existe(archivo):
+    if archivo and os.path.exists(archivo):
+        return DatasetGini.cargar(archivo)
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dataset local del índice GINI")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p = sub.add_parser("descargar", help="descarga el indicador completo del Banco Mundial")
+    p.add_argument("--salida", default="gini.sqlite")
+    p.add_argument("--snapshot", help="guardar también la respuesta cruda en este JSON")
+    p.add_argument("--url", default=None, help="URL base de la API")
+
+    p = sub.add_parser("importar", help="arma el dataset desde un snapshot JSON")
+    p.add_argument("snapshot")
+    p.add_argument("--salida", default="gini.sqlite")
+
+    p = sub.add_parser("consultar", help="consulta un país y año en el dataset")
+    p.add_argument("pais")
+    p.add_argument("anio", type=int)
+    p.add_argument("--db", default="gini.sqlite")
+
+    args = parser.parse_args()
+
+    if args.comando == "descargar":
+        opciones = {"timeout_lectura": 60.0, "plazo_total": 300.0}
+        if args.url:
+            opciones["url_base"] = args.url
+        paginas = descargar_paginas(ClienteBancoMundial(**opciones))
+        if args.snapshot:
+            with open(args.snapshot, "w", encoding="utf-8") as f:
+                json.dump(paginas, f)
+        dataset = DatasetGini.desde_registros(registros_de_paginas(paginas))
+        dataset.guardar(args.salida)
+        print(f"{len(dataset.valores)} registros guardados en {args.salida}")
+    elif args.comando == "importar":
+        dataset = DatasetGini.desde_registros(registros_de_paginas(leer_snapshot(args.snapshot)))
+        dataset.guardar(args.salida)
+        print(f"{len(dataset.valores)} registros guardados en {args.salida}")
+    else:
+        encontrado, valor = DatasetGini.cargar(args.db).buscar(args.pais, args.anio)
+        print(valor if encontrado else "Sin registro para ese país y año")
+
+
+if __name__ == "__main__":
+    main()
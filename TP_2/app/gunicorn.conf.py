@@ -0,0 +1,54 @@
+"""
+Configuración de gunicorn para servir la app en producción.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Levanta GINI_WORKERS procesos pre-forkeados con GINI_HILOS hilos cada uno.
+Los workers comparten los resultados a través del nivel 2 del cache
+(GINI_CACHE_ARCHIVO, SQLite en /dev/shm por defecto), así que un valor
+consultado por un worker ya está disponible para los demás.
+"""
+
+import multiprocessing
+import os
+import tempfile
+
+
+def _memoria_compartida():
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(base, "gini", "cache.sqlite")
+
+
+# Se define antes de que los workers importen la app, que la lee al crear el cache
+os.environ.setdefault("GINI_CACHE_ARCHIVO", _memoria_compartida())
+
+bind = os.environ.get("GINI_BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("GINI_WORKERS", str(multiprocessing.cpu_count() * 2 + 1)))
+worker_class = "gthread"
+threads = int(os.environ.get("GINI_HILOS", "10"))
+
+# Reciclado: cada worker se reemplaza tras atender unas cuantas peticiones (con
+# jitter para que no se reinicien todos juntos) y tiene tiempo de terminar las
+# que están en curso antes de cerrarse
+max_requests = int(os.environ.get("GINI_MAX_PETICIONES", "5000"))
+max_requests_jitter = int(os.environ.get("GINI_MAX_PETICIONES_JITTER", str(max_requests // 10)))
+graceful_timeout = int(os.environ.get("GINI_GRACEFUL_TIMEOUT", "30"))
+timeout = int(os.environ.get("GINI_TIMEOUT_WORKER", "60"))
+keepalive = 5
+
+# La app se importa en cada worker después del fork: así la Session de requests,
+# los hilos de refresco y las conexiones SQLite no se heredan del master
+preload_app = False
+
+accesslog = os.environ.get("GINI_ACCESSLOG", "-")
+access_log_format = '%(h)s "%(r)s" %(s)s %(b)s %(M)sms worker=%({x-worker}o)s'
+
+
+def post_fork(server, worker):
+    server.log.info("Worker %s listo (cache compartido: %s)", worker.pid, os.environ["GINI_CACHE_ARCHIVO"])
+
+
+def worker_exit(server, worker):
+    import cliente_bm
+    if cliente_bm._cliente is not None:
+        cliente_bm._cliente.cerrar()
@@ -0,0 +1,49 @@
+; calculator64.asm
+; Versión x86-64 (System V) de sumo_uno para armar libgini.so y llamarla
+; desde Python con ctypes dentro del mismo proceso.
+global sumo_uno:function
+global sumo_uno_lote:function
+section .text
+
+; void sumo_uno(float value, int* resultado)
+sumo_uno:
+    ; en x86-64 el float llega en xmm0 y el puntero en rdi (no hay parámetros en la pila)
+    cvtss2si eax, xmm0    ; convierte float a int redondeando según MXCSR (al más cercano, igual que fistp)
+    add eax, 1            ; le suma 1
+    mov [rdi], eax        ; guarda eax en *resultado
+    ret
+
+; void sumo_uno_lote(const float* valores, int* resultados, int n)
+; Aplica sumo_uno a un arreglo completo: valores en rdi, resultados en rsi, n en edx
+sumo_uno_lote:
+    mov ecx, 1
+    movd xmm1, ecx
+    pshufd xmm1, xmm1, 0  ; xmm1 = [1, 1, 1, 1]
+    xor eax, eax          ; rax = índice actual
+    movsxd rdx, edx       ; rdx = n (con signo, n <= 0 no procesa nada)
+    mov rcx, rdx
+    and rcx, -4           ; rcx = n redondeado hacia abajo a múltiplo de 4
+
+.bloque:                  ; 4 valores por iteración con SSE2
+    cmp rax, rcx
+    jge .resto
+    movups xmm0, [rdi + rax*4]
+    cvtps2dq xmm0, xmm0   ; 4 floats a 4 ints con el mismo redondeo que cvtss2si
+    paddd xmm0, xmm1      ; le suma 1 a cada uno
+    movdqu [rsi + rax*4], xmm0
+    add rax, 4
+    jmp .bloque
+
+.resto:                   ; los 0 a 3 valores que sobran, de a uno
+    cmp rax, rdx
+    jge .fin
+    cvtss2si r8d, dword [rdi + rax*4]
+    add r8d, 1
+    mov [rsi + rax*4], r8d
+    inc rax
+    jmp .resto
+
+.fin:
+    ret
+
+section .note.GNU-stack noalloc noexec nowrite progbits
@@ -0,0 +1,4 @@
+// gini.c
+// Parte en C de libgini.so: reutiliza la rutina de la primera iteración
+// para que también pueda llamarse en proceso desde Python.
+#include "../../iteracion 1/c/calculator.c"
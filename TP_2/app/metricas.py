@@ -0,0 +1,192 @@
+"""
+Métricas del servicio en formato de texto de Prometheus.
+
+- Contador e Histograma con etiquetas, seguros entre hilos.
+- `etapa(nombre)`: context manager que mide una etapa del camino caliente
+  (banco_mundial, parseo, calculadora, serializacion). Cada medición va al
+  histograma gini_etapa_segundos y, si hay una petición en curso, se acumula
+  en flask.g para armar el encabezado Server-Timing.
+
+Con gunicorn cada worker tiene sus propias métricas; /metrics muestra las del
+worker que atiende (ver X-Worker).
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+
+LIMITES_LATENCIA = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                    0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def formatear_etiquetas(nombres, valores, extra=""):
+    partes = [f'{n}="{escapar(v)}"' for n, v in zip(nombres, valores)]
+    if extra:
+        partes.append(extra)
+    return "{" + ",".join(partes) + "}" if partes else ""
+
+
+def formatear_numero(valor):
+    if valor == float("inf"):
+        return "+Inf"
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+class Contador:
+    tipo = "counter"
+
+    def __init__(self, nombre, ayuda, etiquetas=()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self.lock = threading.Lock()
+        self.valores = {}
+
+    def incrementar(self, *valores_etiquetas, cantidad=1):
+        with self.lock:
+            self.valores[valores_etiquetas] = self.valores.get(valores_etiquetas, 0) + cantidad
+
+    def lineas(self):
+        with self.lock:
+            valores = sorted(self.valores.items())
+        for etiquetas, valor in valores:
+            yield f"{self.nombre}{formatear_etiquetas(self.etiquetas, etiquetas)} {formatear_numero(valor)}"
+
+
+class Histograma:
+    tipo = "histogram"
+
+    def __init__(self, nombre, ayuda, etiquetas=(), limites=LIMITES_LATENCIA):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self.limites = tuple(limites) + (float("inf"),)
+        self.lock = threading.Lock()
+        # {valores de etiquetas: [cuentas por cubeta (no acumuladas), suma, total]}
+        self.series = {}
+
+    def observar(self, valor, *valores_etiquetas):
+        indice = next(i for i, limite in enumerate(self.limites) if valor <= limite)
+        with self.lock:
+            serie = self.series.get(valores_etiquetas)
+            if serie is None:
+                serie = self.series[valores_etiquetas] = [[0] * len(self.limites), 0.0, 0]
+            serie[0][indice] += 1
+            serie[1] += valor
+            serie[2] += 1
+
+    def lineas(self):
+        with self.lock:
+            series = sorted((e, [list(s[0]), s[1], s[2]]) for e, s in self.series.items())
+        for etiquetas, (cuentas, suma, total) in series:
+            acumulado = 0
+            for limite, cuenta in zip(self.limites, cuentas):
+                acumulado += cuenta
+                le = formatear_etiquetas(self.etiquetas, etiquetas, f'le="{formatear_numero(limite)}"')
+                yield f"{self.nombre}_bucket{le} {acumulado}"
+            base = formatear_etiquetas(self.etiquetas, etiquetas)
+            yield f"{self.nombre}_sum{base} {formatear_numero(suma)}"
+            yield f"{self.nombre}_count{base} {total}"
+
+
+class Registro:
+    def __init__(self):
+        self.metricas = []
+        self.recolectores = []
+
+    def contador(self, *args, **kwargs):
+        metrica = Contador(*args, **kwargs)
+        self.metricas.append(metrica)
+        return metrica
+
+    def histograma(self, *args, **kwargs):
+        metrica = Histograma(*args, **kwargs)
+        self.metricas.append(metrica)
+        return metrica
+
+    def recolector(self, funcion):
+        """Registra `funcion()` -> [(nombre, tipo, ayuda, etiqueta, {valor_etiqueta: valor})]
+        para exponer estadísticas que ya lleva otro componente (cache, cliente...)"""
+        self.recolectores.append(funcion)
+        return funcion
+
+    def exponer(self):
+        lineas = []
+        for metrica in self.metricas:
+            lineas.append(f"# HELP {metrica.nombre} {metrica.ayuda}")
+            lineas.append(f"# TYPE {metrica.nombre} {metrica.tipo}")
+            lineas.extend(metrica.lineas())
+        for funcion in self.recolectores:
+            for nombre, tipo, ayuda, etiqueta, valores in funcion():
+                lineas.append(f"# HELP {nombre} {ayuda}")
+                lineas.append(f"# TYPE {nombre} {tipo}")
+                for valor_etiqueta, valor in valores.items():
+                    etiquetas = formatear_etiquetas((etiqueta,), (valor_etiqueta,)) if etiqueta else ""
+                    lineas.append(f"{nombre}{etiquetas} {formatear_numero(valor)}")
+        return "\n".join(lineas) + "\n"
+
+
+registro = Registro()
+
+duracion_etapas = registro.histograma(
+    "gini_etapa_segundos", "Duración de cada etapa del cálculo", ("etapa",))
+duracion_peticiones = registro.histograma(
+    "gini_peticion_segundos", "Duración de las peticiones HTTP", ("ruta", "metodo"))
+peticiones = registro.contador(
+    "gini_peticiones_total", "Peticiones HTTP atendidas", ("ruta", "metodo", "codigo"))
+errores_etapas = registro.contador(
+    "gini_etapa_errores_total", "Etapas que terminaron con una excepción", ("etapa",))
+
+
+@contextmanager
+def etapa(nombre):
+    inicio = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        errores_etapas.incrementar(nombre)
+        raise
+    finally:
+        duracion = time.perf_counter() - inicio
+        duracion_etapas.observar(duracion, nombre)
+        if has_request_context():
+            tiempos = g.setdefault("tiempos_etapas", {})
+            tiempos[nombre] = tiempos.get(nombre, 0.0) + duracion
+
+
+def server_timing(total=None):
+    """Valor del encabezado Server-Timing con las etapas medidas en la petición actual"""
+    partes = [f"{nombre};dur={duracion * 1000:.2f}"
+              for nombre, duracion in g.get("tiempos_etapas", {}).items()]
+    if total is not None:
+        partes.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(partes)
+
+
+def registrar(app):
+    """Mide cada petición y agrega el encabezado Server-Timing"""
+
+    def iniciar():
+        g.inicio_peticion = time.perf_counter()
+
+    def terminar(respuesta):
+        inicio = g.get("inicio_peticion")
+        if inicio is None:
+            return respuesta
+        total = time.perf_counter() - inicio
+        # La regla (/gini/<pais>) y no la URL, para no crear una serie por país
+        ruta = request.url_rule.rule if request.url_rule is not None else "sin_ruta"
+        duracion_peticiones.observar(total, ruta, request.method)
+        peticiones.incrementar(ruta, request.method, str(respuesta.status_code))
+        respuesta.headers["Server-Timing"] = server_timing(total)
+        return respuesta
+
+    app.before_request(iniciar)
+    app.after_request(terminar)
+
@@ -0,0 +1,146 @@
+"""
+Parser incremental para respuestas del Banco Mundial con la forma
+[meta, [registro, registro, ...]].
+
+En vez de materializar todo el JSON con response.json(), decodifica los
+registros de a uno a medida que llegan los bytes, así se puede filtrar
+mientras se lee y cortar la descarga apenas aparece lo buscado.
+"""
+
+import codecs
+import json
+
+from cliente_bm import ErrorBancoMundial
+
+ESPACIOS = " \t\n\r"
+TAMANO_TROZO = 64 * 1024
+
+
+class ErrorFormato(ErrorBancoMundial):
+    pass
+
+
+class LectorRegistros:
+    """
+    Itera los registros de una respuesta a partir de trozos de bytes.
+    `meta` queda disponible en cuanto se parsea el primer elemento.
+    """
+
+    def __init__(self, trozos):
+        self.trozos = iter(trozos)
+        self.decodificador = codecs.getincrementaldecoder("utf-8")()
+        self.json = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.terminado = False
+        self.meta = None
+
+    def leer_mas(self):
+        """Agrega el próximo trozo al buffer; devuelve False si no hay más datos"""
+        if self.terminado:
+            return False
+        try:
+            trozo = next(self.trozos)
+        except StopIteration:
+            self.terminado = True
+            self.buffer = self.buffer[self.pos:] + self.decodificador.decode(b"", final=True)
+            self.pos = 0
+            return False
+        # Descartar lo ya consumido para que el buffer no crezca con la respuesta
+        self.buffer = self.buffer[self.pos:] + self.decodificador.decode(trozo)
+        self.pos = 0
+        return True
+
+    def siguiente_caracter(self):
+        """Salta espacios y devuelve el próximo carácter sin consumirlo (None al final)"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in ESPACIOS:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.leer_mas():
+                return None
+
+    def esperar(self, caracteres):
+        c = self.siguiente_caracter()
+        if c is None or c not in caracteres:
+            raise ErrorFormato(f"Se esperaba {caracteres!r} y llegó {c!r}")
+        self.pos += 1
+        return c
+
+    def valor(self):
+        """Decodifica un valor JSON completo, leyendo más datos si está cortado"""
+        self.siguiente_caracter()
+        while True:
+            try:
+                valor, fin = self.json.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as e:
+                if not self.leer_mas():
+                    raise ErrorFormato(f"JSON incompleto: {e}") from e
+                continue
+            # Un literal al borde del buffer (p. ej. "nu" de null) puede estar incompleto
+            if fin == len(self.buffer) and not self.terminado and self.buffer[fin - 1] not in "}]\"":
+                self.leer_mas()
+                continue
+            self.pos = fin
+            return valor
+
+    def __iter__(self):
+        self.esperar("[")
+        self.meta = self.valor()
+        if not isinstance(self.meta, dict):
+            raise ErrorFormato("La respuesta no empieza con un objeto de metadatos")
+        if self.siguiente_caracter() == "]":
+            # Respuesta de error de la API: [{"message": [...]}]
+            return
+        self.esperar(",")
+        if self.siguiente_caracter() == "n":
+            if self.valor() is not None:
+                raise ErrorFormato("Se esperaba null")
+            return
+        self.esperar("[")
+        if self.siguiente_caracter() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.valor()
+            if self.esperar(",]") == "]":
+                return
+
+
+def registros_de_respuesta(respuesta, tamano_trozo=TAMANO_TROZO):
+    """Registros de una respuesta de requests abierta con stream=True"""
+    return LectorRegistros(respuesta.iter_content(chunk_size=tamano_trozo))
+
+
+def iterar_paginas(cliente, ruta, params, tamano_trozo=TAMANO_TROZO):
+    """
+    Generador perezoso sobre todas las páginas de una consulta: pide la página
+    siguiente solo cuando el consumidor terminó la actual.
+    """
+    params = dict(params)
+    pagina = int(params.get("page", 1))
+    while True:
+        params["page"] = str(pagina)
+        respuesta = cliente.pedir(ruta, params, stream=True)
+        try:
+            lector = registros_de_respuesta(respuesta, tamano_trozo)
+            yield from lector
+        finally:
+            respuesta.close()
+        if lector.meta is None or pagina >= int(lector.meta.get("pages") or 0):
+            return
+        pagina += 1
+
+
+def buscar_primero(registros, condicion):
+    """Devuelve el primer registro que cumple la condición y deja de leer (corta la descarga)"""
+    try:
+        for item in registros:
+            if condicion(item):
+                return item
+        return None
+    finally:
+        cerrar = getattr(registros, "close", None)
+        if cerrar is not None:
+            cerrar()
@@ -1,3 +1,4 @@
 source venv/bin/activate
-pip install flask --break-system-packages
-python3 app.py
\ No newline at end of file
+pip install flask requests numpy gunicorn --break-system-packages
+make -C libgini || echo "No se pudo compilar libgini.so (¿falta nasm?); se usará gini_exec/gini"
+python3 app.py
@@ -1,14 +1,27 @@
-import requests
+import os
+import sys
 
-def fetch_gini(country="Argentina"):
-    url = 'https://api.worldbank.org/v2/en/country/all/indicator/SI.POV.GINI?format=json&date=2011:2020&per_page=32500&page=1'
-    response = requests.get(url)
-    data = response.json()
-    for item in data[1]:
-        if item["country"]["value"] == country and item["value"] is not None:
-            print(item["value"])
-            return
+# Cliente HTTP compartido con la app (pool keep-alive, timeouts y reintentos)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "app"))
+from cliente_bm import cliente_por_defecto
+from parser_bm import buscar_primero, iterar_paginas
 
-if __name__ == "__main__":
-    fetch_gini("Argentina")
+RUTA = '/v2/en/country/all/indicator/SI.POV.GINI'
+PARAMS = {'format': 'json', 'date': '2011:2020', 'per_page': '32500', 'page': '1'}
+
+def es_del_pais(country):
+    return lambda item: item["country"]["value"] == country and item["value"] is not None
 
+def fetch_gini(country="Argentina", streaming=True):
+    if streaming:
+        # Parsea mientras descarga y corta apenas encuentra el país
+        item = buscar_primero(iterar_paginas(cliente_por_defecto(), RUTA, PARAMS), es_del_pais(country))
+    else:
+        data = cliente_por_defecto().obtener_json(RUTA, PARAMS)
+        item = next(filter(es_del_pais(country), data[1]), None)
+    if item is not None:
+        print(item["value"])
+        return item["value"]
+
+if __name__ == "__main__":
+    fetch_gini("Argentina", streaming="--completo" not in sys.argv)
@@ -1,23 +1,28 @@
 #Obtengo el GINI de Arg para pasarselo a c y que se me devuelva el valor con un 1 sumado en assembler
-import requests
-import subprocess
+import os
+import sys
+
+# Motor de la calculadora y cliente HTTP compartidos con la app
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "app"))
+from calculadora import crear_motor
+from cliente_bm import cliente_por_defecto
 
 def obtener_gini_argentina():
-    url = "https://api.worldbank.org/v2/en/country/AR/indicator/SI.POV.GINI"
+    ruta = "/v2/en/country/AR/indicator/SI.POV.GINI"
     params = {
         "format": "json",
         "date": "2020",
         "per_page": "1"
     }
 
-    response = requests.get(url, params=params)
-    data = response.json()
+    data = cliente_por_defecto().obtener_json(ruta, params)
 
     if data and len(data) > 1 and data[1]:
         gini = data[1][0]["value"]
         print(f"GINI obtenido para Argentina: {gini}")
         if gini is not None:
-            subprocess.run(["./gini", str(gini)])
+            motor = crear_motor(ruta_binario="./gini")
+            print(motor.ejecutar(gini), end="")
         else:
             print("No hay datos disponibles para el año seleccionado.")
     else:
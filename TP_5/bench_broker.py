@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Throughput del broker con muchos suscriptores simulados.
+
+Levanta un SensorBroker en un socket Unix temporal, publica lotes sintéticos de
+registros (sin driver) y conecta `--clientes` suscriptores repartidos en
+`--procesos` procesos. Una fracción `--lentos` de los clientes duerme entre
+lecturas para forzar el descarte de los registros más viejos en sus colas.
+
+Reporta los registros publicados y entregados por segundo, los descartes de
+los clientes rápidos y de los lentos, y la latencia publicación -> cliente.
+
+Uso:
+    python3 bench_broker.py --clientes 50 --duracion 5
+    python3 bench_broker.py --clientes 200 --procesos 8 --tasa 100000 --lentos 0.1
+"""
+
+import argparse
+import multiprocessing
+import os
+import selectors
+import socket
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from sensor_app import SENSOR_RECORD_DTYPE
+from sensor_broker import SensorBroker
+
+
+def percentil(ordenadas, p):
+    return ordenadas[min(len(ordenadas) - 1, int(p / 100 * len(ordenadas)))] if ordenadas else 0
+
+
+def clientes(direccion, cantidad, lentos, duracion, resultados):
+    """Proceso con `cantidad` suscriptores; los primeros `lentos` duermen entre lecturas"""
+    selector = selectors.DefaultSelector()
+    estado = {}
+    for i in range(cantidad):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(direccion)
+        sock.setblocking(False)
+        selector.register(sock, selectors.EVENT_READ)
+        estado[sock] = {"lento": i < lentos, "bytes": 0, "resto": b"", "latencias": [], "proxima": 0.0}
+    fin = time.monotonic() + duracion
+    while time.monotonic() < fin:
+        leyo = False
+        for key, _ in selector.select(timeout=0.1):
+            e = estado[key.fileobj]
+            ahora = time.monotonic()
+            if e["lento"] and ahora < e["proxima"]:
+                continue
+            leyo = True
+            try:
+                datos = key.fileobj.recv(1 << 16)
+            except BlockingIOError:
+                continue
+            recibido = time.monotonic_ns()
+            e["bytes"] += len(datos)
+            datos = e["resto"] + datos
+            util = len(datos) - len(datos) % SENSOR_RECORD_DTYPE.itemsize
+            if util:
+                ultimo = np.frombuffer(datos[util - SENSOR_RECORD_DTYPE.itemsize:util], SENSOR_RECORD_DTYPE)
+                e["latencias"].append(recibido - int(ultimo["timestamp_ns"][0]))
+            e["resto"] = datos[util:]
+            if e["lento"]:
+                e["proxima"] = ahora + 0.05  # Un cliente lento lee 20 veces por segundo
+        if not leyo:
+            time.sleep(0.001)  # Solo había clientes lentos esperando su turno
+    for sock, e in estado.items():
+        resultados.put((e["lento"], e["bytes"] // SENSOR_RECORD_DTYPE.itemsize, e["latencias"]))
+        sock.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput del broker con muchos suscriptores")
+    parser.add_argument("--clientes", type=int, default=50)
+    parser.add_argument("--procesos", type=int, default=4)
+    parser.add_argument("--lentos", type=float, default=0.1, help="fracción de clientes lentos")
+    parser.add_argument("--duracion", type=float, default=5.0)
+    parser.add_argument("--lote", type=int, default=64, help="registros por lote publicado")
+    parser.add_argument("--tasa", type=float, default=0, help="registros/s a publicar (0: lo más rápido posible)")
+    parser.add_argument("--cola", type=int, default=4096, help="registros por suscriptor")
+    args = parser.parse_args()
+
+    direccion = os.path.join(tempfile.mkdtemp(), "broker.sock")
+    broker = SensorBroker(direccion, queue_records=args.cola)
+    broker.listen()
+    servidor = threading.Thread(target=broker.serve_forever, daemon=True)
+    servidor.start()
+
+    resultados = multiprocessing.Queue()
+    lentos = round(args.clientes * args.lentos)
+    procesos = []
+    for p in range(args.procesos):
+        cantidad = args.clientes // args.procesos + (p < args.clientes % args.procesos)
+        lentos_aqui = lentos // args.procesos + (p < lentos % args.procesos)
+        procesos.append(multiprocessing.Process(
+            target=clientes, args=(direccion, cantidad, lentos_aqui, args.duracion + 1.0, resultados)))
+    for proceso in procesos:
+        proceso.start()
+    while broker.summary()["connected"] < args.clientes:
+        time.sleep(0.05)
+
+    lote = np.zeros(args.lote, SENSOR_RECORD_DTYPE)
+    lote["value"] = np.arange(args.lote)
+    inicio = time.monotonic()
+    publicados = 0
+    while time.monotonic() - inicio < args.duracion:
+        lote["timestamp_ns"] = time.monotonic_ns()
+        broker.publish(lote.tobytes())
+        publicados += args.lote
+        if args.tasa:
+            espera = inicio + publicados / args.tasa - time.monotonic()
+            if espera > 0:
+                time.sleep(espera)
+    transcurrido = time.monotonic() - inicio
+
+    filas = [resultados.get() for _ in range(args.clientes)]
+    for proceso in procesos:
+        proceso.join()
+    resumen = broker.summary()
+    broker.stop()
+    servidor.join()
+    broker.close()
+
+    print(f"clientes: {args.clientes} ({lentos} lentos) en {args.procesos} procesos, "
+          f"lote {args.lote}, cola {args.cola}")
+    print(f"publicados: {publicados / transcurrido:,.0f} registros/s")
+    print(f"entregados: {sum(f[1] for f in filas) / transcurrido:,.0f} registros/s en total")
+    print(f"descartados por el broker: {resumen['dropped']:,}")
+    print(f"{'clientes':<10}{'recibidos/s (mín)':>19}{'recibidos/s (med)':>19}{'p50 (ms)':>10}{'p99 (ms)':>10}")
+    for nombre, lento in (("rápidos", False), ("lentos", True)):
+        grupo = [f for f in filas if f[0] == lento]
+        if not grupo:
+            continue
+        recibidos = sorted(f[1] / transcurrido for f in grupo)
+        latencias = sorted(l for f in grupo for l in f[2])
+        print(f"{nombre:<10}{recibidos[0]:>19,.0f}{percentil(recibidos, 50):>19,.0f}"
+              f"{percentil(latencias, 50) / 1e6:>10.2f}{percentil(latencias, 99) / 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Compara los buffers de SensorReader: deque(maxlen) contra RingBuffer (NumPy).
+
+Para cada capacidad llena el buffer y mide:
+  - agregar: costo por muestra de agregar lotes como los que entrega una lectura
+  - cuadro:  lo que hace la animación en cada cuadro; con deque, copiar con
+             list() y armar la lista de tiempos relativos; con RingBuffer,
+             tomar la vista y restar el inicio en NumPy
+  - memoria: bytes de los buffers de valores y tiempos
+
+Uso:
+    python3 bench_buffers.py
+    python3 bench_buffers.py --capacidades 100 100000 1000000 --lote 64
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from collections import deque
+
+from sensor_app import RingBuffer
+
+import numpy as np
+
+
+def medir(funcion, minimo=0.2):
+    """Segundos por llamada, repitiendo hasta juntar al menos `minimo` segundos"""
+    repeticiones = 1
+    while True:
+        inicio = time.perf_counter()
+        for _ in range(repeticiones):
+            funcion()
+        transcurrido = time.perf_counter() - inicio
+        if transcurrido >= minimo:
+            return transcurrido / repeticiones
+        repeticiones *= 2
+
+
+def con_deque(capacidad, lote):
+    tracemalloc.start()
+    valores, tiempos = deque(maxlen=capacidad), deque(maxlen=capacidad)
+    for i in range(capacidad):
+        valores.append(i % 50)
+        tiempos.append(float(i))
+    memoria = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    muestras = [25] * lote
+    ahora = [float(capacidad)] * lote
+
+    def agregar():
+        valores.extend(muestras)
+        tiempos.extend(ahora)
+
+    def cuadro():
+        t, v = list(tiempos), list(valores)
+        rel = [x - 1.0 for x in t]
+        return rel[-1], max(v), min(v)
+
+    return medir(agregar) / lote, medir(cuadro), memoria
+
+
+def con_ring(capacidad, lote):
+    tracemalloc.start()
+    valores, tiempos = RingBuffer(capacidad, np.int32), RingBuffer(capacidad)
+    valores.extend(np.arange(capacidad) % 50)
+    tiempos.extend(np.arange(capacidad, dtype=np.float64))
+    memoria = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    muestras = np.full(lote, 25, dtype=np.int32)
+    ahora = np.full(lote, float(capacidad))
+
+    def agregar():
+        valores.extend(muestras)
+        tiempos.extend(ahora)
+
+    def cuadro():
+        t, v = tiempos.view(), valores.view()
+        rel = t - 1.0
+        return rel[-1], v.max(), v.min()
+
+    return medir(agregar) / lote, medir(cuadro), memoria
+
+
+def main():
+    parser = argparse.ArgumentParser(description="deque contra RingBuffer")
+    parser.add_argument("--capacidades", type=int, nargs="+", default=[100, 10_000, 1_000_000])
+    parser.add_argument("--lote", type=int, default=32, help="muestras por lectura")
+    args = parser.parse_args()
+
+    print(f"{'buffer':<12}{'capacidad':>11}{'agregar (ns/m)':>16}{'cuadro (ms)':>13}{'memoria (MB)':>14}")
+    for capacidad in args.capacidades:
+        for nombre, funcion in (("deque", con_deque), ("RingBuffer", con_ring)):
+            agregar, cuadro, memoria = funcion(capacidad, args.lote)
+            print(f"{nombre:<12}{capacidad:>11}{agregar * 1e9:>16.1f}{cuadro * 1e3:>13.3f}"
+                  f"{memoria / 2**20:>14.2f}")
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Tiempo por cuadro del gráfico según la cantidad de muestras retenidas.
+
+Compara, sobre un canvas Agg fuera de pantalla del mismo tamaño que la
+ventana de SensorGUI:
+  - anterior: set_data con todos los puntos y marcadores, límites nuevos en
+              cada cuadro y dibujado completo de la figura (FuncAnimation con
+              blit=False)
+  - blit:     LinePlotter (decimación min/max por píxel, blitting y ejes
+              redibujados solo cuando cambian los límites)
+
+Con --grabacion usa las muestras de temperatura de una grabación de
+sensor_app.py --grabar en vez de una señal sintética.
+
+Uso:
+    python3 bench_render.py
+    python3 bench_render.py --muestras 100 1000000 --cuadros 30
+    python3 bench_render.py --grabacion grabacion/ --muestras 1000 100000
+"""
+
+import argparse
+import time
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from sensor_app import SENSOR_RECORD_DTYPE, LinePlotter, RingBuffer
+from sensor_recording import iter_recording
+
+import numpy as np
+
+
+def preparar(muestras, grabacion=None):
+    """Buffers con una señal de temperatura a 1 kHz, o con las últimas muestras de una grabación"""
+    tiempos, valores = RingBuffer(muestras), RingBuffer(muestras, np.int32)
+    if grabacion:
+        for registros in iter_recording(grabacion, SENSOR_RECORD_DTYPE):
+            temperatura = registros[registros["signal_type"] == 0]
+            tiempos.extend(temperatura["timestamp_ns"] / 1e9)
+            valores.extend(temperatura["value"])
+        if not len(valores):
+            raise SystemExit(f"{grabacion}: sin muestras de temperatura")
+        return tiempos, valores
+    t = np.arange(muestras) / 1000.0
+    tiempos.extend(t)
+    valores.extend(30 + 8 * np.sin(t / 5) + np.random.randint(-2, 3, muestras))
+    return tiempos, valores
+
+
+def nueva_figura():
+    fig = Figure(figsize=(14, 8))
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    ax.grid(True, alpha=0.3)
+    return fig, ax, canvas
+
+
+def medir_anterior(tiempos, valores, cuadros):
+    fig, ax, canvas = nueva_figura()
+    line, = ax.plot([], [], 'b-', linewidth=2, marker='o', markersize=4, alpha=0.8)
+    duraciones = []
+    for cuadro in range(cuadros):
+        inicio = time.perf_counter()
+        x, y = tiempos.view() + cuadro * 0.5, valores.view()
+        line.set_data(x, y)
+        margin_x = max(5, x[-1] * 0.05)
+        ax.set_xlim(-margin_x, x[-1] + margin_x)
+        margin_y = max(5, (y.max() - y.min()) * 0.2)
+        ax.set_ylim(max(0, y.min() - margin_y), min(60, y.max() + margin_y))
+        canvas.draw()
+        duraciones.append(time.perf_counter() - inicio)
+    return duraciones, cuadros
+
+
+def medir_blit(tiempos, valores, cuadros):
+    fig, ax, canvas = nueva_figura()
+    plotter = LinePlotter(fig, ax, canvas)
+    for cuadro in range(cuadros):
+        plotter.update([(tiempos.view() + cuadro * 0.5, valores.view())], (0, 60))
+    return list(plotter.frame_times), plotter.full_draws
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiempo por cuadro según las muestras retenidas")
+    parser.add_argument("--muestras", type=int, nargs="+", default=[100, 10_000, 1_000_000])
+    parser.add_argument("--cuadros", type=int, default=40)
+    parser.add_argument("--grabacion", metavar="DIR", help="usar datos de una grabación")
+    args = parser.parse_args()
+
+    print(f"{'modo':<10}{'muestras':>10}{'p50 (ms)':>10}{'max (ms)':>10}{'completos':>11}")
+    for muestras in args.muestras:
+        tiempos, valores = preparar(muestras, args.grabacion)
+        for nombre, funcion in (("anterior", medir_anterior), ("blit", medir_blit)):
+            duraciones, completos = funcion(tiempos, valores, args.cuadros)
+            duraciones.sort()
+            print(f"{nombre:<10}{muestras:>10}{duraciones[len(duraciones) // 2] * 1e3:>10.1f}"
+                  f"{duraciones[-1] * 1e3:>10.1f}{completos:>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Tasa de muestreo más alta que sostiene el camino driver -> lector -> buffers.
+
+Para cada período, de mayor a menor, lo configura en el driver con
+SENSOR_IOC_SET_PERIOD y lee durante --duracion segundos con SensorReader (o
+MmapSensorReader con --mmap), con el proceso fijado a un solo núcleo. Mide:
+  - ticks/s:  ciclos de simulación que avanzó el driver por segundo (si es
+              menor que la tasa nominal, el hrtimer no llega)
+  - perdidas: huecos en qemu_cycle entre registros consecutivos de un mismo
+              canal (buffer del driver pisado o anillo sobrescrito)
+  - cpu:      tiempo de CPU del proceso por muestra recibida
+Se detiene en el primer período con pérdidas y reporta el último sin ellas.
+Al terminar restaura el período que tenía el driver.
+
+Necesita el módulo cargado y permisos sobre /dev/sensor_drv. Con --emulador
+usa sensor_emulator.py en vez del driver: lanza uno por período, en otro
+núcleo si hay, y mide SensorReader en modo texto con una carga reproducible.
+
+Uso:
+    python3 bench_tasa.py
+    python3 bench_tasa.py --periodos 1000 500 200 100 --duracion 10 --mmap
+    python3 bench_tasa.py --todos --nucleo 2
+    python3 bench_tasa.py --emulador --periodos 1000 200 100 50 20
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from sensor_app import MmapSensorReader, SensorReader
+
+
+def con_contador(base):
+    """Lector que además cuenta, por canal, los ciclos recibidos y los huecos"""
+    class LectorContado(base):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.ciclos = {}  # canal -> [primer ciclo, último ciclo, perdidas]
+
+        def add_batch(self, batch, received_ns, times=None):
+            for canal in np.unique(batch["signal_type"]):
+                ciclos = batch["qemu_cycle"][batch["signal_type"] == canal].astype(np.int64)
+                estado = self.ciclos.setdefault(int(canal), [int(ciclos[0]), int(ciclos[0]) - 1, 0])
+                huecos = np.diff(ciclos, prepend=estado[1]) - 1
+                estado[1] = int(ciclos[-1])
+                estado[2] += int(huecos[huecos > 0].sum())
+            super().add_batch(batch, received_ns, times)
+    return LectorContado
+
+
+def lanzar_emulador(dispositivo, periodo_us, todos, nucleos):
+    """Arranca sensor_emulator.py en `nucleos` y espera a que cree el dispositivo"""
+    comando = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "sensor_emulator.py"),
+               "--dispositivo", dispositivo, "--periodo", str(periodo_us / 1000), "--semilla", "0"]
+    if todos:
+        comando.append("--todos")
+    emulador = subprocess.Popen(comando, stdout=subprocess.PIPE, text=True,
+                                preexec_fn=lambda: os.sched_setaffinity(0, nucleos))
+    emulador.stdout.readline()  # "Emulador en ..."
+    return emulador
+
+
+def medir(clase, dispositivo, periodo_us, duracion, historia, emulador=False):
+    lector = clase(dispositivo, history=historia)
+    if not emulador:
+        lector.set_period(periodo_us)
+        time.sleep(0.1)  # Que el período nuevo ya esté rigiendo
+
+    cpu, inicio = time.process_time(), time.monotonic()
+    lector.start_reading()
+    time.sleep(duracion)
+    lector.stop_reading()
+    cpu, transcurrido = time.process_time() - cpu, time.monotonic() - inicio
+
+    muestras = lector.stats["samples"]
+    ticks = max((ultimo - primero + 1 for primero, ultimo, _ in lector.ciclos.values()), default=0)
+    perdidas = sum(p for _, _, p in lector.ciclos.values())
+    return {
+        "ticks_s": ticks / transcurrido,
+        "muestras_s": muestras / transcurrido,
+        "perdidas": perdidas,
+        "cpu_us": cpu / muestras * 1e6 if muestras else float("nan"),
+        "cpu_pct": cpu / transcurrido * 100,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tasa máxima sin pérdidas del driver al lector")
+    parser.add_argument("--dispositivo", default="/dev/sensor_drv")
+    parser.add_argument("--periodos", type=int, nargs="+", metavar="US",
+                        default=[10000, 5000, 2000, 1000, 500, 200, 100])
+    parser.add_argument("--duracion", type=float, default=5.0, help="segundos por período")
+    parser.add_argument("--mmap", action="store_true", help="leer el anillo mapeado en vez de read()")
+    parser.add_argument("--todos", action="store_true", help="muestrear ambos canales en cada tick")
+    parser.add_argument("--historia", type=int, default=100_000, help="muestras retenidas por señal")
+    parser.add_argument("--nucleo", type=int, help="núcleo al que fijar el proceso (default: el primero disponible)")
+    parser.add_argument("--emulador", action="store_true", help="medir contra sensor_emulator.py, sin driver")
+    args = parser.parse_args()
+
+    if args.emulador:
+        if args.mmap:
+            sys.exit("El emulador no admite mmap()")
+        if args.dispositivo == "/dev/sensor_drv":
+            args.dispositivo = f"/tmp/sensor_drv_bench_{os.getpid()}"
+    elif not os.path.exists(args.dispositivo):
+        sys.exit(f"{args.dispositivo} no encontrado: cargar el driver con sudo insmod sensor_driver.ko")
+    disponibles = os.sched_getaffinity(0)
+    nucleo = args.nucleo if args.nucleo is not None else min(disponibles)
+    otros = disponibles - {nucleo} or {nucleo}  # Para el emulador
+
+    clase = con_contador(MmapSensorReader if args.mmap else SensorReader)
+    if not args.emulador:
+        control = SensorReader(args.dispositivo)
+        periodo_original = control.get_period()
+        control.send_command("all" if args.todos else "0")
+
+    lector = "mmap" if args.mmap else "read() de texto (emulador)" if args.emulador else "read() binario"
+    print(f"Lector: {lector}, núcleo {nucleo}, {'ambos canales' if args.todos else 'un canal'}")
+    print(f"{'período (us)':>13}{'nominal (Hz)':>14}{'ticks/s':>10}{'muestras/s':>12}"
+          f"{'perdidas':>10}{'cpu (us/m)':>12}{'cpu (%)':>9}")
+    mejor = None
+    os.sched_setaffinity(0, {nucleo})  # Lo heredan los hilos lectores
+    try:
+        for periodo in sorted(args.periodos, reverse=True):
+            if args.emulador:
+                emulador = lanzar_emulador(args.dispositivo, periodo, args.todos, otros)
+            try:
+                r = medir(clase, args.dispositivo, periodo, args.duracion, args.historia, args.emulador)
+            finally:
+                if args.emulador:
+                    emulador.terminate()
+                    emulador.wait()
+            print(f"{periodo:>13}{1e6 / periodo:>14.0f}{r['ticks_s']:>10.0f}{r['muestras_s']:>12.0f}"
+                  f"{r['perdidas']:>10}{r['cpu_us']:>12.1f}{r['cpu_pct']:>9.1f}", flush=True)
+            if r["perdidas"]:
+                break
+            mejor = (periodo, r["muestras_s"])
+    finally:
+        if not args.emulador:
+            control.set_period(periodo_original)
+
+    if mejor:
+        print(f"Sin pérdidas hasta {mejor[0]} us ({mejor[1]:.0f} muestras/s)")
+    else:
+        print("Hubo pérdidas ya con el período más largo")
+
+
+if __name__ == "__main__":
+    main()
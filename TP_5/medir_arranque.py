@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Mide cuánto tarda en arrancar sensor_app.py y qué módulos pesados carga.
+
+Cada caso corre en un intérprete nuevo (--repeticiones veces, se reporta la
+mediana):
+  - sin-gui:  import sensor_app y crear un HeadlessReader (lo que hace
+              --sin-gui antes de abrir el dispositivo)
+  - lectores: además SensorReader con sus buffers y estadísticas (NumPy)
+  - gui:      además load_gui() (matplotlib con TkAgg y tkinter)
+Columnas: el tiempo dentro del proceso (imports y construcción) y el del
+proceso entero, incluido el arranque del intérprete.
+
+Sale con código 1 si el caso sin-gui importa matplotlib, tkinter o NumPy, o
+si tarda más de --maximo-ms: así una regresión del arranque se nota.
+
+Uso:
+    python3 medir_arranque.py
+    python3 medir_arranque.py --repeticiones 10 --maximo-ms 100
+    python3 medir_arranque.py --detalle 15   # módulos más lentos (python -X importtime)
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+PESADOS = ("numpy", "matplotlib", "tkinter")
+
+CASOS = {
+    "sin-gui": "import sensor_app\n"
+               "sensor_app.HeadlessReader(os.devnull, output=open(os.devnull, 'w'))",
+    "lectores": "import sensor_app\n"
+                "sensor_app.SensorReader(os.devnull)",
+    "gui": "import sensor_app\n"
+           "sensor_app.load_gui()",
+}
+
+PLANTILLA = """\
+import json, os, sys, time
+inicio = time.perf_counter()
+{codigo}
+ms = (time.perf_counter() - inicio) * 1e3
+print(json.dumps({{"ms": ms, "pesados": [m for m in {pesados!r} if m in sys.modules]}}))
+"""
+
+
+def correr(codigo, opciones=()):
+    """Corre `codigo` en un intérprete nuevo; devuelve (resultado, ms del proceso, stderr)"""
+    programa = PLANTILLA.format(codigo=codigo, pesados=PESADOS)
+    inicio = time.perf_counter()
+    proceso = subprocess.run([sys.executable, *opciones, "-c", programa], cwd=DIRECTORIO,
+                             capture_output=True, text=True)
+    total = (time.perf_counter() - inicio) * 1e3
+    if proceso.returncode != 0:
+        error = proceso.stderr.strip().splitlines()
+        return None, total, error[-1] if error else f"código {proceso.returncode}"
+    return json.loads(proceso.stdout.splitlines()[-1]), total, proceso.stderr
+
+
+def medir(codigo, repeticiones):
+    """Mediana de los tiempos; None y el error si el caso no se puede correr"""
+    internos, totales = [], []
+    for _ in range(repeticiones):
+        resultado, total, error = correr(codigo)
+        if resultado is None:
+            return None, error
+        internos.append(resultado["ms"])
+        totales.append(total)
+    internos.sort()
+    totales.sort()
+    return {"ms": internos[len(internos) // 2], "proceso_ms": totales[len(totales) // 2],
+            "pesados": resultado["pesados"]}, None
+
+
+def detalle(codigo, cantidad):
+    """Los `cantidad` módulos con más tiempo acumulado según python -X importtime"""
+    resultado, _, salida = correr(codigo, ("-X", "importtime"))
+    if resultado is None:
+        print(f"No se pudo medir: {salida}")
+        return
+    modulos = []
+    for linea in salida.splitlines():
+        if not linea.startswith("import time:") or "cumulative" in linea:
+            continue
+        _, acumulado, nombre = linea[len("import time:"):].split("|")
+        modulos.append((int(acumulado), nombre.rstrip()))
+    print(f"{'acumulado (ms)':>15}  módulo")
+    for acumulado, nombre in sorted(modulos, reverse=True)[:cantidad]:
+        print(f"{acumulado / 1000:>15.1f}  {nombre}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiempo de arranque y módulos pesados de sensor_app")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--maximo-ms", type=float, default=150.0,
+                        help="tiempo máximo aceptable del caso sin-gui (dentro del proceso)")
+    parser.add_argument("--detalle", type=int, metavar="N",
+                        help="mostrar los N módulos más lentos del caso sin-gui")
+    args = parser.parse_args()
+
+    print(f"{'caso':<10}{'imports (ms)':>14}{'proceso (ms)':>14}  módulos pesados")
+    fallas = []
+    for caso, codigo in CASOS.items():
+        r, error = medir(codigo, args.repeticiones)
+        if r is None:
+            print(f"{caso:<10}{'-':>14}{'-':>14}  no disponible: {error}")
+            if caso == "sin-gui":
+                fallas.append(f"el caso sin-gui falló: {error}")
+            continue
+        print(f"{caso:<10}{r['ms']:>14.1f}{r['proceso_ms']:>14.1f}  {', '.join(r['pesados']) or '-'}")
+        if caso == "sin-gui":
+            if r["pesados"]:
+                fallas.append(f"--sin-gui importa {', '.join(r['pesados'])}")
+            if r["ms"] > args.maximo_ms:
+                fallas.append(f"--sin-gui tarda {r['ms']:.1f} ms (máximo {args.maximo_ms:.0f} ms)")
+
+    if args.detalle:
+        print()
+        detalle(CASOS["sin-gui"], args.detalle)
+
+    if fallas:
+        print()
+        for falla in fallas:
+            print(f"Regresión: {falla}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Mide la latencia muestra -> espacio de usuario y las syscalls de lectura con
+el esquema anterior (abrir, leer una línea, cerrar y dormir 0.1/0.5 s) y con
+el actual (un único fd y poll() que despierta cuando el driver tiene datos)
+y con el anillo mapeado por mmap(), que no hace ninguna syscall por muestra.
+Con --modo parseo compara, sin dispositivo, el costo de parsear un buffer
+lleno del driver (BUFFER_SIZE muestras) como texto y como registros binarios.
+
+La latencia se calcula con el último campo de cada registro (ktime_get_ns()
+en el driver) contra time.monotonic_ns(), que usan el mismo reloj.
+
+Uso:
+    python3 medir_lectura.py --duracion 30
+    python3 medir_lectura.py --modo poll --dispositivo /dev/sensor_drv
+    python3 medir_lectura.py --modo parseo
+
+Para contar todas las syscalls (incluidas las que agrega open() de Python):
+    strace -f -c -e trace=openat,read,close,poll,ppoll,clock_nanosleep python3 medir_lectura.py --modo anterior
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+from sensor_app import BUFFER_SIZE, SENSOR_RECORD, SENSOR_RECORD_DTYPE, MmapSensorReader, SensorReader
+
+
+def resumen(latencias_ns, syscalls, muestras, duracion):
+    latencias = sorted(latencias_ns)
+    datos = {
+        "muestras": muestras,
+        "syscalls": syscalls,
+        "syscalls_por_muestra": syscalls / muestras if muestras else None,
+        "syscalls_por_segundo": syscalls / duracion,
+    }
+    if latencias:
+        datos["p50_ms"] = latencias[len(latencias) // 2] / 1e6
+        datos["p99_ms"] = latencias[min(len(latencias) - 1, int(0.99 * len(latencias)))] / 1e6
+        datos["max_ms"] = latencias[-1] / 1e6
+    return datos
+
+
+def medir_anterior(dispositivo, duracion):
+    """Réplica del bucle original de read_data, con O_NONBLOCK para que un buffer
+    vacío se comporte como antes (read() devolvía 0 en vez de bloquear)"""
+    syscalls = 0
+    muestras = 0
+    latencias = []
+    fin = time.monotonic() + duracion
+    while time.monotonic() < fin:
+        fd = os.open(dispositivo, os.O_RDONLY | os.O_NONBLOCK)
+        try:
+            linea = os.read(fd, 4096)
+        except BlockingIOError:
+            linea = b""
+        os.close(fd)
+        syscalls += 3
+        recibido = time.monotonic_ns()
+        if linea:
+            # El driver entrega un registro por read(); un emulador puede entregar varios
+            for registro in linea.decode().split("\n"):
+                partes = registro.strip().split(",")
+                if len(partes) < 3:
+                    continue
+                muestras += 1
+                if len(partes) >= 7:
+                    latencias.append(recibido - int(partes[6]))
+            time.sleep(0.1)
+        else:
+            time.sleep(0.5)
+        syscalls += 1
+    return resumen(latencias, syscalls, muestras, duracion)
+
+
+def medir_poll(dispositivo, duracion):
+    lector = SensorReader(dispositivo)
+    lector.start_reading()
+    time.sleep(duracion)
+    lector.stop_reading()
+    stats = lector.latency_summary()
+    # Un open y un close más los poll() y read() del hilo lector
+    syscalls = 2 + stats["polls"] + stats["reads"]
+    return resumen(list(lector.latencies_ns), syscalls, stats["samples"], duracion)
+
+
+def medir_mmap(dispositivo, duracion):
+    lector = MmapSensorReader(dispositivo)
+    lector.start_reading()
+    time.sleep(duracion)
+    lector.stop_reading()
+    stats = lector.latency_summary()
+    # open, dos mmap, dos munmap y close, más un poll() con timeout por revisión del anillo
+    syscalls = 6 + stats["checks"]
+    return resumen(list(lector.latencies_ns), syscalls, stats["samples"], duracion)
+
+
+def medir_parseo(repeticiones=200):
+    """Parseo de un buffer lleno: BUFFER_SIZE líneas de texto (un read() por línea en modo
+    texto) contra BUFFER_SIZE registros de 32 bytes (un único read() en modo binario)"""
+    registros = [(i % 2, 20 + i % 15, 4295000000 + i, i, 1 + i % 3, 10**12 + i * 10**8)
+                 for i in range(BUFFER_SIZE)]
+    lineas = [f"{t},{v},{j},{c},{n},desktop,{ns}".encode() for t, v, j, c, n, ns in registros]
+    binario = b"".join(SENSOR_RECORD.pack(*r) for r in registros)
+    assert SensorReader.parse_text(lineas) == registros
+    assert np.frombuffer(binario, SENSOR_RECORD_DTYPE).tolist() == registros
+
+    casos = {
+        "texto": lambda: SensorReader.parse_text(lineas),
+        "binario": lambda: np.frombuffer(binario, SENSOR_RECORD_DTYPE)["value"].copy(),
+    }
+    print(f"{'formato':<10}{'bytes':>8}{'read()':>8}{'us/buffer':>11}{'ns/muestra':>12}")
+    for nombre, funcion in casos.items():
+        inicio = time.perf_counter()
+        for _ in range(repeticiones):
+            funcion()
+        por_buffer = (time.perf_counter() - inicio) / repeticiones
+        tamano = len(binario) if nombre == "binario" else sum(len(l) + 1 for l in lineas)
+        lecturas = 1 if nombre == "binario" else BUFFER_SIZE
+        print(f"{nombre:<10}{tamano:>8}{lecturas:>8}{por_buffer * 1e6:>11.1f}"
+              f"{por_buffer * 1e9 / BUFFER_SIZE:>12.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latencia y syscalls de lectura del sensor")
+    parser.add_argument("--dispositivo", default="/dev/sensor_drv")
+    parser.add_argument("--duracion", type=float, default=30.0, help="segundos por modo")
+    parser.add_argument("--modo", choices=["anterior", "poll", "mmap", "todos", "parseo"], default="todos")
+    args = parser.parse_args()
+
+    if args.modo == "parseo":
+        medir_parseo()
+        return
+
+    if not os.path.exists(args.dispositivo):
+        print(f"Error: {args.dispositivo} no encontrado (¿driver cargado?)")
+        sys.exit(1)
+
+    modos = {"anterior": medir_anterior, "poll": medir_poll, "mmap": medir_mmap}
+    elegidos = list(modos) if args.modo == "todos" else [args.modo]
+
+    print(f"{'modo':<10}{'muestras':>9}{'syscalls':>10}{'sysc/muestra':>14}{'sysc/s':>8}"
+          f"{'p50 (ms)':>10}{'p99 (ms)':>10}{'max (ms)':>10}")
+    for modo in elegidos:
+        r = modos[modo](args.dispositivo, args.duracion)
+        por_muestra = f"{r['syscalls_por_muestra']:.1f}" if r["syscalls_por_muestra"] else "-"
+        latencias = "".join(f"{r[k]:>10.2f}" if k in r else f"{'-':>10}"
+                            for k in ("p50_ms", "p99_ms", "max_ms"))
+        print(f"{modo:<10}{r['muestras']:>9}{r['syscalls']:>10}{por_muestra:>14}"
+              f"{r['syscalls_por_segundo']:>8.1f}{latencias}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,135 +2,869 @@
 """
 Aplicación de usuario para leer datos del sensor driver
 y graficarlos en tiempo real
+
+Con --sin-gui solo lee el driver y escribe las muestras como CSV, sin
+importar matplotlib, Tk ni NumPy: la interfaz y NumPy se cargan recién
+cuando se usan (load_gui, load_numpy).
 """
 
-import matplotlib
-matplotlib.use('TkAgg')  # Configurar backend antes de importar pyplot
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import matplotlib.animation as animation
 from collections import deque
+import argparse
+import errno
+import fcntl
+import math
+import mmap
+import select
+import socket
+import struct
 import time
 import threading
-import tkinter as tk
-from tkinter import ttk, messagebox
 import sys
 import os
 
+# Interfaz binaria del driver (ver sensor_ioctl.h)
+BUFFER_SIZE = 4096
+SENSOR_MODE_TEXT = 0
+SENSOR_MODE_BINARY = 1
+# struct sensor_record: signal_type, value, timestamp, qemu_cycle, noise_level, timestamp_ns
+SENSOR_RECORD = struct.Struct("<iiQiiQ")
+
+
+def _ioc(direction, magic, number, size):
+    return (direction << 30) | (size << 16) | (ord(magic) << 8) | number
+
+
+SENSOR_IOC_SET_MODE = _ioc(1, 's', 1, struct.calcsize("i"))   # _IOW('s', 1, int)
+SENSOR_IOC_GET_MODE = _ioc(2, 's', 2, struct.calcsize("i"))   # _IOR('s', 2, int)
+SENSOR_IOC_SET_PERIOD = _ioc(1, 's', 3, struct.calcsize("I"))  # _IOW('s', 3, __u32)
+SENSOR_IOC_GET_PERIOD = _ioc(2, 's', 4, struct.calcsize("I"))  # _IOR('s', 4, __u32)
+SENSOR_PERIOD_MIN_US = 100
+SENSOR_PERIOD_MAX_US = 10_000_000
+
+# Canales del driver; BOTH_CHANNELS es la vista con los dos a la vez
+CHANNELS = {
+    0: {"name": "Temperatura", "unit": "°C", "bounds": (0, 60), "color": "b"},
+    1: {"name": "Humedad", "unit": "%", "bounds": (0, 100), "color": "r"},
+}
+BOTH_CHANNELS = 2
+
+# Anillo compartido por mmap() (struct sensor_ring_header + registros)
+SENSOR_RING_MAGIC = 0x53454e53
+
+# Nombres que define load_numpy(); se pueden importar desde otros módulos
+# (from sensor_app import SENSOR_RECORD_DTYPE) y NumPy se carga en ese momento
+NUMPY_NAMES = ("np", "SENSOR_RING_HEADER", "SENSOR_RECORD_DTYPE")
+
+
+def load_numpy():
+    """Importa NumPy y define los dtypes del driver (solo la primera vez)"""
+    global np, SENSOR_RING_HEADER, SENSOR_RECORD_DTYPE
+    if "SENSOR_RECORD_DTYPE" in globals():
+        return
+    import numpy as np
+    SENSOR_RING_HEADER = np.dtype([("magic", "<u4"), ("version", "<u4"), ("capacity", "<u4"),
+                                   ("record_size", "<u4"), ("data_offset", "<u8"), ("head", "<u8")])
+    SENSOR_RECORD_DTYPE = np.dtype([("signal_type", "<i4"), ("value", "<i4"), ("timestamp", "<u8"),
+                                    ("qemu_cycle", "<i4"), ("noise_level", "<i4"),
+                                    ("timestamp_ns", "<u8")])
+
+
+def load_gui():
+    """Importa matplotlib (backend TkAgg) y tkinter; solo hace falta para SensorGUI"""
+    global plt, FigureCanvasTkAgg, tk, ttk, messagebox
+    import matplotlib
+    matplotlib.use('TkAgg')  # Configurar backend antes de importar pyplot
+    import matplotlib.pyplot as plt
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+    import tkinter as tk
+    from tkinter import ttk, messagebox
+
+
+def __getattr__(name):
+    if name in NUMPY_NAMES:
+        load_numpy()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class RingBuffer:
+    """
+    Buffer circular de capacidad fija sobre un arreglo NumPy preasignado.
+    Cada valor se escribe dos veces (en i y en i + capacidad), así los últimos
+    n siempre forman un tramo contiguo y view() devuelve una vista sin copiar.
+    La vista es válida hasta la próxima escritura: quien lee mientras otro
+    hilo escribe debe copiar lo que necesite bajo el mismo lock (ver
+    SensorReader.get_channel_data).
+    """
+    def __init__(self, capacity, dtype=None):
+        load_numpy()
+        self.capacity = capacity
+        self.buffer = np.zeros(2 * capacity, dtype=np.float64 if dtype is None else dtype)
+        self.count = 0  # Total de valores escritos desde el último clear()
+    
+    def __len__(self):
+        return min(self.count, self.capacity)
+    
+    def append(self, value):
+        i = self.count % self.capacity
+        self.buffer[i] = value
+        self.buffer[i + self.capacity] = value
+        self.count += 1
+    
+    def extend(self, values):
+        """Agrega un lote de valores; si excede la capacidad solo quedan los últimos"""
+        values = np.asarray(values, dtype=self.buffer.dtype)
+        total = len(values)
+        values = values[-self.capacity:]
+        n = len(values)
+        if n == 0:
+            return
+        start = (self.count + total - n) % self.capacity
+        first = min(n, self.capacity - start)
+        for offset in (0, self.capacity):
+            self.buffer[offset + start:offset + start + first] = values[:first]
+            self.buffer[offset:offset + n - first] = values[first:]
+        self.count += total
+    
+    def view(self, n=None):
+        """Los últimos n valores (todos por defecto), del más viejo al más nuevo"""
+        size = len(self) if n is None else min(n, len(self))
+        end = self.count % self.capacity + self.capacity
+        return self.buffer[end - size:end]
+    
+    def clear(self):
+        self.count = 0
+
+
 class SensorReader:
-    def __init__(self, device_path="/dev/sensor_drv"):
+    def __init__(self, device_path="/dev/sensor_drv", binary=True, history=100, recorder=None,
+                 batch_interval=0.005, stats_window=100):
         self.device_path = device_path
+        # Tiempo mínimo entre drenados: a períodos de 1 ms junta varias muestras por
+        # lectura en vez de despertar al hilo en cada tick. La primera muestra después
+        # de un rato sin datos se entrega en cuanto llega.
+        self.batch_interval = batch_interval
+        # SessionRecorder opcional: cada lote leído también se graba en disco
+        self.recorder = recorder
+        # Modo binario: cada read() drena el buffer del driver como registros de 32 bytes
+        self.binary = binary
         self.current_signal = 0
+        # Con el driver muestreando todos los canales, cambiar de señal es solo cambiar de vista
+        self.all_channels = False
         self.data_lock = threading.Lock()
-        
-        # Buffers para cada señal
-        self.signal1_data = deque(maxlen=100)  # Últimos 100 puntos
-        self.signal1_times = deque(maxlen=100)
-        self.signal2_data = deque(maxlen=100)
-        self.signal2_times = deque(maxlen=100)
+        self.create_buffers(history, stats_window)
         
         # Variables de control
         self.running = False
         self.reader_thread = None
         
+        # Pipe para despertar al hilo lector bloqueado en poll() al detener
+        self.wake_r = None
+        self.wake_w = None
+        
+        # Estadísticas de lectura: syscalls hechas y latencia muestra -> espacio de usuario
+        self.stats = {"polls": 0, "reads": 0, "samples": 0}
+        self.latencies_ns = deque(maxlen=1000)
+    
+    def create_buffers(self, history, stats_window):
+        """Buffers y estadísticas por señal (importa NumPy)"""
+        from sensor_stats import RollingStats
+        load_numpy()
+        # Buffers para cada señal: las últimas `history` muestras, preasignados
+        self.signal1_data = RingBuffer(history, np.int32)
+        self.signal1_times = RingBuffer(history)
+        self.signal2_data = RingBuffer(history, np.int32)
+        self.signal2_times = RingBuffer(history)
+        
+        # Estadísticas móviles por canal, actualizadas en el hilo lector; la
+        # interfaz lee el último resumen publicado en channel_summary
+        self.channel_stats = {c: RollingStats(stats_window) for c in CHANNELS}
+        self.channel_summary = {c: None for c in CHANNELS}
+        
+    def is_available(self):
+        """Si el origen de datos existe (el dispositivo, en este lector)"""
+        return os.path.exists(self.device_path)
+    
+    def send_command(self, command):
+        """Envía un comando al driver: "0", "1", "reset", "info" """
+        with open(self.device_path, 'w') as f:
+            f.write(command)
+    
+    def set_period(self, period_us):
+        """Cambia el período de muestreo del driver (en microsegundos) con un ioctl"""
+        fd = os.open(self.device_path, os.O_RDONLY | os.O_NONBLOCK)
+        try:
+            fcntl.ioctl(fd, SENSOR_IOC_SET_PERIOD, struct.pack("I", period_us))
+        finally:
+            os.close(fd)
+    
+    def get_period(self):
+        """Período de muestreo actual del driver, en microsegundos"""
+        fd = os.open(self.device_path, os.O_RDONLY | os.O_NONBLOCK)
+        try:
+            result = fcntl.ioctl(fd, SENSOR_IOC_GET_PERIOD, struct.pack("I", 0))
+        finally:
+            os.close(fd)
+        return struct.unpack("I", result)[0]
+    
+    def enable_all_channels(self):
+        """Pide al driver que muestree todos los canales; False si no lo soporta"""
+        try:
+            self.send_command("all")
+        except OSError:
+            return False
+        self.all_channels = True
+        return True
+    
     def set_signal(self, signal_type):
-        """Configura qué señal leer (0 o 1)"""
+        """
+        Configura qué señal mostrar (0, 1 o BOTH_CHANNELS). Si el driver muestrea
+        todos los canales no hace falta escribirle; si no, se le pide el canal.
+        Los registros llevan su canal, así que no se descarta nada al cambiar.
+        """
         try:
-            with open(self.device_path, 'w') as f:
-                f.write(str(signal_type))
+            if not self.all_channels:
+                if signal_type == BOTH_CHANNELS:
+                    if not self.enable_all_channels():
+                        raise OSError("El driver no soporta muestrear todos los canales")
+                else:
+                    self.send_command(str(signal_type))
             
             with self.data_lock:
                 self.current_signal = signal_type
-                # Limpiar datos de la señal anterior al cambiar
-                if signal_type == 0:
-                    self.signal1_data.clear()
-                    self.signal1_times.clear()
-                else:
-                    self.signal2_data.clear()
-                    self.signal2_times.clear()
-                    
             return True
         except Exception as e:
-            print(f"Error configurando señal: {e}")
+            print(f"Error configurando señal: {e}", file=sys.stderr)
+            return False
+    
+    def add_samples(self, records, received_ns):
+        """Agrega registros (signal_type, value, timestamp, cycle, noise, timestamp_ns) a los buffers"""
+        # Un timestamp_ns ausente (driver sin ese campo) queda en 0
+        batch = np.array([r[:5] + (r[5] or 0,) for r in records], dtype=SENSOR_RECORD_DTYPE)
+        self.add_batch(batch, received_ns)
+    
+    def add_binary(self, data, received_ns):
+        """Agrega registros binarios del driver (struct sensor_record, 32 bytes cada uno)"""
+        self.add_batch(np.frombuffer(data, SENSOR_RECORD_DTYPE), received_ns)
+    
+    def add_batch(self, batch, received_ns, times=None):
+        """
+        Agrega un arreglo de registros a los buffers. `times` son los instantes
+        (time.time()) de cada muestra; por defecto, el momento de la llegada.
+        Sin `received_ns` no se registran latencias.
+        """
+        if not len(batch):
+            return
+        current_time = time.time()
+        values = batch["value"]
+        is_signal1 = batch["signal_type"] == 0
+        if received_ns is not None:
+            # timestamp_ns viene de ktime_get_ns(), el mismo reloj que time.monotonic_ns()
+            sample_ns = batch["timestamp_ns"].astype(np.int64)
+            latencies = (received_ns - sample_ns)[sample_ns > 0]
+            if self.recorder is not None and not sample_ns.all():
+                batch = batch.copy()
+                batch["timestamp_ns"][sample_ns == 0] = received_ns
+        else:
+            latencies = np.empty(0, np.int64)
+        if self.recorder is not None:
+            self.recorder.write(batch)
+        masks = {0: is_signal1, 1: ~is_signal1}
+        # Solo el hilo lector actualiza las estadísticas; fuera del lock
+        summaries = {}
+        for channel, mask in masks.items():
+            if mask.any():
+                self.channel_stats[channel].extend(values[mask])
+                summaries[channel] = self.channel_stats[channel].summary()
+        with self.data_lock:
+            self.stats["samples"] += len(batch)
+            self.latencies_ns.extend(latencies[-self.latencies_ns.maxlen:].tolist())
+            self.channel_summary.update(summaries)
+            for mask, data, stamps in ((masks[0], self.signal1_data, self.signal1_times),
+                                       (masks[1], self.signal2_data, self.signal2_times)):
+                selected = values[mask]
+                data.extend(selected)
+                stamps.extend(times[mask] if times is not None else np.full(len(selected), current_time))
+    
+    @staticmethod
+    def parse_text(lines):
+        """Parsea líneas de texto del driver a registros; descarta las inválidas"""
+        # Formato: signal_type,value,timestamp,qemu_cycle,noise_level,environment[,timestamp_ns]
+        records = []
+        for line in lines:
+            parts = line.split(b',')
+            if len(parts) < 3:  # Al menos los primeros 3 campos son necesarios
+                continue
+            try:
+                cycle, noise = (int(parts[3]), int(parts[4])) if len(parts) >= 5 else (0, 0)
+                records.append((int(parts[0]), int(parts[1]), int(parts[2]), cycle, noise,
+                                int(parts[6]) if len(parts) >= 7 else None))
+            except ValueError:
+                continue
+        return records
+    
+    def enable_binary(self, fd):
+        """Pasa el descriptor a modo binario; False si el driver no lo soporta"""
+        try:
+            fcntl.ioctl(fd, SENSOR_IOC_SET_MODE, struct.pack("i", SENSOR_MODE_BINARY))
+            return True
+        except OSError:
             return False
     
     def read_data(self):
-        """Hilo para leer datos continuamente del driver"""
+        """
+        Hilo para leer datos del driver: mantiene un único fd abierto y duerme en
+        poll() hasta que el driver avisa que hay muestras; entonces las drena todas.
+        En modo binario un solo read() trae todo el buffer del driver. Después de
+        drenar espera `batch_interval` antes de volver a mirar, así a períodos
+        cortos cada lectura trae un lote.
+        """
+        try:
+            fd = os.open(self.device_path, os.O_RDONLY | os.O_NONBLOCK)
+        except FileNotFoundError:
+            print(f"Error: Dispositivo {self.device_path} no encontrado", file=sys.stderr)
+            return
+        except PermissionError:
+            print(f"Error: Sin permisos para leer {self.device_path}", file=sys.stderr)
+            return
+        
+        binary = self.binary and self.enable_binary(fd)
+        read_size = SENSOR_RECORD.size * BUFFER_SIZE if binary else 4096
+        
+        poller = select.poll()
+        poller.register(fd, select.POLLIN)
+        poller.register(self.wake_r, select.POLLIN)
+        wake_poller = select.poll()
+        wake_poller.register(self.wake_r, select.POLLIN)
+        pending = b""
+        
         try:
             while self.running:
-                try:
-                    with open(self.device_path, 'r') as f:
-                        line = f.readline().strip()
-                        
-                    if line:
-                        # Parsear formato del driver C: signal_type,value,timestamp,qemu_cycle,noise_level,environment
-                        parts = line.split(',')
-                        if len(parts) >= 3:  # Al menos los primeros 3 campos son necesarios
-                            try:
-                                signal_type = int(parts[0])
-                                value = int(parts[1])
-                                timestamp = int(parts[2])
-                                
-                                # Convertir timestamp a tiempo actual
-                                current_time = time.time()
-                                
-                                with self.data_lock:
-                                    if signal_type == 0:
-                                        self.signal1_data.append(value)
-                                        self.signal1_times.append(current_time)
-                                    else:
-                                        self.signal2_data.append(value)
-                                        self.signal2_times.append(current_time)
-                                        
-                            except ValueError:
-                                continue
-                    else:
-                        time.sleep(0.5)  # Esperar más tiempo si no hay datos
-                        continue
-                        
-                    time.sleep(0.1)  # Pequeña pausa para no saturar la CPU
-                        
-                except FileNotFoundError:
-                    print(f"Error: Dispositivo {self.device_path} no encontrado")
+                events = poller.poll()
+                self.stats["polls"] += 1
+                if not self.running:
                     break
-                except PermissionError:
-                    print(f"Error: Sin permisos para leer {self.device_path}")
+                if not any(ready_fd == fd for ready_fd, _ in events):
+                    continue
+                
+                # Drenar todo lo disponible sin bloquear
+                while True:
+                    self.stats["reads"] += 1
+                    try:
+                        chunk = os.read(fd, read_size)
+                    except BlockingIOError:
+                        break
+                    except OSError as e:
+                        if e.errno == errno.EINTR:
+                            continue
+                        raise
+                    if not chunk:
+                        break
+                    received_ns = time.monotonic_ns()
+                    pending += chunk
+                    if binary:
+                        usable = len(pending) - len(pending) % SENSOR_RECORD.size
+                        data, pending = pending[:usable], pending[usable:]
+                        self.add_binary(data, received_ns)
+                    else:
+                        *lines, pending = pending.split(b"\n")
+                        self.add_samples(self.parse_text(lines), received_ns)
+                    if binary and len(chunk) < read_size:
+                        break  # Se drenó todo el buffer del driver
+                
+                # Dejar que se acumulen muestras; stop_reading corta la espera
+                if self.batch_interval > 0 and wake_poller.poll(self.batch_interval * 1000):
                     break
-                except Exception as e:
-                    if self.running:
-                        print(f"Error leyendo datos: {e}")
-                    time.sleep(1)  # Esperar antes de reintentar
-                        
         except Exception as e:
-            print(f"Error crítico en lectura: {e}")
+            if self.running:
+                print(f"Error crítico en lectura: {e}", file=sys.stderr)
+        finally:
+            os.close(fd)
+    
+    def latency_summary(self):
+        """p50/p99/máximo en ms de la latencia muestra -> espacio de usuario"""
+        with self.data_lock:
+            latencies = sorted(self.latencies_ns)
+            stats = dict(self.stats)
+        if latencies:
+            def pct(p):
+                return latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] / 1e6
+            stats.update(p50_ms=pct(50), p99_ms=pct(99), max_ms=latencies[-1] / 1e6)
+        return stats
     
     def start_reading(self):
         """Inicia la lectura de datos"""
         if not self.running:
             self.running = True
+            self.wake_r, self.wake_w = os.pipe()
             self.reader_thread = threading.Thread(target=self.read_data)
             self.reader_thread.daemon = True
             self.reader_thread.start()
     
     def stop_reading(self):
         """Detiene la lectura de datos"""
+        if not self.running:
+            return
         self.running = False
+        os.write(self.wake_w, b"x")
         if self.reader_thread and self.reader_thread.is_alive():
             self.reader_thread.join(timeout=2)
+        os.close(self.wake_r)
+        os.close(self.wake_w)
+        self.wake_r = self.wake_w = None
+        if self.recorder is not None:
+            self.recorder.close()
     
-    def get_current_data(self):
-        """Obtiene los datos actuales para graficar"""
+    def get_channel_data(self, channel, buckets=None):
+        """
+        (tiempos, valores) de un canal, copiados bajo data_lock: el hilo lector
+        sigue escribiendo en los buffers, y una vista podría terminar con
+        tiempos y valores de muestras distintas. Con `buckets` se copia solo lo
+        que deja decimate_minmax, más la muestra más nueva.
+        """
         with self.data_lock:
-            if self.current_signal == 0:
-                return (list(self.signal1_times), list(self.signal1_data), 
-                       "Temperatura (°C)", "Señal 1: Temperatura")
+            if channel == 0:
+                times, values = self.signal1_times.view(), self.signal1_data.view()
             else:
-                return (list(self.signal2_times), list(self.signal2_data),
-                       "Humedad (%)", "Señal 2: Humedad")
+                times, values = self.signal2_times.view(), self.signal2_data.view()
+            if buckets is None:
+                return times.copy(), values.copy()
+            x, y = decimate_minmax(times, values, buckets)
+            if len(x) == len(times):
+                return x.copy(), y.copy()
+            # La decimación puede dejar afuera la última muestra, que usan el eje y el estado
+            return np.append(x, times[-1]), np.append(y, values[-1])
+    
+    def get_channel_count(self, channel):
+        """Muestras retenidas de un canal"""
+        with self.data_lock:
+            return len(self.signal1_data if channel == 0 else self.signal2_data)
+    
+    def get_channel_stats(self, channel):
+        """Último resumen de RollingStats del canal (None sin muestras), sin recorrer el buffer"""
+        with self.data_lock:
+            return self.channel_summary[channel]
+    
+    def get_current_data(self):
+        """Obtiene los datos actuales para graficar (copias de los buffers)"""
+        channel = 1 if self.current_signal == 1 else 0
+        info = CHANNELS[channel]
+        times, values = self.get_channel_data(channel)
+        return (times, values, f"{info['name']} ({info['unit']})",
+                f"Señal {channel + 1}: {info['name']}")
+
+class MmapSensorReader(SensorReader):
+    """
+    Lector sin read(): mapea el anillo del driver y consume las muestras nuevas
+    comparando la secuencia publicada (`head`) con la propia. Cada `interval`
+    segundos revisa el anillo; las muestras se leen directo de la memoria
+    compartida, sin syscalls ni copias desde el kernel.
+    """
+    def __init__(self, device_path="/dev/sensor_drv", interval=0.01, history=100, recorder=None,
+                 stats_window=100):
+        super().__init__(device_path, binary=False, history=history, recorder=recorder,
+                         stats_window=stats_window)
+        self.interval = interval
+        self.stats.update({"checks": 0, "overruns": 0, "lost": 0})
+    
+    def map_ring(self, fd):
+        """Mapea el anillo y devuelve (mapeo, encabezado, registros) como vistas NumPy"""
+        header_size = mmap.PAGESIZE
+        ring = mmap.mmap(fd, header_size, mmap.MAP_SHARED, mmap.PROT_READ)
+        header = np.frombuffer(ring, SENSOR_RING_HEADER, count=1)[0]
+        if header["magic"] != SENSOR_RING_MAGIC or header["record_size"] != SENSOR_RECORD_DTYPE.itemsize:
+            raise OSError(errno.EPROTO, "Formato de anillo desconocido")
+        capacity, offset = int(header["capacity"]), int(header["data_offset"])
+        del header
+        ring.close()
+        
+        size = offset + capacity * SENSOR_RECORD_DTYPE.itemsize
+        size = -(-size // mmap.PAGESIZE) * mmap.PAGESIZE
+        ring = mmap.mmap(fd, size, mmap.MAP_SHARED, mmap.PROT_READ)
+        header = np.frombuffer(ring, SENSOR_RING_HEADER, count=1)
+        records = np.frombuffer(ring, SENSOR_RECORD_DTYPE, count=capacity, offset=offset)
+        return ring, header, records
+    
+    def consume(self, header, records, cursor):
+        """Procesa las muestras en [cursor, head) y devuelve el nuevo cursor"""
+        capacity = len(records)
+        head = int(header["head"][0])
+        if head == cursor:
+            return cursor
+        if head - cursor > capacity:
+            # El lector quedó más de una vuelta atrás: se pierden las más viejas
+            self.stats["overruns"] += 1
+            self.stats["lost"] += head - cursor - capacity
+            cursor = head - capacity
+        
+        start, end = cursor % capacity, head % capacity
+        if start < end:
+            # Copiar: una vista del mapeo seguiría leyendo el anillo vivo después del chequeo
+            batch = records[start:end].copy()
+        else:
+            batch = np.concatenate((records[start:], records[:end]))
+        received_ns = time.monotonic_ns()
+        
+        # El timer pudo pisar registros mientras se copiaban: solo valen los que
+        # siguen sin sobrescribir según la secuencia publicada después de copiar
+        first_valid = int(header["head"][0]) - capacity + 1
+        if cursor < first_valid:
+            skip = first_valid - cursor
+            self.stats["lost"] += skip
+            batch = batch[skip:]
+        self.add_batch(batch, received_ns)
+        return head
+    
+    def read_data(self):
+        """Hilo lector: revisa el anillo cada `interval` segundos (o hasta stop_reading)"""
+        try:
+            fd = os.open(self.device_path, os.O_RDONLY)
+        except FileNotFoundError:
+            print(f"Error: Dispositivo {self.device_path} no encontrado", file=sys.stderr)
+            return
+        except PermissionError:
+            print(f"Error: Sin permisos para leer {self.device_path}", file=sys.stderr)
+            return
+        
+        try:
+            ring, header, records = self.map_ring(fd)
+        except (OSError, ValueError) as e:
+            print(f"Error mapeando {self.device_path}: {e}", file=sys.stderr)
+            os.close(fd)
+            return
+        
+        poller = select.poll()
+        poller.register(self.wake_r, select.POLLIN)
+        # Solo interesan las muestras posteriores al arranque
+        cursor = int(header["head"][0])
+        try:
+            while self.running:
+                self.stats["checks"] += 1
+                cursor = self.consume(header, records, cursor)
+                if poller.poll(self.interval * 1000):
+                    break
+        except Exception as e:
+            if self.running:
+                print(f"Error crítico en lectura: {e}", file=sys.stderr)
+        finally:
+            del header, records
+            ring.close()
+            os.close(fd)
+
+
+class ReplayReader(SensorReader):
+    """
+    Reproduce una grabación de SessionRecorder como si fuera el driver: entrega
+    las muestras según su timestamp_ns a `speed` veces la velocidad original, o
+    tan rápido como se pueda con speed=None. Los tiempos del gráfico son los de
+    la sesión grabada.
+    """
+    CHUNK = 4096  # Registros por lote en velocidad máxima
+    
+    def __init__(self, recording, speed=1.0, history=100, stats_window=100):
+        super().__init__(recording, binary=False, history=history, stats_window=stats_window)
+        self.speed = speed
+        self.stats.update({"finished": False})
+        # La grabación tiene los canales que se hayan grabado: cambiar de señal es cambiar de vista
+        self.all_channels = True
+    
+    def send_command(self, command):
+        """Una reproducción no tiene driver: los comandos se ignoran"""
+    
+    def wait(self, seconds):
+        """Duerme hasta `seconds` o hasta stop_reading; devuelve False si hay que detenerse"""
+        poller = select.poll()
+        poller.register(self.wake_r, select.POLLIN)
+        poller.poll(max(0.0, seconds) * 1000)
+        return self.running
+    
+    def read_data(self):
+        """Hilo lector: recorre la grabación respetando los tiempos originales"""
+        start_time = time.time()
+        start_clock = time.monotonic()
+        first_ns = None
+        from sensor_recording import iter_recording
+        try:
+            for records in iter_recording(self.device_path, SENSOR_RECORD_DTYPE):
+                for i in range(0, len(records), self.CHUNK):
+                    batch = records[i:i + self.CHUNK]
+                    if first_ns is None:
+                        first_ns = int(batch["timestamp_ns"][0])
+                    # Segundos desde el inicio de la sesión grabada
+                    offsets = (batch["timestamp_ns"].astype(np.int64) - first_ns) / 1e9
+                    while len(batch):
+                        if not self.running:
+                            return
+                        if self.speed is None:
+                            due = len(batch)
+                        else:
+                            elapsed = (time.monotonic() - start_clock) * self.speed
+                            due = int(np.searchsorted(offsets, elapsed, side="right"))
+                            if due == 0:
+                                # Dormir hasta la próxima muestra, revisando cada 100 ms
+                                self.wait(min(0.1, (offsets[0] - elapsed) / self.speed))
+                                continue
+                        self.add_batch(batch[:due], None, times=start_time + offsets[:due])
+                        batch, offsets = batch[due:], offsets[due:]
+            self.stats["finished"] = True
+        except Exception as e:
+            if self.running:
+                print(f"Error reproduciendo {self.device_path}: {e}", file=sys.stderr)
+
+
+def parse_address(address):
+    """"host:puerto" es TCP; cualquier otra cosa, la ruta de un socket Unix"""
+    host, sep, port = address.rpartition(":")
+    if sep and port.isdigit() and "/" not in address:
+        return socket.AF_INET, (host or "127.0.0.1", int(port))
+    return socket.AF_UNIX, address
+
+
+class BrokerSensorReader(SensorReader):
+    """
+    Cliente de sensor_broker.py. El broker es el único lector del driver y
+    reenvía a cada cliente el flujo de registros binarios de 32 bytes. Los
+    comandos ("0", "1", "reset") se mandan al broker, que los escribe en el
+    driver, así que afectan a todos los clientes.
+    """
+    def __init__(self, address, history=100, recorder=None, stats_window=100):
+        super().__init__(address, binary=True, history=history, recorder=recorder,
+                         stats_window=stats_window)
+        self.sock = None
+    
+    def is_available(self):
+        family, target = parse_address(self.device_path)
+        return family != socket.AF_UNIX or os.path.exists(target)
+    
+    def connect(self):
+        if self.sock is None:
+            family, target = parse_address(self.device_path)
+            sock = socket.socket(family, socket.SOCK_STREAM)
+            try:
+                sock.connect(target)
+            except OSError:
+                sock.close()
+                raise
+            self.sock = sock
+        return self.sock
+    
+    def send_command(self, command):
+        self.connect().sendall(command.encode() + b"\n")
+    
+    def read_data(self):
+        """Hilo lector: recibe registros del broker hasta stop_reading o hasta que cierre"""
+        try:
+            sock = self.connect()
+        except OSError as e:
+            print(f"Error conectando al broker {self.device_path}: {e}", file=sys.stderr)
+            return
+        
+        poller = select.poll()
+        poller.register(sock, select.POLLIN)
+        poller.register(self.wake_r, select.POLLIN)
+        pending = b""
+        try:
+            while self.running:
+                poller.poll()
+                self.stats["polls"] += 1
+                if not self.running:
+                    break
+                chunk = sock.recv(SENSOR_RECORD.size * BUFFER_SIZE)
+                self.stats["reads"] += 1
+                if not chunk:
+                    print("El broker cerró la conexión", file=sys.stderr)
+                    break
+                received_ns = time.monotonic_ns()
+                pending += chunk
+                usable = len(pending) - len(pending) % SENSOR_RECORD.size
+                self.add_binary(pending[:usable], received_ns)
+                pending = pending[usable:]
+        except Exception as e:
+            if self.running:
+                print(f"Error crítico en lectura: {e}", file=sys.stderr)
+        finally:
+            sock.close()
+            self.sock = None
+
+
+class HeadlessReader(SensorReader):
+    """
+    Lector sin interfaz: en vez de guardar las muestras en buffers las escribe
+    como líneas CSV en `output`, una por muestra. Decodifica los registros
+    binarios con struct, así que no importa NumPy; sirve para registrar datos
+    en un servidor sin pantalla.
+    """
+    HEADER = "signal_type,value,timestamp,qemu_cycle,noise_level,timestamp_ns\n"
+    
+    def __init__(self, device_path="/dev/sensor_drv", output=None, binary=True, batch_interval=0.005):
+        super().__init__(device_path, binary=binary, batch_interval=batch_interval)
+        self.output = output if output is not None else sys.stdout
+        self.output_closed = False  # La salida se cerró (p. ej. `| head`)
+        self.output.write(self.HEADER)
+    
+    def create_buffers(self, history, stats_window):
+        """Sin buffers ni estadísticas móviles: cada muestra va directo a la salida"""
+    
+    def add_binary(self, data, received_ns):
+        self.add_samples(list(SENSOR_RECORD.iter_unpack(data)), received_ns)
+    
+    def add_samples(self, records, received_ns):
+        """Escribe los registros; un timestamp_ns ausente se reemplaza por la llegada"""
+        if not records or self.output_closed:
+            return
+        lines = []
+        latencies = []
+        for signal_type, value, timestamp, cycle, noise, sample_ns in records:
+            if sample_ns:
+                latencies.append(received_ns - sample_ns)
+            lines.append(f"{signal_type},{value},{timestamp},{cycle},{noise},{sample_ns or received_ns}\n")
+        try:
+            self.output.write("".join(lines))
+            self.output.flush()
+        except BrokenPipeError:
+            self.output_closed = True
+            return
+        with self.data_lock:
+            self.stats["samples"] += len(records)
+            self.latencies_ns.extend(latencies[-self.latencies_ns.maxlen:])
+
+
+def decimate_minmax(x, y, buckets):
+    """
+    Reduce (x, y) a unos 2 * buckets puntos: el mínimo y el máximo de cada tramo,
+    en orden temporal. A diferencia de tomar 1 de cada n, conserva los picos.
+    """
+    load_numpy()
+    n = len(y)
+    if buckets <= 0 or n <= 2 * buckets:
+        return x, y
+    size = n // buckets
+    head = n - size * buckets  # Las más viejas que no completan un tramo forman uno aparte
+    
+    rows = y[head:].reshape(buckets, size)
+    imin, imax = rows.argmin(axis=1), rows.argmax(axis=1)
+    base = head + np.arange(buckets) * size
+    index = np.column_stack((base + np.minimum(imin, imax), base + np.maximum(imin, imax))).ravel()
+    if head:
+        first = np.sort([y[:head].argmin(), y[:head].argmax()])
+        index = np.concatenate((first, index))
+    return x[index], y[index]
+
+
+class LinePlotter:
+    """
+    Dibuja una o más líneas con blitting: en cada cuadro restaura el fondo
+    guardado y redibuja solo las líneas. Los ejes se redibujan únicamente cuando cambian los
+    límites (que avanzan de a pasos) o cuando matplotlib redibuja la figura
+    (resize, toolbar). Antes de dibujar, los datos se reducen con
+    decimate_minmax a un punto por píxel de ancho.
+    """
+    MARKER_LIMIT = 200  # Con más puntos que esto la línea se dibuja sin marcadores
+    
+    def __init__(self, fig, ax, canvas):
+        self.fig = fig
+        self.ax = ax
+        self.canvas = canvas
+        self.background = None
+        self.lines = []
+        load_numpy()
+        self.frame_times = deque(maxlen=200)
+        self.full_draws = 0
+        self.new_lines([0])
+        canvas.mpl_connect("draw_event", self.on_draw)
+    
+    def new_lines(self, channels):
+        """Crea una línea por canal (después de ax.clear() hay que volver a crearlas)"""
+        self.lines = [self.ax.plot([], [], f"{CHANNELS[c]['color']}-", linewidth=2, marker='o',
+                                   markersize=4, alpha=0.8, animated=True,
+                                   label=CHANNELS[c]['name'])[0]
+                      for c in channels]
+        self.background = None
+    
+    def draw_lines(self):
+        for line in self.lines:
+            self.ax.draw_artist(line)
+    
+    def on_draw(self, event):
+        """Tras un dibujado completo guarda el fondo sin las líneas y las dibuja encima"""
+        self.background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self.full_draws += 1
+        self.draw_lines()
+    
+    def fit_limits(self, x_lo, x_hi, y_lo, y_hi, y_bounds):
+        """Ajusta los límites a pasos fijos; devuelve True si cambiaron"""
+        span = max(60.0, x_hi - x_lo)
+        step = 10.0 ** math.floor(math.log10(span))
+        xlim = (math.floor(x_lo / step) * step, (math.floor(x_hi / step) + 1) * step)
+        
+        margin = max(5, (y_hi - y_lo) * 0.2)
+        ylim = (float(max(y_bounds[0], math.floor((y_lo - margin) / 5) * 5)),
+                float(min(y_bounds[1], math.ceil((y_hi + margin) / 5) * 5)))
+        
+        if xlim == tuple(self.ax.get_xlim()) and ylim == tuple(self.ax.get_ylim()):
+            return False
+        self.ax.set_xlim(*xlim)
+        self.ax.set_ylim(*ylim)
+        return True
+    
+    def buckets(self):
+        """Tramos de decimación para el ancho actual: un mínimo y un máximo cada 2 píxeles"""
+        return max(1, int(self.ax.bbox.width) // 2)
+    
+    def update(self, series, y_bounds):
+        """
+        Dibuja un cuadro con una serie (x, y) por línea y registra cuánto tardó.
+        Las series vacías dejan su línea vacía; al menos una debe tener datos.
+        """
+        start = time.perf_counter()
+        buckets = self.buckets()
+        decimated = []
+        for line, (x, y) in zip(self.lines, series):
+            xd, yd = decimate_minmax(x, y, buckets)
+            line.set_data(xd, yd)
+            line.set_marker('o' if len(x) <= self.MARKER_LIMIT else '')
+            if len(xd):
+                decimated.append((xd, yd))
+        
+        # La decimación conserva el mínimo y el máximo: los límites salen de
+        # unos pocos puntos por píxel en vez de recorrer toda la historia
+        limits = (min(x[0] for x, _ in decimated), max(x[-1] for x, _ in decimated),
+                  min(y.min() for _, y in decimated), max(y.max() for _, y in decimated))
+        if self.fit_limits(*limits, y_bounds) or self.background is None:
+            self.canvas.draw()  # on_draw guarda el fondo nuevo y dibuja las líneas
+        else:
+            self.canvas.restore_region(self.background)
+            self.draw_lines()
+            self.canvas.blit(self.fig.bbox)
+        self.frame_times.append(time.perf_counter() - start)
+    
+    def frame_summary(self):
+        """p50 y máximo en ms de los últimos cuadros, y cuántos fueron completos"""
+        times = sorted(self.frame_times)
+        if not times:
+            return None
+        return {"p50_ms": times[len(times) // 2] * 1e3, "max_ms": times[-1] * 1e3,
+                "full_draws": self.full_draws}
+
 
 class SensorGUI:
-    def __init__(self):
-        self.sensor = SensorReader()
+    def __init__(self, use_mmap=False, history=100, record=None, replay=None, speed=1.0,
+                 broker=None, device_path="/dev/sensor_drv", stats_window=100):
+        load_gui()
+        if record:
+            from sensor_recording import SessionRecorder
+            recorder = SessionRecorder(record)
+        else:
+            recorder = None
+        if replay:
+            self.sensor = ReplayReader(replay, speed=speed, history=history, stats_window=stats_window)
+        elif broker:
+            self.sensor = BrokerSensorReader(broker, history=history, recorder=recorder,
+                                             stats_window=stats_window)
+        else:
+            reader_class = MmapSensorReader if use_mmap else SensorReader
+            self.sensor = reader_class(device_path, history=history, recorder=recorder,
+                                       stats_window=stats_window)
         
         # Configurar la ventana principal
         self.root = tk.Tk()
@@ -155,6 +889,9 @@ class SensorGUI:
         ttk.Radiobutton(signal_frame, text="Señal 1 (Humedad)", 
                        variable=self.signal_var, value=1, 
                        command=self.change_signal).pack(side=tk.LEFT, padx=10)
+        ttk.Radiobutton(signal_frame, text="Ambas", 
+                       variable=self.signal_var, value=BOTH_CHANNELS, 
+                       command=self.change_signal).pack(side=tk.LEFT, padx=10)
         
         # Botones de control
         button_frame = ttk.LabelFrame(control_frame, text="Control")
@@ -187,6 +924,18 @@ class SensorGUI:
                               background='lightblue', relief=tk.SUNKEN, width=15)
         data_label.pack(side=tk.RIGHT, padx=5)
         
+        # Tiempo de dibujado por cuadro
+        self.frame_var = tk.StringVar(value="Cuadro: -")
+        frame_label = ttk.Label(status_frame, textvariable=self.frame_var,
+                               background='lightyellow', relief=tk.SUNKEN, width=38)
+        frame_label.pack(side=tk.RIGHT, padx=5)
+        
+        # Estadísticas móviles que calcula el hilo lector (media, desvío, extremos, EWMA, anomalías)
+        self.stats_var = tk.StringVar(value="Estadísticas: -")
+        stats_label = ttk.Label(self.root, textvariable=self.stats_var,
+                               background='white', relief=tk.SUNKEN)
+        stats_label.pack(fill=tk.X, padx=5, pady=2)
+        
         # Configurar matplotlib embebido en tkinter
         self.setup_plot()
         
@@ -204,10 +953,6 @@ class SensorGUI:
         self.ax.set_title('Datos del Sensor QEMU')
         self.ax.grid(True, alpha=0.3)
         
-        # Línea del gráfico con más estilo
-        self.line, = self.ax.plot([], [], 'b-', linewidth=2, marker='o', 
-                                 markersize=4, alpha=0.8)
-        
         # Configurar límites iniciales
         self.ax.set_xlim(0, 60)  # 60 segundos iniciales
         self.ax.set_ylim(0, 100)  # Rango inicial
@@ -216,6 +961,9 @@ class SensorGUI:
         self.canvas = FigureCanvasTkAgg(self.fig, master=self.root)
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
+        # Línea del gráfico, dibujada con blitting
+        self.plotter = LinePlotter(self.fig, self.ax, self.canvas)
+        
         # Toolbar de matplotlib
         toolbar_frame = ttk.Frame(self.root)
         toolbar_frame.pack(fill=tk.X, padx=5)
@@ -227,112 +975,114 @@ class SensorGUI:
     def reset_driver(self):
         """Resetea el driver usando el comando especial"""
         try:
-            with open(self.sensor.device_path, 'w') as f:
-                f.write('reset')
+            self.sensor.send_command('reset')
             self.status_var.set("Driver reseteado")
         except Exception as e:
             messagebox.showerror("Error", f"Error reseteando driver: {e}")
         
+    def visible_channels(self):
+        """Canales que se grafican con la selección actual"""
+        signal = self.signal_var.get()
+        return list(CHANNELS) if signal == BOTH_CHANNELS else [signal]
+    
     def change_signal(self):
         """Callback para cambio de señal"""
         signal = self.signal_var.get()
-        signal_name = "Temperatura" if signal == 0 else "Humedad"
-        self.status_var.set(f"Cambiando a Señal {signal} ({signal_name})")
+        channels = self.visible_channels()
+        signal_name = " y ".join(CHANNELS[c]["name"] for c in channels)
+        self.status_var.set(f"Cambiando a {signal_name}")
         
         if self.sensor.set_signal(signal):
             # Limpiar gráfico al cambiar señal
             self.ax.clear()
             self.ax.set_xlabel('Tiempo (s)')
             self.ax.grid(True, alpha=0.3)
-            self.line, = self.ax.plot([], [], 'b-', linewidth=2, marker='o', 
-                                     markersize=4, alpha=0.8)
-            
-            # Actualizar título y límites
-            unit = "°C" if signal == 0 else "%"
-            self.ax.set_ylabel(f'{signal_name} ({unit})')
-            self.ax.set_title(f'Señal {signal}: {signal_name}')
-            
-            # Ajustar límites según el tipo de señal
-            if signal == 0:  # Temperatura
-                self.ax.set_ylim(0, 60)  # Rango de temperatura
-            else:  # Humedad
-                self.ax.set_ylim(0, 100)  # Rango de humedad
+            self.plotter.new_lines(channels)
             
+            # Actualizar título y límites según los canales visibles
+            if len(channels) == 1:
+                info = CHANNELS[signal]
+                self.ax.set_ylabel(f"{info['name']} ({info['unit']})")
+                self.ax.set_title(f"Señal {signal}: {info['name']}")
+            else:
+                self.ax.set_ylabel('Valor')
+                self.ax.set_title(signal_name.capitalize())
+                self.ax.legend(handles=self.plotter.lines, loc='upper left')
+            self.ax.set_ylim(*self.y_bounds(channels))
             self.ax.set_xlim(0, 60)
             
-            # Resetear tiempo de inicio
-            self.start_time = time.time()
+            # Los buffers conservan la historia de cada canal: el tiempo sigue
+            # contando desde el inicio del monitoreo
             self.canvas.draw()
             
-            self.status_var.set(f"Señal {signal} ({signal_name}) seleccionada")
+            self.status_var.set(f"{signal_name} seleccionada")
         else:
             self.status_var.set("Error cambiando señal")
     
-    def animate(self, frame):
-        """Función de animación para actualizar el gráfico"""
+    @staticmethod
+    def y_bounds(channels):
+        return (min(CHANNELS[c]["bounds"][0] for c in channels),
+                max(CHANNELS[c]["bounds"][1] for c in channels))
+    
+    def animate(self):
+        """Actualiza el gráfico con los datos actuales (un cuadro)"""
         try:
             self.animation_counter += 1
-            times, values, ylabel, title = self.sensor.get_current_data()
+            channels = self.visible_channels()
+            # Copias ya decimadas al ancho del gráfico, tomadas bajo el lock del lector
+            buckets = self.plotter.buckets()
+            data = [self.sensor.get_channel_data(c, buckets) for c in channels]
             
             # Actualizar contador de datos
-            self.data_count_var.set(f"Datos: {len(values)}")
+            self.data_count_var.set(f"Datos: {sum(self.sensor.get_channel_count(c) for c in channels)}")
             
-            if times and values and self.start_time:
-                # Convertir tiempos absolutos a relativos
-                rel_times = [(t - self.start_time) for t in times]
-                
-                # Actualizar datos del gráfico
-                self.line.set_data(rel_times, values)
+            if any(len(values) for _, values in data) and self.start_time:
+                # Convertir tiempos absolutos a relativos y dibujar
+                series = [(times - self.start_time, values) for times, values in data]
+                self.plotter.update(series, self.y_bounds(channels))
                 
-                # Ajustar límites dinámicamente
-                if rel_times and values:
-                    # Límites X (tiempo)
-                    max_time = max(rel_times)
-                    margin_x = max(5, max_time * 0.05)
-                    self.ax.set_xlim(-margin_x, max_time + margin_x)
-                    
-                    # Límites Y (valores)
-                    min_val = min(values)
-                    max_val = max(values)
-                    
-                    # Agregar margen basado en el tipo de señal
-                    if self.sensor.current_signal == 0:  # Temperatura
-                        margin_y = max(5, (max_val - min_val) * 0.2)
-                        y_min = max(0, min_val - margin_y)
-                        y_max = min(60, max_val + margin_y)
-                    else:  # Humedad
-                        margin_y = max(5, (max_val - min_val) * 0.2)
-                        y_min = max(0, min_val - margin_y)
-                        y_max = min(100, max_val + margin_y)
-                    
-                    self.ax.set_ylim(y_min, y_max)
+                self.stats_var.set(self.stats_text(channels))
                 
-                # Actualizar etiquetas
-                self.ax.set_ylabel(ylabel)
-                self.ax.set_title(title)
+                frames = self.plotter.frame_summary()
+                self.frame_var.set(f"Cuadro: p50 {frames['p50_ms']:.1f} ms, "
+                                   f"máx {frames['max_ms']:.1f} ms, completos {frames['full_draws']}")
                 
                 # Actualizar status cada 10 frames para no saturar
-                if self.animation_counter % 10 == 0 and values:
-                    last_value = values[-1]
-                    signal_num = self.signal_var.get()
-                    time_elapsed = rel_times[-1] if rel_times else 0
-                    self.status_var.set(f"Monitoreando Señal {signal_num} - "
-                                      f"Último: {last_value} - Tiempo: {time_elapsed:.1f}s")
+                if self.animation_counter % 10 == 0:
+                    last_values = ", ".join(f"{CHANNELS[c]['name']} {values[-1]}"
+                                            for c, (_, values) in zip(channels, data) if len(values))
+                    time_elapsed = max(rel_times[-1] for rel_times, _ in series if len(rel_times))
+                    self.status_var.set(f"Monitoreando - Último: {last_values} - "
+                                      f"Tiempo: {time_elapsed:.1f}s")
             else:
                 # Si no hay datos, mostrar mensaje
                 if self.animation_counter % 20 == 0:  # Cada 10 segundos aprox
-                    signal_num = self.sensor.current_signal
-                    self.status_var.set(f"Esperando datos de señal {signal_num}... "
+                    signal_name = " y ".join(CHANNELS[c]["name"].lower() for c in channels)
+                    self.status_var.set(f"Esperando datos de {signal_name}... "
                                       f"(¿Driver cargado?)")
             
-            return self.line,
-            
         except Exception as e:
-            return self.line,
+            pass
+    
+    def stats_text(self, channels):
+        """Resumen de las estadísticas precalculadas de los canales visibles"""
+        parts = []
+        for channel in channels:
+            summary = self.sensor.get_channel_stats(channel)
+            if summary is None:
+                continue
+            text = (f"{CHANNELS[channel]['name']}: media {summary['mean']:.1f} ± {summary['std']:.1f}, "
+                    f"mín {summary['min']}, máx {summary['max']}, EWMA {summary['ewma']:.1f}, "
+                    f"anomalías {summary['anomalies']}")
+            if summary["last_anomaly"] is not None:
+                _, value, z = summary["last_anomaly"]
+                text += f" (última {value}, z {z:+.1f})"
+            parts.append(text)
+        return " | ".join(parts) or "Estadísticas: -"
     
     def start_monitoring(self):
         """Inicia el monitoreo"""
-        if not os.path.exists(self.sensor.device_path):
+        if not self.sensor.is_available():
             messagebox.showerror("Error", 
                                f"Dispositivo {self.sensor.device_path} no encontrado.\n"
                                "Asegúrate de que el driver esté cargado con:\n"
@@ -341,6 +1091,10 @@ class SensorGUI:
         
         self.status_var.set("Iniciando monitoreo...")
         
+        # Muestrear todos los canales si el driver lo soporta: así cambiar de
+        # señal después no le pide nada al driver ni pierde muestras
+        self.sensor.enable_all_channels()
+        
         # Configurar señal inicial
         if not self.sensor.set_signal(self.signal_var.get()):
             messagebox.showerror("Error", "No se pudo configurar la señal inicial")
@@ -353,12 +1107,11 @@ class SensorGUI:
         
         # Iniciar animación
         try:
-            self.animation = animation.FuncAnimation(
-                self.fig, self.animate, 
-                interval=500,  # Actualizar cada 500ms
-                blit=False,
-                cache_frame_data=False
-            )
+            # Timer del canvas en vez de FuncAnimation: con blit=False redibuja toda la
+            # figura en cada cuadro, y LinePlotter decide cuándo hace falta
+            self.animation = self.canvas.new_timer(interval=500)  # Actualizar cada 500ms
+            self.animation.add_callback(self.animate)
+            self.animation.start()
             
             # Actualizar botones
             self.start_button.config(state=tk.DISABLED)
@@ -380,7 +1133,7 @@ class SensorGUI:
         # Detener animación
         if self.animation:
             try:
-                self.animation.event_source.stop()
+                self.animation.stop()
                 self.animation = None
             except:
                 pass  # Ignorar errores al detener
@@ -416,32 +1169,115 @@ class SensorGUI:
         except KeyboardInterrupt:
             self.on_closing()
 
+def run_headless(args):
+    """
+    Modo sin interfaz: lee el driver con HeadlessReader y escribe las muestras
+    en --salida (o stdout) hasta --duracion segundos o Ctrl+C. Los mensajes van
+    a stderr para no mezclarse con los datos.
+    """
+    if not os.path.exists(args.dispositivo):
+        print(f"Error: {args.dispositivo} no encontrado", file=sys.stderr)
+        sys.exit(1)
+    output = open(args.salida, "w") if args.salida else sys.stdout
+    try:
+        sensor = HeadlessReader(args.dispositivo, output=output)
+        if args.periodo:
+            try:
+                sensor.set_period(round(args.periodo * 1000))
+            except OSError as e:
+                print(f"No se pudo cambiar el período de muestreo: {e}", file=sys.stderr)
+        if not sensor.enable_all_channels():
+            print("El driver no soporta muestrear todos los canales: solo señal 0", file=sys.stderr)
+            sensor.set_signal(0)
+        
+        sensor.start_reading()
+        deadline = time.monotonic() + args.duracion if args.duracion else None
+        try:
+            # El hilo lector termina solo si falla la lectura o la salida
+            while sensor.reader_thread.is_alive() and not sensor.output_closed:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                sensor.reader_thread.join(0.5 if remaining is None else min(0.5, remaining))
+        except KeyboardInterrupt:
+            pass
+        sensor.stop_reading()
+        if sensor.output_closed and output is sys.stdout:
+            # Que el flush al salir no falle otra vez sobre el pipe cerrado
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        
+        summary = sensor.latency_summary()
+        latency = (f", latencia p50 {summary['p50_ms']:.2f} ms, p99 {summary['p99_ms']:.2f} ms"
+                   if "p50_ms" in summary else "")
+        print(f"{summary['samples']} muestras, {summary['reads']} lecturas{latency}", file=sys.stderr)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+
 def main():
     """Función principal"""
+    parser = argparse.ArgumentParser(description="Monitor de sensores QEMU")
+    parser.add_argument("--mmap", action="store_true", help="leer el anillo mapeado en vez de read()")
+    parser.add_argument("--historia", type=int, default=100,
+                        help="muestras retenidas por señal (default: 100)")
+    parser.add_argument("--grabar", metavar="DIR", help="grabar todas las muestras en DIR")
+    parser.add_argument("--reproducir", metavar="DIR", help="reproducir una grabación en vez de leer el driver")
+    parser.add_argument("--velocidad", default="1", help="velocidad de reproducción: 1, 10, ... o max")
+    parser.add_argument("--broker", metavar="DIRECCION",
+                        help="recibir las muestras de sensor_broker.py (ruta de socket Unix o host:puerto)")
+    parser.add_argument("--dispositivo", default="/dev/sensor_drv",
+                        help="dispositivo del driver o enlace de sensor_emulator.py")
+    parser.add_argument("--ventana", type=int, default=100,
+                        help="muestras de la ventana de estadísticas móviles (default: 100)")
+    parser.add_argument("--periodo", type=float, metavar="MS",
+                        help="período de muestreo del driver en ms (0.1 a 10000)")
+    parser.add_argument("--sin-gui", action="store_true",
+                        help="solo leer el driver y escribir las muestras como CSV (sin matplotlib, Tk ni NumPy)")
+    parser.add_argument("--salida", metavar="ARCHIVO", help="con --sin-gui, archivo CSV (default: stdout)")
+    parser.add_argument("--duracion", type=float, metavar="S", help="con --sin-gui, segundos a leer (default: hasta Ctrl+C)")
+    args = parser.parse_args()
+    
+    if args.sin_gui:
+        for option in ("mmap", "grabar", "reproducir", "broker"):
+            if getattr(args, option):
+                parser.error(f"--{option} necesita la interfaz gráfica; no se combina con --sin-gui")
+        run_headless(args)
+        return
+    if args.salida or args.duracion:
+        parser.error("--salida y --duracion solo valen con --sin-gui")
+    speed = None if args.velocidad == "max" else float(args.velocidad)
+    
     print("Monitor de Sensores QEMU")
     print("========================")
-    print("Driver: /dev/sensor_drv")
+    print(f"Driver: {args.dispositivo}")
     print("Información del driver: /proc/sensor_qemu")
     print()
     
-    # Verificar que matplotlib esté disponible
+    # Cargar matplotlib y tkinter (solo la interfaz los necesita)
     try:
-        import matplotlib.pyplot as plt
-        import matplotlib.animation as animation
-    except ImportError:
-        print("Error: matplotlib no está instalado.")
-        print("Instala con: pip install matplotlib")
+        load_gui()
+    except ImportError as e:
+        print(f"Error: no se pudo cargar la interfaz ({e}).")
+        print("Instala con: pip install matplotlib (y el paquete python3-tk)")
+        print("Para registrar datos sin interfaz: python3 sensor_app.py --sin-gui")
         sys.exit(1)
     
     # Verificar que el dispositivo existe
-    device_path = "/dev/sensor_drv"
-    if not os.path.exists(device_path):
+    device_path = args.dispositivo
+    if args.reproducir:
+        print(f"Reproduciendo {args.reproducir} a velocidad {args.velocidad}")
+    elif args.broker:
+        print(f"Conectando al broker {args.broker}")
+    elif not os.path.exists(device_path):
         print(f"Advertencia: {device_path} no encontrado.")
         print("Para cargar el driver:")
         print("1. Compila: make")
         print("2. Carga: sudo insmod sensor_driver.ko")
         print("3. Verifica: ls -l /dev/sensor_drv")
         print("4. Info: cat /proc/sensor_qemu")
+        print("Sin el módulo: python3 sensor_emulator.py --dispositivo /tmp/sensor_drv")
+        print("y después: python3 sensor_app.py --dispositivo /tmp/sensor_drv")
         print()
         
         # Preguntar si continuar anyway para testing
@@ -463,11 +1299,20 @@ def main():
         except:
             print("Info del driver no disponible en /proc/sensor_qemu")
     
+    if args.periodo and not (args.reproducir or args.broker):
+        try:
+            SensorReader(device_path).set_period(round(args.periodo * 1000))
+            print(f"Período de muestreo: {args.periodo} ms")
+        except OSError as e:
+            print(f"No se pudo cambiar el período de muestreo: {e}")
+    
     print("Iniciando interfaz gráfica...")
     
     # Ejecutar GUI
     try:
-        app = SensorGUI()
+        app = SensorGUI(use_mmap=args.mmap, history=args.historia, record=args.grabar,
+                        replay=args.reproducir, speed=speed, broker=args.broker,
+                        device_path=device_path, stats_window=args.ventana)
         app.run()
     except Exception as e:
         print(f"Error ejecutando aplicación: {e}")
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Broker de muestras: el único proceso que lee /dev/sensor_drv.
+
+read() en el driver es destructivo (avanza buffer_tail), así que dos procesos
+leyendo el dispositivo se reparten las muestras al azar. El broker las lee una
+sola vez y reenvía a cada suscriptor el flujo completo de registros binarios de
+32 bytes (struct sensor_record) por un socket Unix o TCP.
+
+Cada suscriptor tiene una cola acotada (`--cola` registros). Si un cliente lento
+la llena, se descartan sus registros más viejos, y el broker y los demás
+clientes siguen a su ritmo. Los clientes pueden mandar comandos de una línea
+("0", "1", "all", "reset"), que el broker escribe en el driver.
+
+Uso:
+    python3 sensor_broker.py --escuchar /tmp/sensor_broker.sock
+    python3 sensor_broker.py --escuchar 0.0.0.0:7070 --cola 16384
+    python3 sensor_app.py --broker /tmp/sensor_broker.sock
+"""
+
+import argparse
+import os
+import selectors
+import signal
+import socket
+import threading
+import time
+from collections import deque
+
+from sensor_app import SENSOR_RECORD, MmapSensorReader, SensorReader, parse_address
+
+
+class Subscriber:
+    """Cola acotada de registros pendientes de un cliente, con descarte de los más viejos"""
+    def __init__(self, sock, capacity):
+        self.sock = sock
+        self.capacity = capacity
+        self.queue = deque()       # Lotes enteros (bytes), del más viejo al más nuevo
+        self.queued = 0            # Registros en la cola
+        self.current = None        # Lote que se está enviando (memoryview del resto)
+        self.current_records = 0   # Registros de ese lote; cuentan como enviados al terminarlo
+        self.inbox = b""           # Comandos recibidos sin terminar
+        self.events = selectors.EVENT_READ
+        self.stats = {"sent": 0, "dropped": 0}
+
+    def push(self, data, records):
+        """Encola un lote; se llama con el lock del broker tomado"""
+        if records > self.capacity:
+            data = data[-self.capacity * SENSOR_RECORD.size:]
+            self.stats["dropped"] += records - self.capacity
+            records = self.capacity
+        self.queue.append(data)
+        self.queued += records
+        # Descartar lo más viejo; el lote en envío no se toca para no cortar un registro
+        while self.queued > self.capacity:
+            oldest = self.queue[0]
+            excess = self.queued - self.capacity
+            oldest_records = len(oldest) // SENSOR_RECORD.size
+            if oldest_records <= excess:
+                self.queue.popleft()
+                dropped = oldest_records
+            else:
+                self.queue[0] = oldest[excess * SENSOR_RECORD.size:]
+                dropped = excess
+            self.queued -= dropped
+            self.stats["dropped"] += dropped
+
+    def pending(self):
+        return self.current is not None or bool(self.queue)
+
+    def flush(self):
+        """Envía sin bloquear todo lo posible; se llama con el lock del broker tomado"""
+        while True:
+            if self.current is None:
+                if not self.queue:
+                    return
+                data = self.queue.popleft()
+                self.current_records = len(data) // SENSOR_RECORD.size
+                self.queued -= self.current_records
+                self.current = memoryview(data)
+            try:
+                sent = self.sock.send(self.current)
+            except BlockingIOError:
+                return
+            if sent < len(self.current):
+                self.current = self.current[sent:]
+            else:
+                # Solo un lote escrito entero en el socket cuenta como enviado
+                self.stats["sent"] += self.current_records
+                self.current = None
+
+
+class SensorBroker:
+    """Acepta suscriptores y les reparte cada lote publicado con publish()"""
+    def __init__(self, address, queue_records=4096, on_command=None):
+        self.address = address
+        self.queue_records = queue_records
+        self.on_command = on_command
+        self.lock = threading.Lock()
+        self.subscribers = {}
+        self.selector = selectors.DefaultSelector()
+        self.wake_r, self.wake_w = os.pipe()
+        os.set_blocking(self.wake_r, False)
+        os.set_blocking(self.wake_w, False)
+        self.running = False
+        self.stats = {"published": 0, "batches": 0, "clients": 0, "disconnected": 0}
+        self.dropped_by_gone = 0
+        self.sent_by_gone = 0
+
+    def listen(self):
+        family, target = parse_address(self.address)
+        self.server = socket.socket(family, socket.SOCK_STREAM)
+        if family == socket.AF_UNIX:
+            if os.path.exists(target):
+                os.unlink(target)
+        else:
+            self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server.bind(target)
+        self.server.listen(128)
+        self.server.setblocking(False)
+        self.selector.register(self.server, selectors.EVENT_READ, "accept")
+        self.selector.register(self.wake_r, selectors.EVENT_READ, "wake")
+        self.running = True
+
+    def publish(self, data):
+        """Reparte un lote de registros (bytes) a todos los suscriptores; no bloquea"""
+        records = len(data) // SENSOR_RECORD.size
+        with self.lock:
+            self.stats["published"] += records
+            self.stats["batches"] += 1
+            for subscriber in self.subscribers.values():
+                subscriber.push(data, records)
+        try:
+            os.write(self.wake_w, b"x")
+        except BlockingIOError:
+            pass  # El lazo ya tiene un aviso pendiente
+
+    def accept(self):
+        try:
+            sock, _ = self.server.accept()
+        except BlockingIOError:
+            return
+        sock.setblocking(False)
+        with self.lock:
+            self.subscribers[sock] = Subscriber(sock, self.queue_records)
+            self.stats["clients"] += 1
+        self.selector.register(sock, selectors.EVENT_READ, "client")
+
+    def disconnect(self, sock):
+        self.selector.unregister(sock)
+        with self.lock:
+            subscriber = self.subscribers.pop(sock)
+            self.stats["disconnected"] += 1
+            self.dropped_by_gone += subscriber.stats["dropped"]
+            self.sent_by_gone += subscriber.stats["sent"]
+        sock.close()
+
+    def receive(self, sock):
+        """Lee comandos de un cliente; una lectura vacía es una desconexión"""
+        try:
+            data = sock.recv(4096)
+        except ConnectionError:
+            data = b""
+        if not data:
+            self.disconnect(sock)
+            return
+        subscriber = self.subscribers[sock]
+        *lines, subscriber.inbox = (subscriber.inbox + data).split(b"\n")
+        for line in lines:
+            command = line.decode(errors="replace").strip()
+            if command and self.on_command:
+                try:
+                    self.on_command(command)
+                except OSError as e:
+                    print(f"Error enviando '{command}' al driver: {e}")
+
+    def flush_all(self):
+        """Envía lo pendiente y pide EVENT_WRITE solo para los clientes que quedaron atrasados"""
+        with self.lock:
+            for sock, subscriber in list(self.subscribers.items()):
+                try:
+                    subscriber.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    continue  # receive() detecta el cierre
+                events = selectors.EVENT_READ
+                if subscriber.pending():
+                    events |= selectors.EVENT_WRITE
+                if events != subscriber.events:
+                    self.selector.modify(sock, events, "client")
+                    subscriber.events = events
+
+    def serve_forever(self):
+        while self.running:
+            for key, events in self.selector.select(timeout=1.0):
+                if key.data == "accept":
+                    self.accept()
+                elif key.data == "wake":
+                    try:
+                        while os.read(self.wake_r, 4096):
+                            pass
+                    except BlockingIOError:
+                        pass
+                elif events & selectors.EVENT_READ:
+                    self.receive(key.fileobj)
+            self.flush_all()
+
+    def stop(self):
+        self.running = False
+        try:
+            os.write(self.wake_w, b"x")
+        except BlockingIOError:
+            pass
+
+    def close(self):
+        for sock in list(self.subscribers):
+            self.disconnect(sock)
+        self.selector.close()
+        self.server.close()
+        family, target = parse_address(self.address)
+        if family == socket.AF_UNIX and os.path.exists(target):
+            os.unlink(target)
+        os.close(self.wake_r)
+        os.close(self.wake_w)
+
+    def summary(self):
+        with self.lock:
+            stats = dict(self.stats)
+            stats["connected"] = len(self.subscribers)
+            stats["sent"] = self.sent_by_gone + sum(s.stats["sent"] for s in self.subscribers.values())
+            stats["dropped"] = self.dropped_by_gone + sum(s.stats["dropped"] for s in self.subscribers.values())
+        return stats
+
+
+def make_source(base, broker):
+    """Lector del driver que en vez de guardar las muestras las publica en el broker"""
+    class BrokerSource(base):
+        def add_batch(self, batch, received_ns, times=None):
+            with self.data_lock:
+                self.stats["samples"] += len(batch)
+            broker.publish(batch.tobytes())
+    return BrokerSource
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Broker de muestras del sensor")
+    parser.add_argument("--dispositivo", default="/dev/sensor_drv")
+    parser.add_argument("--escuchar", default="/tmp/sensor_broker.sock",
+                        help="ruta de socket Unix o host:puerto")
+    parser.add_argument("--cola", type=int, default=4096, help="registros por suscriptor")
+    parser.add_argument("--mmap", action="store_true", help="leer el anillo mapeado en vez de read()")
+    parser.add_argument("--periodo", type=float, metavar="MS", help="período de muestreo del driver en ms")
+    parser.add_argument("--estadisticas", type=float, default=10.0,
+                        help="segundos entre resúmenes (0 para no mostrarlos)")
+    args = parser.parse_args()
+
+    broker = SensorBroker(args.escuchar, queue_records=args.cola)
+    source = make_source(MmapSensorReader if args.mmap else SensorReader, broker)(args.dispositivo)
+    broker.on_command = source.send_command
+    if args.periodo:
+        source.set_period(round(args.periodo * 1000))
+    broker.listen()
+
+    def terminar(signum, frame):
+        broker.stop()
+    signal.signal(signal.SIGINT, terminar)
+    signal.signal(signal.SIGTERM, terminar)
+
+    def informar():
+        while broker.running:
+            time.sleep(args.estadisticas)
+            if broker.running:
+                print(f"broker: {broker.summary()}", flush=True)
+    if args.estadisticas > 0:
+        threading.Thread(target=informar, daemon=True).start()
+
+    print(f"Broker escuchando en {args.escuchar} (dispositivo {args.dispositivo})")
+    source.start_reading()
+    try:
+        broker.serve_forever()
+    finally:
+        source.stop_reading()
+        broker.close()
+        print(f"broker: {broker.summary()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,20 +4,31 @@
 #include <linux/cdev.h>
 #include <linux/device.h>
 #include <linux/uaccess.h>
-#include <linux/timer.h>
+#include <linux/hrtimer.h>
 #include <linux/jiffies.h>
 #include <linux/random.h>
-#include <linux/mutex.h>
+#include <linux/spinlock.h>
 #include <linux/slab.h>
 #include <linux/proc_fs.h>
 #include <linux/seq_file.h>
+#include <linux/wait.h>
+#include <linux/poll.h>
+#include <linux/ktime.h>
+#include <linux/mm.h>
+#include <linux/vmalloc.h>
+#include <linux/moduleparam.h>
+#include <linux/version.h>
+#include <linux/mutex.h>
+
+#include "sensor_ioctl.h"
 
 // Configuración específica para QEMU
 #define DEVICE_NAME "sensor_drv"
 #define CLASS_NAME "sensor_class"
 #define PROC_NAME "sensor_qemu"
-#define BUFFER_SIZE 1024
-#define TIMER_INTERVAL_MS 1000  // 1 segundo
+#define BUFFER_SIZE 4096       // 2 s de muestras de ambos canales a 1 kHz
+#define SENSOR_CHANNELS 2       // 0 = temperatura, 1 = humedad
+#define SENSOR_RING_BYTES PAGE_ALIGN(PAGE_SIZE + BUFFER_SIZE * sizeof(struct sensor_record))
 
 // Configuración QEMU específica
 #define QEMU_TEMP_BASE 25       // Temperatura base en °C
@@ -33,6 +44,13 @@ struct sensor_data {
     unsigned long timestamp;    // Timestamp de la lectura
     int qemu_cycle;            // Ciclo de simulación QEMU
     int noise_level;           // Nivel de ruido simulado
+    u64 timestamp_ns;          // ktime_get_ns() al tomar la muestra (CLOCK_MONOTONIC)
+};
+
+// Estado por descriptor abierto: modo de lectura y buffer temporal para el modo binario
+struct sensor_file {
+    int mode;                       // SENSOR_MODE_TEXT o SENSOR_MODE_BINARY
+    struct sensor_record *scratch;  // BUFFER_SIZE registros, reservado al pasar a binario
 };
 
 // Variables globales específicas para QEMU
@@ -48,14 +66,47 @@ static int buffer_head = 0;
 static int buffer_tail = 0;
 static int buffer_count = 0;
 
+// Anillo compartido con el espacio de usuario por mmap() (ver sensor_ioctl.h).
+// Lo escribe solo el timer; los lectores llevan su propia posición y no consumen.
+static void *sensor_ring;
+static struct sensor_ring_header *ring_header;
+static struct sensor_record *ring_records;
+
 // Configuración del sensor
 static int selected_signal = 0;  // Por defecto temperatura
-static struct timer_list sensor_timer;
+
+// Con sample_all cada tick muestrea todos los canales; cada registro lleva su
+// signal_type, así que cambiar de canal no requiere vaciar el buffer
+static bool sample_all = false;
+module_param(sample_all, bool, 0644);
+MODULE_PARM_DESC(sample_all, "Muestrear todos los canales en cada tick (también: echo all > /dev/sensor_drv)");
+
+// Período de muestreo en microsegundos. Se puede cambiar con el módulo cargado
+// (ioctl SENSOR_IOC_SET_PERIOD o /sys/module/sensor_driver/parameters/period_us);
+// el hrtimer lo relee en cada tick
+static unsigned int period_us = SENSOR_PERIOD_DEFAULT_US;
+static int period_param_set(const char *val, const struct kernel_param *kp);
+static const struct kernel_param_ops period_param_ops = {
+    .set = period_param_set,
+    .get = param_get_uint,
+};
+module_param_cb(period_us, &period_param_ops, &period_us, 0644);
+MODULE_PARM_DESC(period_us, "Período de muestreo en microsegundos ("
+                 __stringify(SENSOR_PERIOD_MIN_US) "-" __stringify(SENSOR_PERIOD_MAX_US) ")");
+
+static struct hrtimer sensor_timer;
+static bool sensor_timer_started;     // Protegido por period_lock
+static DEFINE_MUTEX(period_lock);
+static u64 timer_missed;     // Ticks que el hrtimer no llegó a ejecutar
+static u64 buffer_dropped;   // Muestras pisadas en el buffer lleno antes de que alguien las lea
 static unsigned long qemu_boot_time;
 static int qemu_simulation_cycle = 0;
 
-// Mutex para proteger acceso concurrente
-static DEFINE_MUTEX(sensor_mutex);
+// Spinlock para proteger el buffer: el timer corre en contexto de softirq y no puede dormir
+static DEFINE_SPINLOCK(sensor_lock);
+
+// Cola de espera para lecturas bloqueantes y poll(); el timer la despierta con cada muestra
+static DECLARE_WAIT_QUEUE_HEAD(sensor_wait);
 
 // Entrada proc para información QEMU
 static struct proc_dir_entry *proc_entry;
@@ -80,7 +131,10 @@ static int sensor_open(struct inode *inode, struct file *file);
 static int sensor_release(struct inode *inode, struct file *file);
 static ssize_t sensor_read(struct file *file, char __user *buffer, size_t len, loff_t *offset);
 static ssize_t sensor_write(struct file *file, const char __user *buffer, size_t len, loff_t *offset);
-static void sensor_timer_callback(struct timer_list *timer);
+static __poll_t sensor_poll(struct file *file, poll_table *wait);
+static long sensor_ioctl(struct file *file, unsigned int cmd, unsigned long arg);
+static int sensor_mmap(struct file *file, struct vm_area_struct *vma);
+static enum hrtimer_restart sensor_timer_callback(struct hrtimer *timer);
 
 // Funciones específicas QEMU
 static int detect_qemu_environment(void);
@@ -125,6 +179,10 @@ static struct file_operations fops = {
     .open = sensor_open,
     .read = sensor_read,
     .write = sensor_write,
+    .poll = sensor_poll,
+    .unlocked_ioctl = sensor_ioctl,
+    .compat_ioctl = compat_ptr_ioctl,
+    .mmap = sensor_mmap,
     .release = sensor_release,
 };
 
@@ -146,15 +204,15 @@ static void qemu_sensor_simulation_update(void) {
     qemu_simulation_cycle++;
     
     // Cambiar tendencias cada cierto número de ciclos para simular variaciones realistas
-    if (qemu_simulation_cycle % 30 == 0) {  // Cada 30 segundos
+    if (qemu_simulation_cycle % 30 == 0) {  // Cada 30 ciclos (30 s con el período por defecto)
         get_random_bytes(&qemu_state.temp_trend, sizeof(qemu_state.temp_trend));
         qemu_state.temp_trend = (qemu_state.temp_trend % 3) - 1;  // -1, 0, 1
         
         get_random_bytes(&qemu_state.humid_trend, sizeof(qemu_state.humid_trend));
         qemu_state.humid_trend = (qemu_state.humid_trend % 3) - 1;  // -1, 0, 1
         
-        printk(KERN_DEBUG "sensor_drv: QEMU simulación - Nueva tendencia temp: %d, humid: %d\n",
-               qemu_state.temp_trend, qemu_state.humid_trend);
+        pr_debug("sensor_drv: QEMU simulación - Nueva tendencia temp: %d, humid: %d\n",
+                 qemu_state.temp_trend, qemu_state.humid_trend);
     }
 }
 
@@ -211,23 +269,33 @@ static int read_qemu_sensor_value(int signal_type) {
 }
 
 // Callback del timer optimizado para QEMU
-static void sensor_timer_callback(struct timer_list *timer) {
-    struct sensor_data data;
-    
-    // Actualizar simulación QEMU
-    qemu_sensor_simulation_update();
-    
-    mutex_lock(&sensor_mutex);
-    
-    // Leer el sensor seleccionado con simulación QEMU
-    data.signal_type = selected_signal;
-    data.current_value = read_qemu_sensor_value(selected_signal);
-    data.timestamp = jiffies;
-    data.qemu_cycle = qemu_simulation_cycle;
-    data.noise_level = (qemu_simulation_cycle % 10);  // Nivel de ruido simulado
+// Escribe la muestra en el anillo mmap y publica la nueva secuencia (con el lock tomado)
+static void sensor_ring_publish(const struct sensor_data *data) {
+    u64 head = ring_header->head;
+    struct sensor_record *rec = &ring_records[head % BUFFER_SIZE];
+    
+    rec->signal_type = data->signal_type;
+    rec->value = data->current_value;
+    rec->timestamp = data->timestamp;
+    rec->qemu_cycle = data->qemu_cycle;
+    rec->noise_level = data->noise_level;
+    rec->timestamp_ns = data->timestamp_ns;
+    
+    // El registro tiene que ser visible antes que la secuencia que lo publica
+    smp_store_release(&ring_header->head, head + 1);
+}
+
+// Toma una muestra del canal y la agrega al buffer circular y al anillo mmap (con el lock tomado)
+static void sensor_push_sample(int signal_type, struct sensor_data *data) {
+    data->signal_type = signal_type;
+    data->current_value = read_qemu_sensor_value(signal_type);
+    data->timestamp = jiffies;
+    data->qemu_cycle = qemu_simulation_cycle;
+    data->noise_level = (qemu_simulation_cycle % 10);  // Nivel de ruido simulado
+    data->timestamp_ns = ktime_get_ns();
     
     // Agregar al buffer circular
-    sensor_buffer[buffer_head] = data;
+    sensor_buffer[buffer_head] = *data;
     buffer_head = (buffer_head + 1) % BUFFER_SIZE;
     
     if (buffer_count < BUFFER_SIZE) {
@@ -235,45 +303,254 @@ static void sensor_timer_callback(struct timer_list *timer) {
     } else {
         // Buffer lleno, mover tail
         buffer_tail = (buffer_tail + 1) % BUFFER_SIZE;
+        buffer_dropped++;
+    }
+    
+    sensor_ring_publish(data);
+}
+
+// Callback del hrtimer: corre en softirq (HRTIMER_MODE_REL_SOFT), sin printk por tick
+static enum hrtimer_restart sensor_timer_callback(struct hrtimer *timer) {
+    struct sensor_data data;
+    unsigned long flags;
+    u64 overruns;
+    int channel;
+    
+    // Actualizar simulación QEMU
+    qemu_sensor_simulation_update();
+    
+    spin_lock_irqsave(&sensor_lock, flags);
+    
+    // Leer todos los canales o solo el seleccionado, con simulación QEMU
+    if (READ_ONCE(sample_all)) {
+        for (channel = 0; channel < SENSOR_CHANNELS; channel++) {
+            sensor_push_sample(channel, &data);
+        }
+    } else {
+        sensor_push_sample(selected_signal, &data);
     }
     
-    mutex_unlock(&sensor_mutex);
+    spin_unlock_irqrestore(&sensor_lock, flags);
     
-    // Reprogramar el timer
-    mod_timer(&sensor_timer, jiffies + msecs_to_jiffies(TIMER_INTERVAL_MS));
+    // Despertar a los lectores bloqueados en read() o poll()
+    wake_up_interruptible(&sensor_wait);
+    
+    // Reprogramar a partir de la expiración anterior, sin acumular deriva; si
+    // el tick llegó tarde se saltean los vencidos y se cuentan
+    overruns = hrtimer_forward_now(timer, us_to_ktime(READ_ONCE(period_us)));
+    if (overruns > 1) {
+        WRITE_ONCE(timer_missed, timer_missed + overruns - 1);
+    }
+    return HRTIMER_RESTART;
+}
+
+// Cambia el período; con el timer en marcha lo reprograma para que rija desde ya.
+// hrtimer_cancel espera a que termine un callback en curso (hrtimer_forward_now no
+// admite un timer ya reencolado) y el mutex ordena los cambios concurrentes.
+static int sensor_set_period(unsigned int us) {
+    if (us < SENSOR_PERIOD_MIN_US || us > SENSOR_PERIOD_MAX_US) {
+        return -EINVAL;
+    }
+    mutex_lock(&period_lock);
+    WRITE_ONCE(period_us, us);
+    if (sensor_timer_started) {
+        hrtimer_cancel(&sensor_timer);
+        hrtimer_start(&sensor_timer, us_to_ktime(us), HRTIMER_MODE_REL_SOFT);
+    }
+    mutex_unlock(&period_lock);
+    return 0;
+}
+
+static int period_param_set(const char *val, const struct kernel_param *kp) {
+    unsigned int us;
+    int ret;
     
-    // Log más detallado para QEMU
-    printk(KERN_DEBUG "sensor_drv: QEMU Ciclo %d - Señal %d (%s), Valor: %d, Tendencia: %d\n", 
-           qemu_simulation_cycle,
-           data.signal_type, 
-           (data.signal_type == 0) ? "Temp" : "Humid",
-           data.current_value,
-           (data.signal_type == 0) ? qemu_state.temp_trend : qemu_state.humid_trend);
+    ret = kstrtouint(val, 0, &us);
+    if (ret) {
+        return ret;
+    }
+    return sensor_set_period(us);
 }
 
 // Función open
 static int sensor_open(struct inode *inode, struct file *file) {
-    printk(KERN_INFO "sensor_drv: Device QEMU abierto\n");
+    struct sensor_file *sf;
+    
+    sf = kzalloc(sizeof(*sf), GFP_KERNEL);
+    if (!sf) {
+        return -ENOMEM;
+    }
+    sf->mode = SENSOR_MODE_TEXT;
+    file->private_data = sf;
+    
+    pr_debug("sensor_drv: Device QEMU abierto\n");
     return 0;
 }
 
 // Función release
 static int sensor_release(struct inode *inode, struct file *file) {
-    printk(KERN_INFO "sensor_drv: Device QEMU cerrado\n");
+    struct sensor_file *sf = file->private_data;
+    
+    kvfree(sf->scratch);
+    kfree(sf);
+    
+    pr_debug("sensor_drv: Device QEMU cerrado\n");
     return 0;
 }
 
+// Función ioctl - Selección del modo de lectura del descriptor
+static long sensor_ioctl(struct file *file, unsigned int cmd, unsigned long arg) {
+    struct sensor_file *sf = file->private_data;
+    int __user *argp = (int __user *)arg;
+    __u32 __user *periodp = (__u32 __user *)arg;
+    __u32 us;
+    int mode;
+    
+    switch (cmd) {
+    case SENSOR_IOC_SET_MODE:
+        if (get_user(mode, argp)) {
+            return -EFAULT;
+        }
+        if (mode != SENSOR_MODE_TEXT && mode != SENSOR_MODE_BINARY) {
+            return -EINVAL;
+        }
+        if (mode == SENSOR_MODE_BINARY && !sf->scratch) {
+            sf->scratch = kvmalloc_array(BUFFER_SIZE, sizeof(struct sensor_record), GFP_KERNEL);
+            if (!sf->scratch) {
+                return -ENOMEM;
+            }
+        }
+        sf->mode = mode;
+        return 0;
+    
+    case SENSOR_IOC_GET_MODE:
+        return put_user(sf->mode, argp);
+    
+    case SENSOR_IOC_SET_PERIOD:
+        if (get_user(us, periodp)) {
+            return -EFAULT;
+        }
+        return sensor_set_period(us);
+    
+    case SENSOR_IOC_GET_PERIOD:
+        return put_user(READ_ONCE(period_us), periodp);
+    
+    default:
+        return -ENOTTY;
+    }
+}
+
+// Función mmap - Mapea el anillo de muestras completo y de solo lectura
+static int sensor_mmap(struct file *file, struct vm_area_struct *vma) {
+    if (vma->vm_pgoff != 0 || vma->vm_end - vma->vm_start > SENSOR_RING_BYTES) {
+        return -EINVAL;
+    }
+    if (vma->vm_flags & VM_WRITE) {
+        return -EPERM;
+    }
+    vm_flags_clear(vma, VM_MAYWRITE);
+    
+    return remap_vmalloc_range(vma, sensor_ring, 0);
+}
+
+// Espera a que haya al menos una muestra; si devuelve 0 el lock queda tomado
+static int sensor_wait_for_data(struct file *file, unsigned long *flags) {
+    int ret;
+    
+    spin_lock_irqsave(&sensor_lock, *flags);
+    
+    while (buffer_count == 0) {
+        spin_unlock_irqrestore(&sensor_lock, *flags);
+        
+        if (file->f_flags & O_NONBLOCK) {
+            return -EAGAIN;
+        }
+        
+        ret = wait_event_interruptible(sensor_wait, READ_ONCE(buffer_count) > 0);
+        if (ret) {
+            return ret;  // -ERESTARTSYS si llegó una señal
+        }
+        
+        spin_lock_irqsave(&sensor_lock, *flags);
+    }
+    
+    return 0;
+}
+
+// Lectura binaria - Drena en un solo read() todas las muestras que entren en el buffer
+static ssize_t sensor_read_binary(struct file *file, char __user *buffer, size_t len) {
+    struct sensor_file *sf = file->private_data;
+    struct sensor_data *data;
+    unsigned long flags;
+    size_t max_records, n, i;
+    int ret;
+    
+    max_records = min_t(size_t, len / sizeof(struct sensor_record), BUFFER_SIZE);
+    if (max_records == 0) {
+        return -EINVAL;
+    }
+    
+    ret = sensor_wait_for_data(file, &flags);
+    if (ret) {
+        return ret;
+    }
+    
+    // Copiar al buffer temporal con el lock tomado; copy_to_user puede dormir y va afuera
+    n = min_t(size_t, max_records, buffer_count);
+    for (i = 0; i < n; i++) {
+        data = &sensor_buffer[buffer_tail];
+        sf->scratch[i].signal_type = data->signal_type;
+        sf->scratch[i].value = data->current_value;
+        sf->scratch[i].timestamp = data->timestamp;
+        sf->scratch[i].qemu_cycle = data->qemu_cycle;
+        sf->scratch[i].noise_level = data->noise_level;
+        sf->scratch[i].timestamp_ns = data->timestamp_ns;
+        buffer_tail = (buffer_tail + 1) % BUFFER_SIZE;
+    }
+    buffer_count -= n;
+    
+    spin_unlock_irqrestore(&sensor_lock, flags);
+    
+    if (copy_to_user(buffer, sf->scratch, n * sizeof(struct sensor_record))) {
+        return -EFAULT;
+    }
+    
+    return n * sizeof(struct sensor_record);
+}
+
+// Función poll - Legible cuando hay muestras en el buffer; siempre escribible
+static __poll_t sensor_poll(struct file *file, poll_table *wait) {
+    __poll_t mask = EPOLLOUT | EPOLLWRNORM;
+    unsigned long flags;
+    
+    poll_wait(file, &sensor_wait, wait);
+    
+    spin_lock_irqsave(&sensor_lock, flags);
+    if (buffer_count > 0) {
+        mask |= EPOLLIN | EPOLLRDNORM;
+    }
+    spin_unlock_irqrestore(&sensor_lock, flags);
+    
+    return mask;
+}
+
 // Función read - Formato extendido para QEMU
+// Bloquea hasta que haya una muestra (con O_NONBLOCK devuelve -EAGAIN)
 static ssize_t sensor_read(struct file *file, char __user *buffer, size_t len, loff_t *offset) {
+    struct sensor_file *sf = file->private_data;
     struct sensor_data data;
     char output_buffer[512];  // Buffer más grande para información QEMU
     int output_len;
+    unsigned long flags;
+    int ret;
     
-    mutex_lock(&sensor_mutex);
+    if (sf->mode == SENSOR_MODE_BINARY) {
+        return sensor_read_binary(file, buffer, len);
+    }
     
-    if (buffer_count == 0) {
-        mutex_unlock(&sensor_mutex);
-        return 0;  // No hay datos disponibles
+    ret = sensor_wait_for_data(file, &flags);
+    if (ret) {
+        return ret;
     }
     
     // Obtener dato del buffer
@@ -281,17 +558,19 @@ static ssize_t sensor_read(struct file *file, char __user *buffer, size_t len, l
     buffer_tail = (buffer_tail + 1) % BUFFER_SIZE;
     buffer_count--;
     
-    mutex_unlock(&sensor_mutex);
+    spin_unlock_irqrestore(&sensor_lock, flags);
     
-    // Formatear los datos con información extendida QEMU
+    // Formatear los datos con información extendida QEMU; el último campo permite
+    // medir desde el espacio de usuario la latencia muestra -> lectura
     output_len = snprintf(output_buffer, sizeof(output_buffer),
-                         "%d,%d,%lu,%d,%d,%s\n",
+                         "%d,%d,%lu,%d,%d,%s,%llu\n",
                          data.signal_type, 
                          data.current_value, 
                          data.timestamp,
                          data.qemu_cycle,
                          data.noise_level,
-                         qemu_state.qemu_detected ? "QEMU" : "REAL");
+                         qemu_state.qemu_detected ? "QEMU" : "REAL",
+                         data.timestamp_ns);
     
     if (len < output_len) {
         return -EINVAL;
@@ -308,6 +587,8 @@ static ssize_t sensor_read(struct file *file, char __user *buffer, size_t len, l
 static ssize_t sensor_write(struct file *file, const char __user *buffer, size_t len, loff_t *offset) {
     char input_buffer[32];
     int new_signal;
+    unsigned long flags;
+    bool changed;
     
     if (len >= sizeof(input_buffer)) {
         return -EINVAL;
@@ -321,18 +602,24 @@ static ssize_t sensor_write(struct file *file, const char __user *buffer, size_t
     
     // Comandos especiales QEMU
     if (strncmp(input_buffer, "reset", 5) == 0) {
-        mutex_lock(&sensor_mutex);
+        spin_lock_irqsave(&sensor_lock, flags);
         buffer_head = buffer_tail = buffer_count = 0;
         qemu_simulation_cycle = 0;
         qemu_state.temp_trend = qemu_state.humid_trend = 0;
-        mutex_unlock(&sensor_mutex);
+        spin_unlock_irqrestore(&sensor_lock, flags);
         printk(KERN_INFO "sensor_drv: QEMU simulación reiniciada\n");
         return len;
     }
     
     if (strncmp(input_buffer, "info", 4) == 0) {
-        printk(KERN_INFO "sensor_drv: QEMU Info - Ciclo: %d, Buffer: %d/%d, Señal: %d\n",
-               qemu_simulation_cycle, buffer_count, BUFFER_SIZE, selected_signal);
+        printk(KERN_INFO "sensor_drv: QEMU Info - Ciclo: %d, Buffer: %d/%d, Señal: %d, Todos: %d\n",
+               qemu_simulation_cycle, buffer_count, BUFFER_SIZE, selected_signal, sample_all);
+        return len;
+    }
+    
+    if (strncmp(input_buffer, "all", 3) == 0) {
+        WRITE_ONCE(sample_all, true);
+        printk(KERN_INFO "sensor_drv: QEMU - Muestreando todos los canales\n");
         return len;
     }
     
@@ -346,15 +633,17 @@ static ssize_t sensor_write(struct file *file, const char __user *buffer, size_t
         return -EINVAL;
     }
     
-    mutex_lock(&sensor_mutex);
-    if (selected_signal != new_signal) {
-        selected_signal = new_signal;
-        // Limpiar buffer al cambiar de señal
-        buffer_head = buffer_tail = buffer_count = 0;
-        printk(KERN_INFO "sensor_drv: QEMU - Cambiado a señal %d (%s), buffer limpiado\n", 
-               selected_signal, (selected_signal == 0) ? "Temperatura" : "Humedad");
+    // Cada registro lleva su signal_type: el buffer se conserva al cambiar de señal
+    spin_lock_irqsave(&sensor_lock, flags);
+    changed = (selected_signal != new_signal) || sample_all;
+    selected_signal = new_signal;
+    WRITE_ONCE(sample_all, false);
+    spin_unlock_irqrestore(&sensor_lock, flags);
+    
+    if (changed) {
+        printk(KERN_INFO "sensor_drv: QEMU - Cambiado a señal %d (%s)\n", 
+               new_signal, (new_signal == 0) ? "Temperatura" : "Humedad");
     }
-    mutex_unlock(&sensor_mutex);
     
     return len;
 }
@@ -363,18 +652,27 @@ static ssize_t sensor_write(struct file *file, const char __user *buffer, size_t
 static int sensor_proc_show(struct seq_file *m, void *v) {
     seq_printf(m, "=== Driver de Sensores QEMU ===\n");
     seq_printf(m, "Entorno: QEMU Virtual\n");
-    seq_printf(m, "Señal actual: %d (%s)\n", selected_signal, 
-               (selected_signal == 0) ? "Temperatura" : "Humedad");
+    if (sample_all) {
+        seq_printf(m, "Señal actual: todas\n");
+    } else {
+        seq_printf(m, "Señal actual: %d (%s)\n", selected_signal, 
+                   (selected_signal == 0) ? "Temperatura" : "Humedad");
+    }
+    seq_printf(m, "Período de muestreo: %u us\n", READ_ONCE(period_us));
     seq_printf(m, "Ciclo simulación: %d\n", qemu_simulation_cycle);
     seq_printf(m, "Buffer ocupado: %d/%d\n", buffer_count, BUFFER_SIZE);
+    seq_printf(m, "Muestras descartadas (buffer lleno): %llu\n", buffer_dropped);
+    seq_printf(m, "Ticks perdidos del timer: %llu\n", READ_ONCE(timer_missed));
     seq_printf(m, "Tendencia temp: %d\n", qemu_state.temp_trend);
     seq_printf(m, "Tendencia humid: %d\n", qemu_state.humid_trend);
     seq_printf(m, "Tiempo activo: %lu segundos\n", (jiffies - qemu_boot_time) / HZ);
     seq_printf(m, "\nComandos disponibles:\n");
     seq_printf(m, "  echo 0 > /dev/sensor_drv     # Seleccionar temperatura\n");
     seq_printf(m, "  echo 1 > /dev/sensor_drv     # Seleccionar humedad\n");
+    seq_printf(m, "  echo all > /dev/sensor_drv   # Muestrear todos los canales\n");
     seq_printf(m, "  echo reset > /dev/sensor_drv # Reiniciar simulación\n");
     seq_printf(m, "  echo info > /dev/sensor_drv  # Mostrar información\n");
+    seq_printf(m, "  echo 1000 > /sys/module/sensor_driver/parameters/period_us  # Período de 1 ms\n");
     return 0;
 }
 
@@ -400,10 +698,24 @@ static int __init sensor_init(void) {
         printk(KERN_WARNING "sensor_drv: QEMU no detectado, pero continuando en modo QEMU forzado\n");
     }
     
+    // Anillo compartido por mmap(): vmalloc_user lo devuelve en cero y apto para remap_vmalloc_range
+    sensor_ring = vmalloc_user(SENSOR_RING_BYTES);
+    if (!sensor_ring) {
+        return -ENOMEM;
+    }
+    ring_header = sensor_ring;
+    ring_records = sensor_ring + PAGE_SIZE;
+    ring_header->magic = SENSOR_RING_MAGIC;
+    ring_header->version = SENSOR_RING_VERSION;
+    ring_header->capacity = BUFFER_SIZE;
+    ring_header->record_size = sizeof(struct sensor_record);
+    ring_header->data_offset = PAGE_SIZE;
+    
     // Asignar número mayor dinámicamente
     result = alloc_chrdev_region(&dev_num, 0, 1, DEVICE_NAME);
     if (result < 0) {
         printk(KERN_ALERT "sensor_drv: Error asignando número mayor\n");
+        vfree(sensor_ring);
         return result;
     }
     major_number = MAJOR(dev_num);
@@ -417,6 +729,7 @@ static int __init sensor_init(void) {
     if (result < 0) {
         printk(KERN_ALERT "sensor_drv: Error agregando cdev\n");
         unregister_chrdev_region(dev_num, 1);
+        vfree(sensor_ring);
         return result;
     }
     
@@ -426,6 +739,7 @@ static int __init sensor_init(void) {
         printk(KERN_ALERT "sensor_drv: Error creando clase\n");
         cdev_del(&sensor_cdev);
         unregister_chrdev_region(dev_num, 1);
+        vfree(sensor_ring);
         return PTR_ERR(sensor_class);
     }
     
@@ -436,6 +750,7 @@ static int __init sensor_init(void) {
         class_destroy(sensor_class);
         cdev_del(&sensor_cdev);
         unregister_chrdev_region(dev_num, 1);
+        vfree(sensor_ring);
         return PTR_ERR(sensor_device);
     }
     
@@ -445,13 +760,22 @@ static int __init sensor_init(void) {
         printk(KERN_WARNING "sensor_drv: No se pudo crear entrada proc\n");
     }
     
-    // Inicializar timer con configuración QEMU
-    timer_setup(&sensor_timer, sensor_timer_callback, 0);
-    mod_timer(&sensor_timer, jiffies + msecs_to_jiffies(TIMER_INTERVAL_MS));
+    // Inicializar el hrtimer en modo soft: el callback corre en softirq como el timer anterior
+#if LINUX_VERSION_CODE >= KERNEL_VERSION(6, 13, 0)
+    hrtimer_setup(&sensor_timer, sensor_timer_callback, CLOCK_MONOTONIC, HRTIMER_MODE_REL_SOFT);
+#else
+    hrtimer_init(&sensor_timer, CLOCK_MONOTONIC, HRTIMER_MODE_REL_SOFT);
+    sensor_timer.function = sensor_timer_callback;
+#endif
+    mutex_lock(&period_lock);
+    hrtimer_start(&sensor_timer, us_to_ktime(period_us), HRTIMER_MODE_REL_SOFT);
+    sensor_timer_started = true;
+    mutex_unlock(&period_lock);
     
     printk(KERN_INFO "sensor_drv: Driver QEMU registrado exitosamente\n");
     printk(KERN_INFO "sensor_drv: Dispositivo: /dev/%s (major %d)\n", DEVICE_NAME, major_number);
     printk(KERN_INFO "sensor_drv: Información: /proc/%s\n", PROC_NAME);
+    printk(KERN_INFO "sensor_drv: Período de muestreo: %u us\n", period_us);
     printk(KERN_INFO "sensor_drv: Sensores simulados - Temp: %d-+%d°C, Humid: %d±%d%%\n",
            QEMU_TEMP_BASE, QEMU_TEMP_RANGE, QEMU_HUMID_BASE, QEMU_HUMID_RANGE);
     
@@ -463,7 +787,10 @@ static void __exit sensor_exit(void) {
     printk(KERN_INFO "sensor_drv: Desinstalando driver QEMU...\n");
     
     // Detener timer
-    del_timer_sync(&sensor_timer);
+    mutex_lock(&period_lock);
+    sensor_timer_started = false;
+    hrtimer_cancel(&sensor_timer);
+    mutex_unlock(&period_lock);
     
     // Remover entrada proc
     if (proc_entry) {
@@ -475,6 +802,8 @@ static void __exit sensor_exit(void) {
     class_destroy(sensor_class);
     cdev_del(&sensor_cdev);
     unregister_chrdev_region(dev_num, 1);
+    // Los mapeos vivos impiden descargar el módulo (cada uno retiene el archivo)
+    vfree(sensor_ring);
     
     printk(KERN_INFO "sensor_drv: Driver QEMU desinstalado exitosamente\n");
     printk(KERN_INFO "sensor_drv: Ciclos completados: %d\n", qemu_simulation_cycle);
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Emulador de /dev/sensor_drv en espacio de usuario, para probar y medir la
+aplicación sin cargar el módulo.
+
+Abre un pseudo-terminal en modo raw y crea en `--dispositivo` un enlace a su
+lado esclavo. Del lado maestro escribe los registros de texto del driver
+("signal,valor,jiffies,ciclo,ruido,QEMU,timestamp_ns\\n"), con los mismos
+valores que read_qemu_sensor_value: tabla de senos, tendencias cada 30 ciclos
+y ruido con la aritmética entera de C. Lee del mismo lado los comandos que se
+escriben en el dispositivo ("0", "1", "all", "reset", "info").
+
+Como el driver, guarda hasta BUFFER_SIZE muestras sin leer y descarta las más
+viejas. Los ticks se generan en lotes (cada 1 ms como mucho), con el
+timestamp_ns de su instante programado, así puede emitir decenas de kHz. Un
+pty no admite ioctl() ni mmap(): SensorReader lee en modo texto y
+MmapSensorReader no funciona sobre el emulador.
+
+Uso:
+    python3 sensor_emulator.py --dispositivo /tmp/sensor_drv --periodo 1
+    python3 sensor_app.py --dispositivo /tmp/sensor_drv
+    python3 medir_lectura.py --dispositivo /tmp/sensor_drv --modo poll
+"""
+
+import argparse
+import os
+import random
+import selectors
+import signal
+import sys
+import time
+import tty
+from collections import deque
+
+BUFFER_SIZE = 4096  # Igual que el driver (ver sensor_app.BUFFER_SIZE)
+HZ = 250            # Frecuencia de jiffies emulada
+
+# Constantes de simulación de sensor_driver.c
+QEMU_TEMP_BASE = 25
+QEMU_TEMP_RANGE = 20
+QEMU_HUMID_BASE = 45
+QEMU_HUMID_RANGE = 35
+QEMU_NOISE_FACTOR = 5
+
+# Copia de sine_table de sensor_driver.c. La tabla se declara de 360 elementos
+# pero inicializa 332; en C el resto queda en 0, y acá también.
+SINE_TABLE = [
+    0, 2, 3, 5, 7, 9, 10, 12, 14, 16, 17, 19, 21, 22, 24, 26, 28, 29, 31, 33, 34, 36, 37, 39,
+    41, 42, 44, 45, 47, 48, 50, 52, 53, 54, 56, 57, 59, 60, 62, 63, 64, 66, 67, 68, 69, 71, 72,
+    73, 74, 75, 77, 78, 79, 80, 81, 82, 83, 84, 85, 86, 87, 88, 89, 90, 91, 91, 92, 93, 94, 94,
+    95, 96, 96, 97, 97, 98, 98, 99, 99, 99, 100, 100, 100, 100, 100, 100, 100, 99, 99, 99, 98,
+    98, 97, 97, 96, 96, 95, 94, 94, 93, 92, 91, 91, 90, 89, 88, 87, 86, 85, 84, 83, 82, 81, 80,
+    79, 78, 77, 75, 74, 73, 72, 71, 69, 68, 67, 66, 64, 63, 62, 60, 59, 57, 56, 54, 53, 52, 50,
+    48, 47, 45, 44, 42, 41, 39, 37, 36, 34, 33, 31, 29, 28, 26, 24, 22, 21, 19, 17, 16, 14, 12,
+    10, 9, 7, 5, 3, 2, 0, -2, -3, -5, -7, -9, -10, -12, -14, -16, -17, -19, -21, -22, -24, -26,
+    -28, -29, -31, -33, -34, -36, -37, -39, -41, -42, -44, -45, -47, -48, -50, -52, -53, -54,
+    -56, -57, -59, -60, -62, -63, -64, -66, -67, -68, -69, -71, -72, -73, -74, -75, -77, -78,
+    -79, -80, -81, -82, -83, -84, -85, -86, -87, -88, -89, -90, -91, -91, -92, -93, -94, -94,
+    -95, -96, -96, -97, -97, -98, -98, -99, -99, -99, -100, -100, -100, -100, -100, -100, -100,
+    -99, -99, -99, -98, -98, -97, -97, -96, -96, -95, -94, -94, -93, -92, -91, -91, -90, -89,
+    -88, -87, -86, -85, -84, -83, -82, -81, -80, -79, -78, -77, -75, -74, -73, -72, -71, -69,
+    -68, -67, -66, -64, -63, -62, -60, -59, -57, -56, -54, -53, -52, -50, -48, -47, -45, -44,
+    -42, -41, -39, -37, -36, -34, -33, -31, -29, -28, -26, -24, -22, -21, -19, -17, -16, -14,
+    -12, -10, -9, -7, -5, -3, -2,
+]
+SINE_TABLE += [0] * (360 - len(SINE_TABLE))
+
+COMMANDS = ("reset", "info", "all", "0", "1")
+
+
+def c_div(a, b):
+    """División entera de C (trunca hacia cero)"""
+    q = abs(a) // abs(b)
+    return q if (a >= 0) == (b > 0) else -q
+
+
+def c_mod(a, b):
+    """Resto de C: tiene el signo del dividendo"""
+    return a - b * c_div(a, b)
+
+
+class SensorSimulation:
+    """Estado de simulación del driver: ciclo, tendencias y valores de cada canal"""
+    def __init__(self, seed=None):
+        self.random = random.Random(seed)
+        self.reset()
+
+    def reset(self):
+        self.cycle = 0
+        self.temp_trend = 0
+        self.humid_trend = 0
+        self.boot_jiffies = None
+
+    def random_int(self):
+        """Equivalente a get_random_bytes() sobre un int de 32 bits con signo"""
+        value = self.random.getrandbits(32)
+        return value - (1 << 32) if value >= 1 << 31 else value
+
+    def update(self):
+        """qemu_sensor_simulation_update(): un ciclo más y, cada 30, tendencias nuevas"""
+        self.cycle += 1
+        if self.cycle % 30 == 0:
+            self.temp_trend = c_mod(self.random_int(), 3) - 1
+            self.humid_trend = c_mod(self.random_int(), 3) - 1
+
+    def read_value(self, signal_type, jiffies):
+        """read_qemu_sensor_value() con aritmética entera de C"""
+        if self.boot_jiffies is None:
+            self.boot_jiffies = jiffies
+        time_factor = (jiffies - self.boot_jiffies) // HZ
+        if signal_type == 0:
+            angle = (time_factor // 10) % 360
+            variation = c_div(SINE_TABLE[angle] * 10, 100)
+            variation += self.cycle % QEMU_TEMP_RANGE
+            trend_effect = self.temp_trend * (self.cycle % 5)
+            noise = c_mod(self.random_int(), QEMU_NOISE_FACTOR * 2) - QEMU_NOISE_FACTOR
+            return QEMU_TEMP_BASE + variation + trend_effect + noise
+
+        angle = (time_factor // 15) % 360
+        variation = c_div(SINE_TABLE[(angle + 90) % 360] * 15, 100)
+        variation += self.cycle % QEMU_HUMID_RANGE
+        trend_effect = self.humid_trend * (self.cycle % 8)
+        noise = c_mod(self.random_int(), QEMU_NOISE_FACTOR * 3) - (QEMU_NOISE_FACTOR + 2)
+        return min(95, max(10, QEMU_HUMID_BASE + variation + trend_effect + noise))
+
+    def record(self, signal_type, timestamp_ns):
+        """Registro de texto de sensor_read() para una muestra tomada en timestamp_ns"""
+        jiffies = timestamp_ns * HZ // 1_000_000_000
+        value = self.read_value(signal_type, jiffies)
+        return (f"{signal_type},{value},{jiffies},{self.cycle},{self.cycle % 10},"
+                f"QEMU,{timestamp_ns}\n").encode()
+
+
+class SensorEmulator:
+    """Pseudo-terminal que se comporta como /dev/sensor_drv"""
+    BATCH_NS = 1_000_000  # Como mucho, un lote de ticks por milisegundo
+    WRITE_RECORDS = 256   # Registros por write(); los demás siguen sujetos a descarte
+    LATE_NS = 100_000_000  # Ticks atrasados más que esto se pierden, como con el hrtimer
+
+    def __init__(self, device_path, period_us=1_000_000, sample_all=False, seed=None,
+                 buffer_size=BUFFER_SIZE):
+        self.device_path = device_path
+        self.period_ns = period_us * 1000
+        self.sample_all = sample_all
+        self.selected_signal = 0
+        self.simulation = SensorSimulation(seed)
+        self.pending = deque(maxlen=buffer_size)  # Registros sin leer
+        self.current = None  # Lo que falta escribir del lote en curso
+        self.inbox = ""
+        self.selector = selectors.DefaultSelector()
+        self.wake_r, self.wake_w = os.pipe()
+        os.set_blocking(self.wake_r, False)
+        os.set_blocking(self.wake_w, False)
+        self.events = selectors.EVENT_READ
+        self.running = False
+        self.stats = {"ticks": 0, "records": 0, "dropped": 0, "missed": 0, "commands": 0}
+
+    def open(self):
+        """Crea el pty en modo raw y el enlace en device_path"""
+        self.master, self.slave = os.openpty()
+        tty.setraw(self.slave)  # Sin eco ni traducción de fin de línea
+        os.set_blocking(self.master, False)
+        if os.path.islink(self.device_path):
+            os.unlink(self.device_path)
+        os.symlink(os.ttyname(self.slave), self.device_path)
+        self.selector.register(self.master, selectors.EVENT_READ, "device")
+        self.selector.register(self.wake_r, selectors.EVENT_READ, "wake")
+        self.running = True
+
+    def command(self, command):
+        """Aplica un comando como sensor_write()"""
+        self.stats["commands"] += 1
+        if command == "reset":
+            self.simulation.reset()
+            self.pending.clear()
+        elif command == "info":
+            print(f"sensor_emulator: Ciclo: {self.simulation.cycle}, "
+                  f"Buffer: {len(self.pending)}/{self.pending.maxlen}, "
+                  f"Señal: {self.selected_signal}, Todos: {int(self.sample_all)}", flush=True)
+        elif command == "all":
+            self.sample_all = True
+        else:
+            self.selected_signal = int(command)
+            self.sample_all = False
+
+    def receive(self):
+        """
+        Lee comandos del lado maestro. En un pty las escrituras seguidas pueden
+        llegar juntas ("all0"), así que se separan por prefijo.
+        """
+        try:
+            self.inbox += os.read(self.master, 4096).decode(errors="replace")
+        except BlockingIOError:
+            return
+        while True:
+            self.inbox = self.inbox.lstrip()
+            match = next((c for c in COMMANDS if self.inbox.startswith(c)), None)
+            if match:
+                self.command(match)
+                self.inbox = self.inbox[len(match):]
+            elif self.inbox and not any(c.startswith(self.inbox) for c in COMMANDS):
+                self.inbox = self.inbox[1:]  # Descartar lo que no es un comando
+            else:
+                return
+
+    def tick(self, timestamp_ns):
+        """Un tick del timer: un registro por canal muestreado"""
+        self.simulation.update()
+        channels = (0, 1) if self.sample_all else (self.selected_signal,)
+        for channel in channels:
+            if len(self.pending) == self.pending.maxlen:
+                self.stats["dropped"] += 1
+            self.pending.append(self.simulation.record(channel, timestamp_ns))
+        self.stats["ticks"] += 1
+        self.stats["records"] += len(channels)
+
+    def flush(self):
+        """Escribe sin bloquear lo pendiente; lo que no entra en el pty espera"""
+        while self.current or self.pending:
+            if not self.current:
+                count = min(len(self.pending), self.WRITE_RECORDS)
+                self.current = b"".join(self.pending.popleft() for _ in range(count))
+            try:
+                written = os.write(self.master, self.current)
+            except BlockingIOError:
+                return
+            self.current = self.current[written:]
+
+    def serve_forever(self):
+        next_tick = time.monotonic_ns() + self.period_ns
+        while self.running:
+            now = time.monotonic_ns()
+            if now - next_tick > self.LATE_NS:
+                late = (now - next_tick) // self.period_ns
+                self.stats["missed"] += late
+                next_tick += late * self.period_ns
+            while next_tick <= now:
+                self.tick(next_tick)
+                next_tick += self.period_ns
+            self.flush()
+
+            # EVENT_WRITE solo mientras el pty esté lleno
+            events = selectors.EVENT_READ
+            if self.current or self.pending:
+                events |= selectors.EVENT_WRITE
+            if events != self.events:
+                self.selector.modify(self.master, events, "device")
+                self.events = events
+            timeout = max(next_tick - time.monotonic_ns(), self.BATCH_NS) / 1e9
+            for key, mask in self.selector.select(timeout):
+                if key.data == "wake":
+                    try:
+                        while os.read(self.wake_r, 4096):
+                            pass
+                    except BlockingIOError:
+                        pass
+                elif mask & selectors.EVENT_READ:
+                    self.receive()
+
+    def stop(self):
+        self.running = False
+        try:
+            os.write(self.wake_w, b"x")
+        except BlockingIOError:
+            pass
+
+    def close(self):
+        self.selector.close()
+        if os.path.islink(self.device_path):
+            os.unlink(self.device_path)
+        for fd in (self.master, self.slave, self.wake_r, self.wake_w):
+            os.close(fd)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Emulador de /dev/sensor_drv sobre un pty")
+    parser.add_argument("--dispositivo", default="/tmp/sensor_drv", help="ruta del enlace a crear")
+    parser.add_argument("--periodo", type=float, default=1000.0, metavar="MS",
+                        help="período de muestreo en ms (default: 1000)")
+    parser.add_argument("--todos", action="store_true", help="muestrear ambos canales en cada tick")
+    parser.add_argument("--semilla", type=int, help="semilla del ruido y las tendencias (reproducible)")
+    parser.add_argument("--estadisticas", type=float, default=0.0,
+                        help="segundos entre resúmenes (0 para no mostrarlos)")
+    args = parser.parse_args()
+
+    if os.path.exists(args.dispositivo) and not os.path.islink(args.dispositivo):
+        sys.exit(f"{args.dispositivo} existe y no es un enlace del emulador")
+    emulator = SensorEmulator(args.dispositivo, period_us=round(args.periodo * 1000),
+                              sample_all=args.todos, seed=args.semilla)
+    emulator.open()
+
+    def terminar(signum, frame):
+        emulator.stop()
+    signal.signal(signal.SIGINT, terminar)
+    signal.signal(signal.SIGTERM, terminar)
+    if args.estadisticas > 0:
+        def informar(signum, frame):
+            print(f"emulador: {emulator.stats}", flush=True)
+        signal.signal(signal.SIGALRM, informar)
+        signal.setitimer(signal.ITIMER_REAL, args.estadisticas, args.estadisticas)
+
+    print(f"Emulador en {args.dispositivo} -> {os.ttyname(emulator.slave)}, "
+          f"período {args.periodo} ms", flush=True)
+    try:
+        emulator.serve_forever()
+    finally:
+        emulator.close()
+        print(f"emulador: {emulator.stats}")
+
+
+if __name__ == "__main__":
+    main()
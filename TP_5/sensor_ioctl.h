@@ -0,0 +1,56 @@
+// Interfaz ioctl y formato binario de /dev/sensor_drv, compartidos con el espacio de usuario
+#ifndef SENSOR_IOCTL_H
+#define SENSOR_IOCTL_H
+
+#ifdef __KERNEL__
+#include <linux/ioctl.h>
+#include <linux/types.h>
+#else
+#include <sys/ioctl.h>
+#include <linux/types.h>
+#endif
+
+// Modos de lectura por descriptor
+#define SENSOR_MODE_TEXT   0    // Un registro de texto por read() (por defecto)
+#define SENSOR_MODE_BINARY 1    // read() drena todas las muestras como struct sensor_record
+
+#define SENSOR_IOC_MAGIC 's'
+#define SENSOR_IOC_SET_MODE _IOW(SENSOR_IOC_MAGIC, 1, int)
+#define SENSOR_IOC_GET_MODE _IOR(SENSOR_IOC_MAGIC, 2, int)
+#define SENSOR_IOC_SET_PERIOD _IOW(SENSOR_IOC_MAGIC, 3, __u32)  // Microsegundos
+#define SENSOR_IOC_GET_PERIOD _IOR(SENSOR_IOC_MAGIC, 4, __u32)
+
+// Rango del período de muestreo (hrtimer), en microsegundos
+#define SENSOR_PERIOD_MIN_US     100
+#define SENSOR_PERIOD_MAX_US     10000000
+#define SENSOR_PERIOD_DEFAULT_US 1000000
+
+// Registro binario de tamaño fijo (32 bytes, little-endian en x86_64 y ARM).
+// En Python: struct.Struct("<iiQiiQ")
+struct sensor_record {
+    __s32 signal_type;      // 0 = temperatura, 1 = humedad
+    __s32 value;            // Valor de la muestra
+    __u64 timestamp;        // jiffies
+    __s32 qemu_cycle;       // Ciclo de simulación
+    __s32 noise_level;      // Nivel de ruido simulado
+    __u64 timestamp_ns;     // ktime_get_ns() al tomar la muestra
+} __attribute__((packed));
+
+// Anillo compartido por mmap(): una página con este encabezado seguida de
+// `capacity` registros struct sensor_record en `data_offset`. La región es de
+// solo lectura para el usuario. `head` cuenta las muestras escritas desde que se
+// cargó el módulo: la muestra n está en el registro n % capacity, y el driver
+// publica head = n + 1 después de escribirla.
+#define SENSOR_RING_MAGIC   0x53454e53  // "SENS"
+#define SENSOR_RING_VERSION 1
+
+struct sensor_ring_header {
+    __u32 magic;            // SENSOR_RING_MAGIC
+    __u32 version;          // SENSOR_RING_VERSION
+    __u32 capacity;         // Cantidad de registros del anillo
+    __u32 record_size;      // sizeof(struct sensor_record)
+    __u64 data_offset;      // Offset de los registros desde el inicio del mapeo
+    __u64 head;             // Secuencia publicada (smp_store_release)
+};
+
+#endif
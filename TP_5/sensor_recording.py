@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Grabación de sesiones del sensor en disco.
+
+Una grabación es un directorio con segmentos `seg-NNNNNN.rec`. Cada segmento
+es un archivo de tamaño fijo mapeado en memoria: un encabezado de 32 bytes y
+después los registros binarios del driver (struct sensor_record, 32 bytes cada
+uno), uno detrás de otro. Solo se agregan registros al final. `count` se
+actualiza después de escribir los datos, así un lector nunca ve registros a
+medio escribir. Al llenarse, un segmento se recorta a su tamaño real y se abre
+el siguiente.
+
+Uso (inspeccionar una grabación):
+    python3 sensor_recording.py grabacion/
+"""
+
+import argparse
+import glob
+import mmap
+import os
+import sys
+import time
+
+import numpy as np
+
+SEGMENT_MAGIC = b"SENSREC1"
+SEGMENT_HEADER = np.dtype([("magic", "S8"), ("record_size", "<u4"), ("reserved", "<u4"),
+                           ("capacity", "<u8"), ("count", "<u8")])
+SEGMENT_PATTERN = "seg-*.rec"
+
+# Políticas de fsync (msync del mapeo)
+SYNC_BATCH = "batch"        # Después de cada lote: no se pierde nada ya escrito
+SYNC_INTERVAL = "interval"  # Como mucho cada `sync_interval` segundos
+SYNC_CLOSE = "close"        # Solo al cerrar cada segmento
+
+
+def segment_paths(directory):
+    return sorted(glob.glob(os.path.join(directory, SEGMENT_PATTERN)))
+
+
+class SessionRecorder:
+    """Escribe lotes de registros (arreglos NumPy estructurados) en segmentos mapeados"""
+    def __init__(self, directory, segment_records=1 << 20, sync=SYNC_INTERVAL, sync_interval=1.0):
+        if sync not in (SYNC_BATCH, SYNC_INTERVAL, SYNC_CLOSE):
+            raise ValueError(f"Política de sync desconocida: {sync}")
+        self.directory = directory
+        self.segment_records = segment_records
+        self.sync_policy = sync
+        self.sync_interval = sync_interval
+        self.last_sync = time.monotonic()
+        self.stats = {"records": 0, "batches": 0, "syncs": 0, "segments": 0}
+
+        os.makedirs(directory, exist_ok=True)
+        existing = segment_paths(directory)
+        # Una grabación existente se continúa en un segmento nuevo
+        self.next_index = int(os.path.basename(existing[-1])[4:10]) + 1 if existing else 0
+        self.map = None
+
+    def open_segment(self, dtype):
+        self.path = os.path.join(self.directory, f"seg-{self.next_index:06d}.rec")
+        self.next_index += 1
+        size = SEGMENT_HEADER.itemsize + self.segment_records * dtype.itemsize
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_EXCL, 0o644)
+        try:
+            os.ftruncate(fd, size)
+            self.map = mmap.mmap(fd, size, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE)
+        finally:
+            os.close(fd)
+        self.header = np.frombuffer(self.map, SEGMENT_HEADER, count=1)
+        self.header["magic"] = SEGMENT_MAGIC
+        self.header["record_size"] = dtype.itemsize
+        self.header["capacity"] = self.segment_records
+        self.records = np.frombuffer(self.map, dtype, count=self.segment_records,
+                                     offset=SEGMENT_HEADER.itemsize)
+        self.count = 0
+        self.stats["segments"] += 1
+
+    def close_segment(self):
+        """Sincroniza, desmapea y recorta el segmento a los registros escritos"""
+        self.sync()
+        size = SEGMENT_HEADER.itemsize + self.count * self.records.dtype.itemsize
+        del self.header, self.records
+        self.map.close()
+        self.map = None
+        os.truncate(self.path, size)
+
+    def write(self, batch):
+        """Agrega un lote de registros al final de la grabación"""
+        if self.map is None:
+            self.open_segment(batch.dtype)
+        while len(batch):
+            n = min(len(batch), self.segment_records - self.count)
+            self.records[self.count:self.count + n] = batch[:n]
+            self.count += n
+            self.header["count"] = self.count  # Publicar después de los datos
+            batch = batch[n:]
+            self.stats["records"] += n
+            if self.count == self.segment_records:
+                dtype = self.records.dtype
+                self.close_segment()
+                self.open_segment(dtype)
+        self.stats["batches"] += 1
+
+        if self.sync_policy == SYNC_BATCH or (
+                self.sync_policy == SYNC_INTERVAL
+                and time.monotonic() - self.last_sync >= self.sync_interval):
+            self.sync()
+
+    def sync(self):
+        if self.map is not None:
+            self.map.flush()
+            self.stats["syncs"] += 1
+        self.last_sync = time.monotonic()
+
+    def close(self):
+        if self.map is not None:
+            self.close_segment()
+
+
+def iter_recording(directory, dtype):
+    """Devuelve, segmento por segmento, los registros grabados como vistas de solo lectura"""
+    for path in segment_paths(directory):
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < SEGMENT_HEADER.itemsize:
+                continue
+            segment = mmap.mmap(f.fileno(), size, mmap.MAP_SHARED, mmap.PROT_READ)
+        header = np.frombuffer(segment, SEGMENT_HEADER, count=1)[0]
+        if header["magic"] != SEGMENT_MAGIC or header["record_size"] != dtype.itemsize:
+            raise ValueError(f"{path}: no es un segmento de grabación compatible")
+        # El mapeo vive mientras haya vistas sobre él
+        yield np.frombuffer(segment, dtype, count=int(header["count"]),
+                            offset=SEGMENT_HEADER.itemsize)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resumen de una grabación del sensor")
+    parser.add_argument("grabacion")
+    args = parser.parse_args()
+
+    from sensor_app import SENSOR_RECORD_DTYPE
+
+    total, first, last = 0, None, None
+    per_signal = [0, 0]
+    for records in iter_recording(args.grabacion, SENSOR_RECORD_DTYPE):
+        if not len(records):
+            continue
+        total += len(records)
+        stamps = records["timestamp_ns"]
+        first = stamps.min() if first is None else min(first, stamps.min())
+        last = stamps.max() if last is None else max(last, stamps.max())
+        per_signal[0] += int(np.count_nonzero(records["signal_type"] == 0))
+        per_signal[1] += int(np.count_nonzero(records["signal_type"] != 0))
+
+    if not total:
+        print(f"{args.grabacion}: sin muestras")
+        sys.exit(1)
+    duration = (int(last) - int(first)) / 1e9
+    print(f"Segmentos: {len(segment_paths(args.grabacion))}")
+    print(f"Muestras: {total} (temperatura {per_signal[0]}, humedad {per_signal[1]})")
+    print(f"Duración: {duration:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
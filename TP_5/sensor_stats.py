@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Estadísticas móviles de una señal del sensor, con costo constante por muestra.
+
+RollingStats se actualiza muestra a muestra en el hilo lector:
+  - media y varianza de las últimas `window` muestras (Welford con ventana:
+    al llenarse, la muestra que sale se descuenta en O(1))
+  - mínimo y máximo de la ventana con colas monótonas (O(1) amortizado)
+  - EWMA con factor `alpha`
+  - anomalías: |z| > `z_threshold` respecto de la ventana anterior a la
+    muestra, o un valor fuera de `limits`
+
+rolling_stats() calcula lo mismo para un arreglo entero con NumPy, sin un
+lazo por muestra, para grabaciones.
+
+Uso (estadísticas de una grabación):
+    python3 sensor_stats.py grabacion/ --ventana 100
+"""
+
+import argparse
+import math
+from collections import deque
+
+import numpy as np
+
+WARMUP = 10  # Muestras previas necesarias para calcular un z-score
+
+
+class RollingStats:
+    """Estadísticas de las últimas `window` muestras de una señal"""
+    def __init__(self, window=100, alpha=0.1, z_threshold=3.0, limits=None):
+        self.window = window
+        self.alpha = alpha
+        self.z_threshold = z_threshold
+        self.limits = limits
+        self.values = deque()
+        self.mins = deque()   # (índice, valor), valores crecientes
+        self.maxs = deque()   # (índice, valor), valores decrecientes
+        self.index = 0        # Muestras vistas
+        self.mean = 0.0
+        self.m2 = 0.0         # Suma de cuadrados de las diferencias con la media
+        self.ewma = None
+        self.anomalies = 0
+        self.last_anomaly = None  # (índice, valor, z)
+
+    def push(self, value):
+        """Agrega una muestra; devuelve True si es una anomalía"""
+        n = len(self.values)
+        z = 0.0
+        if n >= WARMUP:
+            std = math.sqrt(self.m2 / (n - 1))
+            if std > 0:
+                z = (value - self.mean) / std
+        anomaly = abs(z) > self.z_threshold or (
+            self.limits is not None and not self.limits[0] <= value <= self.limits[1])
+        if anomaly:
+            self.anomalies += 1
+            self.last_anomaly = (self.index, value, z)
+
+        # Welford: agregar la muestra y, con la ventana llena, descontar la que sale
+        self.values.append(value)
+        if n < self.window:
+            delta = value - self.mean
+            self.mean += delta / (n + 1)
+            self.m2 += delta * (value - self.mean)
+        else:
+            old = self.values.popleft()
+            mean = self.mean + (value - old) / n
+            self.m2 = max(0.0, self.m2 + (value - old) * (value - mean + old - self.mean))
+            self.mean = mean
+
+        # Colas monótonas: el frente es el mínimo (máximo) de la ventana
+        while self.mins and self.mins[-1][1] >= value:
+            self.mins.pop()
+        self.mins.append((self.index, value))
+        while self.maxs and self.maxs[-1][1] <= value:
+            self.maxs.pop()
+        self.maxs.append((self.index, value))
+        oldest = self.index - self.window
+        if self.mins[0][0] <= oldest:
+            self.mins.popleft()
+        if self.maxs[0][0] <= oldest:
+            self.maxs.popleft()
+
+        self.ewma = value if self.ewma is None else self.ewma + self.alpha * (value - self.ewma)
+        self.index += 1
+        return anomaly
+
+    def extend(self, values):
+        """Agrega un lote de muestras; devuelve cuántas fueron anomalías"""
+        return sum(self.push(v) for v in np.asarray(values).tolist())
+
+    def summary(self):
+        """Valores actuales como dict (None si todavía no hay muestras)"""
+        n = len(self.values)
+        if not n:
+            return None
+        return {"count": n, "mean": self.mean,
+                "std": math.sqrt(self.m2 / (n - 1)) if n > 1 else 0.0,
+                "min": self.mins[0][1], "max": self.maxs[0][1], "ewma": self.ewma,
+                "anomalies": self.anomalies, "last_anomaly": self.last_anomaly}
+
+
+def ewma_filter(values, alpha, chunk=None):
+    """
+    EWMA de todo el arreglo sin un lazo por muestra. Dentro de cada tramo usa
+    la forma cerrada y_i = (1-a)^(i+1) * (y_prev + a * sum(x_k / (1-a)^(k+1)));
+    el tramo se limita para que (1-a)^-L no pierda precisión.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    out = np.empty_like(values)
+    if not len(values):
+        return out
+    decay = 1.0 - alpha
+    if decay <= 0:
+        return values.copy()
+    if chunk is None:
+        chunk = max(1, int(12 * math.log(10) / -math.log(decay))) if decay < 1 else len(values)
+    carry = values[0]  # La EWMA arranca en la primera muestra
+    for start in range(0, len(values), chunk):
+        x = values[start:start + chunk]
+        powers = decay ** np.arange(1, len(x) + 1)
+        out[start:start + len(x)] = powers * (carry + alpha * np.cumsum(x / powers))
+        carry = out[start + len(x) - 1]
+    return out
+
+
+def rolling_stats(values, window=100, alpha=0.1, z_threshold=3.0, limits=None):
+    """
+    Versión vectorizada de RollingStats para un arreglo entero: devuelve un dict
+    de arreglos con mean, std, min y max de la ventana que termina en cada
+    muestra, ewma, z (respecto de la ventana anterior) y anomaly.
+    """
+    x = np.asarray(values, dtype=np.float64)
+    n = len(x)
+    idx = np.arange(n)
+    # Sumas acumuladas desplazadas por x[0] para no perder precisión en la varianza
+    shifted = x - (x[0] if n else 0.0)
+    s1 = np.concatenate(([0.0], np.cumsum(shifted)))
+    s2 = np.concatenate(([0.0], np.cumsum(shifted * shifted)))
+
+    def window_stats(end, count):
+        """Media y desvío de los `count` valores que terminan antes de `end`"""
+        total = s1[end] - s1[end - count]
+        squares = s2[end] - s2[end - count]
+        safe = np.maximum(count, 1)
+        mean = total / safe
+        var = np.maximum(0.0, squares - total * mean) / np.maximum(count - 1, 1)
+        return mean + (x[0] if n else 0.0), np.sqrt(np.where(count > 1, var, 0.0))
+
+    count = np.minimum(idx + 1, window)
+    mean, std = window_stats(idx + 1, count)
+
+    prev_count = np.minimum(idx, window)
+    prev_mean, prev_std = window_stats(idx, prev_count)
+    z = np.zeros(n)
+    valid = (prev_count >= WARMUP) & (prev_std > 0)
+    z[valid] = (x[valid] - prev_mean[valid]) / prev_std[valid]
+    anomaly = np.abs(z) > z_threshold
+    if limits is not None:
+        anomaly |= (x < limits[0]) | (x > limits[1])
+
+    # Mínimo y máximo de la ventana: las primeras muestras (ventana incompleta)
+    # con acumulados, el resto con ventanas deslizantes
+    mins = np.minimum.accumulate(x)
+    maxs = np.maximum.accumulate(x)
+    if n >= window:
+        windows = np.lib.stride_tricks.sliding_window_view(x, window)
+        mins[window - 1:] = windows.min(axis=1)
+        maxs[window - 1:] = windows.max(axis=1)
+
+    return {"mean": mean, "std": std, "min": mins, "max": maxs,
+            "ewma": ewma_filter(x, alpha), "z": z, "anomaly": anomaly}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Estadísticas móviles de una grabación del sensor")
+    parser.add_argument("grabacion")
+    parser.add_argument("--ventana", type=int, default=100, help="muestras por ventana")
+    parser.add_argument("--alpha", type=float, default=0.1, help="factor de la EWMA")
+    parser.add_argument("--umbral-z", type=float, default=3.0, help="|z| a partir del cual hay anomalía")
+    args = parser.parse_args()
+
+    from sensor_app import CHANNELS, SENSOR_RECORD_DTYPE
+    from sensor_recording import iter_recording
+
+    segments = list(iter_recording(args.grabacion, SENSOR_RECORD_DTYPE))
+    records = np.concatenate(segments) if segments else np.empty(0, SENSOR_RECORD_DTYPE)
+    for channel, info in CHANNELS.items():
+        values = records["value"][records["signal_type"] == channel]
+        if not len(values):
+            continue
+        stats = rolling_stats(values, args.ventana, args.alpha, args.umbral_z)
+        print(f"{info['name']}: {len(values)} muestras, última ventana: "
+              f"media {stats['mean'][-1]:.2f} ± {stats['std'][-1]:.2f}, "
+              f"mín {stats['min'][-1]:.0f}, máx {stats['max'][-1]:.0f}, EWMA {stats['ewma'][-1]:.2f}, "
+              f"anomalías {int(stats['anomaly'].sum())}")
+
+
+if __name__ == "__main__":
+    main()